@@ -12,76 +12,37 @@ import optparse
 import configparser
 import pandas
 import sys
-from scipy.interpolate import RectBivariateSpline,interp1d,interp2d,interpn,griddata
+from scipy.interpolate import RectBivariateSpline,interp1d,interpn,griddata,RegularGridInterpolator
 from ast import literal_eval
 from scipy.stats import rv_continuous,gaussian_kde,norm as normal
 from copy import copy
 import pickle
+import hashlib
+import time
+import warnings
+import glob
+from gensed_PySEDMODEL import PySEDMODEL,RegularGridSED,print_err
 
 if not hasattr(sys, 'argv'):
 		sys.argv  = ['']
 
 required_keys = []
 
-__mask_bit_locations__={'verbose':1,'dump':2}
+# max number of cached phase rows per warp effect before the cache is reset
+_MAX_SLICE_ROWS=5000
 
-def print_err():
-	print("""
-			   ______
-			 /	  x	 \\
-			/	--------<  ABORT Python on Fatal Error.
-		__ /  _______/
-/^^^^^^^^^^^^^^/  __/
-\________________/
-				""")
-	raise RuntimeError
+# sub-directory of PATH_VERSION holding binary copies of the text grids
+_CACHE_DIRNAME='.BYOSED_CACHE'
 
-
-class gensed_BYOSED:
+class gensed_BYOSED(PySEDMODEL):
 		def __init__(self,PATH_VERSION,OPTMASK,ARGLIST,HOST_PARAM_NAMES):
 			# TODO: write a print statement that warns if
 			# HOST_PARAM_NAMES is a variable that the code
 			# isn't going to do anything with
 			try:
-				self.verbose = OPTMASK & (1 << __mask_bit_locations__['verbose']) > 0
-				
-				try:
-					# split comman separated key value pairs.
-					# search for key "RANSEED" in list
-					# exctract RASEED integer
-					self.SNANA_RANSEED = [
-						int(arg.split()[1])
-						for arg in ARGLIST.split(",")
-						if "RANSEED" in arg
-					][0]
-				except IndexError:
-					# if ranseed is not given
-					if self.verbose:
-						print("No RANSEED found.", flush=True)
-						self.SNANA_RANSEED = 100
-				if self.verbose:
-					print("Random seed set to ", self.SNANA_RANSEED, flush=True)
-				np.random.seed(self.SNANA_RANSEED)
-				
-				
-				if not PATH_VERSION.endswith('/') and os.path.isdir(PATH_VERSION):
-					PATH_VERSION = PATH_VERSION.rstrip()+'/'
-				self.PATH_VERSION = os.path.expandvars(os.path.dirname(PATH_VERSION))
-
-				self.host_param_names = [x.upper() for x in HOST_PARAM_NAMES.split(',')]
-				self.PATH_VERSION = os.path.dirname(PATH_VERSION)
+				self.init_PySEDMODEL(PATH_VERSION,OPTMASK,ARGLIST,HOST_PARAM_NAMES)
 
-				self.dump = OPTMASK & (1 << __mask_bit_locations__['dump'])>0
-				self.sn_id=None
-
-				self.PATH_VERSION = os.path.expandvars(os.path.dirname(PATH_VERSION))
-				
-				if os.path.exists(os.path.join(self.PATH_VERSION,'BYOSED.params')):
-					self.paramfile = os.path.join(self.PATH_VERSION,'BYOSED.params')
-				elif os.path.exists(os.path.join(self.PATH_VERSION,'byosed.params')):
-					self.paramfile = os.path.join(self.PATH_VERSION,'byosed.params')
-				else:
-					raise RuntimeError('param file %s not found!'%os.path.join(self.PATH_VERSION,'BYOSED.params'))
+				self.paramfile = self.find_paramfile(['BYOSED.params','byosed.params'])
 
 				if os.path.exists(self.paramfile):
 					config = configparser.ConfigParser()
@@ -99,9 +60,18 @@ class gensed_BYOSED:
 
 				self.warp_effects=self.fetchParNames_CONFIG(config)
 
+				# binary cache of the SED and effect grids, rebuilt whenever
+				# the text file changes (BINARY_CACHE: False to disable)
+				if 'BINARY_CACHE' in config['MAIN'].keys() and config['MAIN']['BINARY_CACHE'].upper() in ['FALSE','0']:
+					self.cache_dir=None
+				else:
+					self.cache_dir=os.path.join(self.PATH_VERSION,_CACHE_DIRNAME)
+
 				self.sn_effects,self.host_effects=self.fetchWarp_BYOSED(config)
 
-				phase,wave,flux = np.loadtxt(_append_path(self.PATH_VERSION,self.options.sed_file),unpack=True)
+				sed_data=_load_cached(_append_path(self.PATH_VERSION,self.options.sed_file),
+									  self.cache_dir,_read_sed_text)
+				phase,wave,flux = sed_data['phase'],sed_data['wave'],sed_data['flux']
 
 
 				fluxarr = flux.reshape([len(np.unique(phase)),len(np.unique(wave))])
@@ -129,9 +99,13 @@ class gensed_BYOSED:
 				self.wave = np.unique(wave)
 				self.wavelen = len(self.wave)
 
-				self.sedInterp=interp2d(self.phase,self.wave,self.flux.T,kind='linear',bounds_error=True)
-				
-				self.phase_data={}
+				self.sedInterp=RegularGridSED(self.phase,self.wave,self.flux)
+
+				# memo of fluxes per phase; kept across events only if no
+				# effect changes from one event to the next
+				cache_size=int(config['MAIN']['SED_CACHE_SIZE']) if 'SED_CACHE_SIZE' in config['MAIN'].keys() else 1000
+				self.init_sed_cache(cache_size,self.options.magsmear==0.0 and
+					np.all([w.event_independent for w in list(self.sn_effects.values())+list(self.host_effects.values())]))
 				
 			except Exception as e:
 				exc_type, exc_obj, exc_tb = sys.exc_info()
@@ -193,7 +167,7 @@ class gensed_BYOSED:
 					else:
 						scale_factor=warp_data['SN_FUNCTION_SCALE']
 					try:
-						sn_param_names,sn_function=_read_ND_grids(_append_path(self.PATH_VERSION,str(warp_data['SN_FUNCTION'])),scale_factor)
+						sn_param_names,sn_function=_read_ND_grids(_append_path(self.PATH_VERSION,str(warp_data['SN_FUNCTION'])),scale_factor,self.cache_dir)
 					except RuntimeError:
 						raise RuntimeError("Do not recognize format of function for %s SN Function"%warp)
 					if warp.upper() in sn_param_names and 'PARAM' not in distribution.keys():
@@ -211,7 +185,9 @@ class gensed_BYOSED:
 											scale_parameter=sn_scale_parameter,
 											scale_distribution=distribution['SCALE'],
 											scale_type=warp_data['SCALE_TYPE'],
-											name=warp)
+											name=warp,
+											event_independent=distribution['CONSTANT'] and not
+											np.any([p in self.host_param_names for p in sn_param_names]))
 
 				if 'HOST_FUNCTION' in warp_data:
 					if 'DIST' in ' '.join([x for x in warp_data.keys() if 'HOST' in x or 'SCALE' in x]):
@@ -219,7 +195,7 @@ class gensed_BYOSED:
 					else:
 						raise RuntimeError("Did not supply scale distribution information for HOST effect %s."%warp)
 					try:
-						host_param_names,host_function=_read_ND_grids(_append_path(self.PATH_VERSION,str(warp_data['HOST_FUNCTION'])))
+						host_param_names,host_function=_read_ND_grids(_append_path(self.PATH_VERSION,str(warp_data['HOST_FUNCTION'])),cache_dir=self.cache_dir)
 					except RuntimeError:
 						raise RuntimeError("Do not recognize format of function for %s HOST Function"%warp)
 
@@ -239,35 +215,33 @@ class gensed_BYOSED:
 											  scale_parameter=host_scale_parameter,
 											  scale_distribution=distribution['SCALE'],
 											  scale_type=warp_data['SCALE_TYPE'],
-											  name=warp)
+											  name=warp,
+											  event_independent=distribution['CONSTANT'] and not
+											  np.any([p in self.host_param_names for p in host_param_names]))
 
 			return(sn_dict,host_dict)
 		
 				
-		def fetchSED_NLAM(self):
-				return self.wavelen
-
-		def fetchSED_LAM(self):
-				return list(self.wave)
-		
-
 		def fetchSED_BYOSED(self,trest,maxlam=5000,external_id=1,new_event=1,hostpars=''):
-			try:
-				if len(self.wave)>maxlam:
-					raise RuntimeError("Your wavelength array cannot be larger than %i but is %i"%(maxlam,len(self.wave)))
+			return self.fetchSED(trest,maxlam,external_id,new_event,hostpars)
 
-				if new_event != 1:
-					newSN=False
-				else:
-					newSN=True
-					self.phase_data={}
+		def fetchSED_BYOSED_batch(self,trest,maxlam=5000,external_id=1,new_event=1,hostpars=''):
+			return self.fetchSED_batch(trest,maxlam,external_id,new_event,hostpars)
 
-				self.sn_id=external_id
-				if not newSN and np.round(trest,6) in self.phase_data.keys():
-					return copy(self.phase_data[np.round(trest,6)])
+		def fetchSED_BYOSED_events(self,trest,hostpars,external_id=None,maxlam=5000):
+			return self.fetchSED_events(trest,hostpars,external_id,maxlam)
 
-				fluxsmear=np.array(self.sedInterp(trest,self.wave).flatten())
-				orig_fluxsmear=copy(fluxsmear)
+		def evalSED(self,trest,external_id,newSN,hostpars):
+			"""
+			Returns a 2-D array (len(trest) x len(self.wave)) with the
+			flux of one event at every requested rest-frame phase.
+			Warp effects are evaluated once on the full phase x wave grid.
+			"""
+			try:
+				nphase=len(trest)
+				nwave=len(self.wave)
+
+				fluxsmear=self.sedInterp(trest)
 
 				if self.options.magsmear!=0.0 and (self.sn_id!=external_id or self.magsmear is None):
 					self.magsmear=np.random.normal(0,self.options.magsmear)
@@ -275,14 +249,13 @@ class gensed_BYOSED:
 					self.magsmear=0.0
 
 				fluxsmear *= 10**(-0.4*(self.magsmear))
-				trest_arr=trest*np.ones(len(self.wave))
-				inner_product=np.zeros(len(self.wave))
+				inner_product=np.zeros((nphase,nwave))
 			except Exception as e:
 				print('Python Error :',e)
 				print_err()
 			
 			
-			outer_product=np.zeros(len(self.wave))
+			outer_product=np.zeros((nphase,nwave))
 
 			for warp in [x for x in self.warp_effects]:
 				try: 
@@ -303,22 +276,23 @@ class gensed_BYOSED:
 
 
 
-					product=np.ones(len(self.wave))
+					product=np.ones((nphase,nwave))
 					temp_scale_param = 0
-					temp_outer_product=np.ones(len(self.wave))
+					temp_outer_product=np.ones((nphase,nwave))
 					outer_scale_param=0
 
 
 					if warp in self.sn_effects.keys():
 						if self.verbose:
-							if self.sn_effects[warp].warp_parameter is not None:
-								print('Phase=%.1f, %s: %.2f'%(trest,warp,self.sn_effects[warp].warp_parameter))
-							else:
-								print('Phase=%.1f, %s: %.2f'%(trest,warp,self.sn_effects[warp].scale_parameter))
+							for t in trest:
+								if self.sn_effects[warp].warp_parameter is not None:
+									print('Phase=%.1f, %s: %.2f'%(t,warp,self.sn_effects[warp].warp_parameter))
+								else:
+									print('Phase=%.1f, %s: %.2f'%(t,warp,self.sn_effects[warp].scale_parameter))
 
 						if self.sn_effects[warp].scale_type=='inner':
 
-							product*=self.sn_effects[warp].flux(trest_arr,self.wave,hostpars,self.host_param_names)
+							product*=self.sn_effects[warp].flux_grid(trest,self.wave,hostpars,self.host_param_names)
 							if temp_scale_param ==0:
 								temp_scale_param = self.sn_effects[warp].scale_parameter
 							else:
@@ -326,7 +300,7 @@ class gensed_BYOSED:
 							
 						else:
 
-							temp_outer_product*=self.sn_effects[warp].flux(trest_arr,self.wave,hostpars,self.host_param_names)
+							temp_outer_product*=self.sn_effects[warp].flux_grid(trest,self.wave,hostpars,self.host_param_names)
 							if outer_scale_param ==0:
 								outer_scale_param = self.sn_effects[warp].scale_parameter
 							else:
@@ -336,16 +310,17 @@ class gensed_BYOSED:
 					if warp in self.host_effects.keys():
 						
 						if self.verbose:
-							if self.host_effects[warp].warp_parameter is not None:
-								print('Phase=%.1f, %s: %.2f'%(trest,warp,self.host_effects[warp].warp_parameter))
-							else:
-								print('Phase=%.1f, %s: %.2f'%(trest,warp,self.host_effects[warp].scale_parameter))
+							for t in trest:
+								if self.host_effects[warp].warp_parameter is not None:
+									print('Phase=%.1f, %s: %.2f'%(t,warp,self.host_effects[warp].warp_parameter))
+								else:
+									print('Phase=%.1f, %s: %.2f'%(t,warp,self.host_effects[warp].scale_parameter))
 						if self.host_effects[warp].scale_type=='inner':
 								if temp_scale_param==0:
 										temp_scale_param=self.host_effects[warp].scale_parameter
 								else:
 										temp_scale_param*=self.host_effects[warp].scale_parameter
-								product*=self.host_effects[warp].flux(trest_arr,self.wave,hostpars,self.host_param_names)
+								product*=self.host_effects[warp].flux_grid(trest,self.wave,hostpars,self.host_param_names)
 								
 						else:
 								
@@ -353,7 +328,7 @@ class gensed_BYOSED:
 										outer_scale_param=self.host_effects[warp].scale_parameter
 								else:
 										outer_scale_param*=self.host_effects[warp].scale_parameter
-								temp_outer_product*=self.host_effects[warp].flux(trest_arr,self.wave,hostpars,self.host_param_names)
+								temp_outer_product*=self.host_effects[warp].flux_grid(trest,self.wave,hostpars,self.host_param_names)
 						
 					inner_product+=product*temp_scale_param
 					outer_product+=temp_outer_product*outer_scale_param
@@ -369,9 +344,8 @@ class gensed_BYOSED:
 			if self.is_Ia:
 				fluxsmear*=self.brightness_correct_Ia()
 
-			self.phase_data[np.round(trest,6)]=list(fluxsmear)
-			return list(fluxsmear)
-			
+			return fluxsmear
+
 		def brightness_correct_Ia(self):
 			if 'COLOR' in self.sn_effects.keys():
 				c=self.sn_effects['COLOR'].scale_parameter
@@ -438,6 +412,42 @@ class skewed_normal(rv_continuous):
 		def _argcheck(self,*args):
 				return True
 
+def _benchmark_sedInterp(nphase=100,nwave=1000,ncall=2000):
+	"""Time RegularGridSED against interp2d (or, on SciPy versions
+	without interp2d, RegularGridInterpolator) for single-phase calls."""
+	phase=np.linspace(-20,50,nphase)
+	wave=np.linspace(2000,10000,nwave)
+	flux=np.random.random((nphase,nwave))
+	trest=np.random.uniform(phase[0],phase[-1],ncall)
+
+	fast=RegularGridSED(phase,wave,flux)
+	try:
+		from scipy.interpolate import interp2d
+		with warnings.catch_warnings():
+			warnings.simplefilter('ignore',DeprecationWarning)
+			ref=interp2d(phase,wave,flux.T,kind='linear',bounds_error=True)
+		ref_name='interp2d'
+		ref_call=lambda t: ref(t,wave).flatten()
+	except (ImportError,NotImplementedError):
+		ref_name='RegularGridInterpolator'
+		ref=RegularGridInterpolator((phase,wave),flux,method='linear')
+		ref_call=lambda t: ref(np.vstack([t*np.ones(nwave),wave]).T)
+
+	t0=time.time()
+	ref_flux=np.array([ref_call(t) for t in trest])
+	t1=time.time()
+	fast_flux=np.array([fast(t)[0] for t in trest])
+	t2=time.time()
+	batch_flux=fast(trest)
+	t3=time.time()
+
+	print('%i calls, %i phases x %i waves'%(ncall,nphase,nwave))
+	print('  %-24s : %.4f s'%(ref_name,t1-t0))
+	print('  %-24s : %.4f s'%('RegularGridSED',t2-t1))
+	print('  %-24s : %.4f s'%('RegularGridSED (batch)',t3-t2))
+	print('  max |rel diff| = %.3e'%np.max(np.abs(fast_flux-ref_flux)/np.abs(ref_flux)))
+	print('  batch == single : %s'%np.array_equal(batch_flux,fast_flux))
+
 class WarpModel(object):
 	"""Base class for anything with parameters.
 
@@ -446,8 +456,11 @@ class WarpModel(object):
 	"""
 
 	def __init__(self, warp_function,parameters,param_names,warp_parameter,warp_distribution,
-				 scale_parameter,scale_distribution,scale_type,name):
+				 scale_parameter,scale_distribution,scale_type,name,event_independent=False):
 		self.name = name
+		# True if every event gets the same parameters (no host
+		# dependence, no PARAM distribution and a constant scale)
+		self.event_independent = event_independent
 		self._parameters = parameters
 		self._param_names = [x.upper() for x in param_names]
 		self.warp_function=warp_function
@@ -456,6 +469,16 @@ class WarpModel(object):
 		self.warp_distribution=warp_distribution
 		self.scale_distribution=scale_distribution
 		self.scale_type=scale_type
+		self._fixed_index=np.array([i for i in range(len(self._param_names))
+									if self._param_names[i] not in ['PHASE','WAVELENGTH']],dtype=int)
+		self._reset_slice_cache()
+
+	def _reset_slice_cache(self,key=None,wave=None):
+		# rows of the (phase x wave) slice, keyed by phase, valid only
+		# for the parameter values in key and the wavelength array wave
+		self._slice_key=key
+		self._slice_wave=wave
+		self._slice_cache={}
 
 	def updateWarp_Param(self,z=None):
 		if self.warp_distribution is not None:
@@ -477,6 +500,26 @@ class WarpModel(object):
 							else phase_wave_dict[self._param_names[i]] for i in range(len(self._param_names))]
 		return(self.warp_function(np.vstack(parameter_arrays).T).flatten())
 
+	def flux_grid(self,phase,wave,host_params,host_param_names):
+		"""Warp function on the (phase x wave) grid, shape (len(phase),len(wave)).
+		Rows are cached per phase until a non-phase/wavelength parameter
+		or the wavelength array changes, so repeated phases are free."""
+		self.set(**{p:host_params[host_param_names.index(p)] for p in self._param_names if p in host_param_names})
+		key=tuple(self._parameters[self._fixed_index])
+		if key!=self._slice_key or wave is not self._slice_wave or \
+		   len(self._slice_cache)>_MAX_SLICE_ROWS:
+			self._reset_slice_cache(key,wave)
+
+		phase=np.atleast_1d(phase)
+		if 'PHASE' not in self._param_names:
+			phase=np.zeros(len(phase))
+		new_phase=np.array([p for p in np.unique(phase) if p not in self._slice_cache])
+		if len(new_phase)>0:
+			rows=self.flux(np.repeat(new_phase,len(wave)),np.tile(wave,len(new_phase)),
+						   host_params,host_param_names).reshape((len(new_phase),len(wave)))
+			self._slice_cache.update(zip(new_phase,rows))
+		return(np.array([self._slice_cache[p] for p in phase]))
+
 
 
 
@@ -549,6 +592,7 @@ class WarpModel(object):
 		for key, val in self.__dict__.items():
 			new_model.__dict__[key] = val
 		new_model._parameters = self._parameters.copy()
+		new_model._reset_slice_cache()
 		return new_model
 
 
@@ -560,13 +604,43 @@ def _skewed_normal(name,dist_dat,dist_type):
 			a=dist_dat[dist_type+'_DIST_PEAK']-3*dist_dat[dist_type+'_DIST_SIGMA'][0]
 			b=dist_dat[dist_type+'_DIST_PEAK']+3*dist_dat[dist_type+'_DIST_SIGMA'][1]
 		if a==b:
-				return(lambda :[a])
+				return(_ConstantSampler(a))
 		dist = skewed_normal(name,a=a,b=b)
 		sample=np.linspace(a,b,int(1e4))
-		return(lambda : np.random.choice(sample,1,
-										 p=dist._pdf(sample,dist_dat[dist_type+'_DIST_PEAK'],dist_dat[dist_type+'_DIST_SIGMA'][0],dist_dat[dist_type+'_DIST_SIGMA'][1])))
+		# the pdf does not change between draws: tabulate it once
+		return(_InverseCDFSampler(sample,dist._pdf(sample,dist_dat[dist_type+'_DIST_PEAK'],dist_dat[dist_type+'_DIST_SIGMA'][0],dist_dat[dist_type+'_DIST_SIGMA'][1])))
 		
 
+class _InverseCDFSampler(object):
+	"""Sample a pdf tabulated on the grid ``sample`` by inverse-CDF lookup.
+
+	The cumulative table is built once. Each call uses the same uniform
+	draws and bin search as ``np.random.choice(sample,size,p=pdf)``, so
+	results for a fixed RANSEED are unchanged.
+	"""
+	def __init__(self,sample,pdf):
+		self.sample=np.asarray(sample)
+		self.cdf=np.cumsum(np.asarray(pdf,dtype=float))
+		self.cdf/=self.cdf[-1]
+
+	def __call__(self,size=1):
+		"""Return an array of ``size`` samples."""
+		return self.sample[self.cdf.searchsorted(np.random.random_sample(size),side='right')]
+
+class _ConstantSampler(object):
+	"""Degenerate distribution (limits a==b); draws no random numbers."""
+	constant=True
+
+	def __init__(self,value):
+		self.value=value
+
+	def __call__(self,size=1):
+		return np.full(size,self.value)
+
+def _draw(func,size):
+	# a single value when size is None (per-event draw), else an array
+	return func()[0] if size is None else func(size)
+
 def _append_path(path,file):
 	if file.strip().startswith('/'):
 		respath = file
@@ -582,8 +656,8 @@ def _param_from_dist(dist_file,path):
 	a=np.min(dist)-abs(np.min(dist))
 	b=np.max(dist)+abs(np.max(dist))
 	sample=np.linspace(a,b,int(1e4))
-	pdf=gaussian_kde(dist.T).pdf(np.linspace(a,b,int(1e4)))
-	return(lambda : np.random.choice(sample,1,p=pdf/np.sum(pdf)))
+	pdf=gaussian_kde(dist.T).pdf(sample)
+	return(_InverseCDFSampler(sample,pdf/np.sum(pdf)))
 
 def _get_zdepend(dist_file,path,typ):
 	fv=0 if typ=='add' else 1
@@ -593,7 +667,7 @@ def _get_zdepend(dist_file,path,typ):
 
 
 def _get_distribution(name,dist_dat,path,sn_or_host):
-	dist_dict={}
+	dist_dict={'CONSTANT':False}
 	param=True
 	if np.any(['DIST_FILE' in x for x in dist_dat.keys() if 'PARAM' in x]):
 		
@@ -630,27 +704,28 @@ def _get_distribution(name,dist_dat,path,sn_or_host):
 			
 			if sn_or_host+'_PARAM_ZDEPEND_TYPE' in dist_dat.keys() and dist_dat[sn_or_host+'_PARAM_ZDEPEND_TYPE']=='MULTIPLY':
 				zdepend=_get_zdepend(dist_dat[sn_or_host+'_PARAM_ZDEPEND_FILE'],path,'multiply')
-				dist_dict['PARAM']=lambda z: (param_func()[0])*zdepend(z)
+				dist_dict['PARAM']=lambda z,size=None: _draw(param_func,size)*zdepend(z)
 			else:
 				zdepend=_get_zdepend(dist_dat[sn_or_host+'_PARAM_ZDEPEND_FILE'],path,'add')
-				dist_dict['PARAM']=lambda z: param_func()[0]+zdepend(z)
+				dist_dict['PARAM']=lambda z,size=None: _draw(param_func,size)+zdepend(z)
 		else:
 			raise RuntimeError("You may have a typo, did you mean to set 'ZDEPEND' for %s?"%sn_or_host)
 	elif param:
-		dist_dict['PARAM']=lambda z:param_func()[0]
+		dist_dict['PARAM']=lambda z,size=None:_draw(param_func,size)
 	if np.any(['ZDEPEND' in x for x in dist_dat.keys() if 'SCALE' in x]):
 		if sn_or_host+'_SCALE_ZDEPEND_FILE' in dist_dat.keys():
 			if sn_or_host+'_SCALE_ZDEPEND_TYPE' in dist_dat.keys() and\
 			   dist_dat[sn_or_host+'_SCALE_ZDEPEND_TYPE'].upper()=='MULTIPLY':
 				zdepend=_get_zdepend(dist_dat[sn_or_host+'_SCALE_ZDEPEND_FILE'],path,'multiply')
-				dist_dict['SCALE']=lambda z: (scale_func()[0])*zdepend(z)
+				dist_dict['SCALE']=lambda z,size=None: _draw(scale_func,size)*zdepend(z)
 			else:
 				zdepend=_get_zdepend(dist_dat[sn_or_host+'_SCALE_ZDEPEND_FILE'],path,'add')
-				dist_dict['SCALE']=lambda z: scale_func()[0]+zdepend(z)
+				dist_dict['SCALE']=lambda z,size=None: _draw(scale_func,size)+zdepend(z)
 		else:
 			raise RuntimeError("You may have a typo, did you mean to set 'ZDEPEND' for %s scale distribution?"%sn_or_host)
 	else:
-		dist_dict['SCALE']=lambda z:scale_func()[0]
+		dist_dict['SCALE']=lambda z,size=None:_draw(scale_func,size)
+		dist_dict['CONSTANT']=not param and getattr(scale_func,'constant',False)
 	return(dist_dict)
 
 def _integration_grid(low, high, target_spacing):
@@ -700,7 +775,49 @@ def _generate_ND_grids(func,filename=None,colnames=None,*arrs):
 	return(gridded)
 	
 	
-def _read_ND_grids(filename,scale_factor=1.):
+def _file_hash(filename):
+	h=hashlib.md5()
+	with open(filename,'rb') as f:
+		for chunk in iter(lambda: f.read(1<<20),b''):
+			h.update(chunk)
+	return h.hexdigest()
+
+def _load_cached(filename,cache_dir,loader):
+	"""Return the dict of arrays made by loader(filename), using a .npz
+	copy in cache_dir keyed by the text file's content hash. A missing,
+	stale or unreadable cache is rebuilt; an unwritable cache_dir just
+	falls back to parsing the text file."""
+	if cache_dir is None:
+		return loader(filename)
+
+	path_tag=hashlib.md5(os.path.abspath(filename).encode()).hexdigest()[:8]
+	prefix=os.path.join(cache_dir,'%s.%s'%(os.path.basename(filename),path_tag))
+	cache_file='%s.%s.npz'%(prefix,_file_hash(filename))
+	if os.path.exists(cache_file):
+		try:
+			with np.load(cache_file,allow_pickle=False) as f:
+				return {k:f[k] for k in f.files}
+		except Exception:
+			pass
+
+	data=loader(filename)
+	try:
+		os.makedirs(cache_dir,exist_ok=True)
+		for old in glob.glob(prefix+'.*.npz'):
+			os.remove(old)
+		tmp_file='%s.%i.tmp'%(cache_file,os.getpid())
+		with open(tmp_file,'wb') as f:
+			np.savez(f,**data)
+		os.replace(tmp_file,cache_file)
+	except OSError:
+		pass
+	return data
+
+def _read_sed_text(filename):
+	phase,wave,flux=np.loadtxt(filename,unpack=True)
+	return {'phase':phase,'wave':wave,'flux':flux}
+
+def _read_ND_text(filename):
 	with open(filename,'r') as f:
 		temp=f.readline()
 
@@ -708,19 +825,32 @@ def _read_ND_grids(filename,scale_factor=1.):
 			names=temp.strip('#').split()
 			gridded=pandas.read_csv(filename,sep=' ',names=names,comment='#',header=None)
 		else:
+			names=[]
 			gridded=pandas.read_csv(filename,sep=' ',comment='#',header=None)
-	
-	arrs=tuple(np.unique(gridded.values[:,i]) for i in range(len(gridded.columns)-1))
+	return {'names':np.array(names,dtype=str),'values':np.asarray(gridded.values,dtype=float)}
+
+def _read_ND_grids(filename,scale_factor=1.,cache_dir=None):
+	grid_data=_load_cached(filename,cache_dir,_read_ND_text)
+	values=grid_data['values']
+	columns=list(grid_data['names']) if len(grid_data['names'])>0 else list(range(values.shape[1]))
+
+	arrs=tuple(np.unique(values[:,i]) for i in range(len(columns)-1))
 	
 	dim=[len(x) for x in arrs]
 
-	theta=np.array(gridded[gridded.columns[-1]]).reshape(dim)*scale_factor
+	theta=np.array(values[:,-1]).reshape(dim)*scale_factor
 
-	return([x.upper() for x in gridded.columns][:-1],lambda interp_array:interpn(arrs,theta,xi=interp_array,method='linear',bounds_error=False,fill_value=0))
+	# build the interpolator once; it is called for every flux evaluation
+	interp=RegularGridInterpolator(arrs,theta,method='linear',bounds_error=False,fill_value=0)
+
+	return([x.upper() for x in columns][:-1],interp)
 	
 	
 
 def main():
+		if '--benchmark' in sys.argv:
+			_benchmark_sedInterp()
+			return
 					
 		import matplotlib.pyplot as plt
 
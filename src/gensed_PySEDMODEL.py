@@ -0,0 +1,236 @@
+#  ***********************************************************************
+#  Common base class for the python SED models (gensed_[MODEL].py)
+#  called by genmag_PySEDMODEL.c
+#
+#  A model class derives from PySEDMODEL, calls init_PySEDMODEL at the
+#  start of its __init__, sets self.wave and implements
+#
+#     evalSED(trest,external_id,new_event,hostpars)
+#
+#  returning a 2-D flux array (len(trest) x len(self.wave)). The base
+#  class provides OPTMASK/RANSEED parsing, the maxlam check, the batch
+#  and multi-event entry points and the per-phase SED cache. The
+#  per-model fetchSED_[MODEL] method for the C code is a one-line
+#  wrapper around fetchSED.
+#
+
+import numpy as np
+import os
+import sys
+from collections import OrderedDict
+
+mask_bit_locations = {'verbose':1,'dump':2}
+
+def print_err():
+	print("""
+			   ______
+			 /	  x	 \\
+			/	--------<  ABORT Python on Fatal Error.
+		__ /  _______/
+/^^^^^^^^^^^^^^/  __/
+\\________________/
+				""")
+	raise RuntimeError
+
+
+class PySEDMODEL(object):
+	"""Base class for python SED models called by genmag_PySEDMODEL.c"""
+
+	def init_PySEDMODEL(self,PATH_VERSION,OPTMASK,ARGLIST,HOST_PARAM_NAMES):
+		"""Parse OPTMASK, RANSEED (from ARGLIST), HOST_PARAM_NAMES and
+		PATH_VERSION, and seed the random number generator."""
+		self.verbose = OPTMASK & (1 << mask_bit_locations['verbose']) > 0
+		self.dump = OPTMASK & (1 << mask_bit_locations['dump'])>0
+
+		try:
+			# split comma separated key value pairs,
+			# search for key "RANSEED" and extract integer
+			self.SNANA_RANSEED = [
+				int(arg.split()[1])
+				for arg in ARGLIST.split(",")
+				if "RANSEED" in arg
+			][0]
+		except IndexError:
+			# if ranseed is not given
+			if self.verbose:
+				print("No RANSEED found.", flush=True)
+			self.SNANA_RANSEED = 100
+		if self.verbose:
+			print("Random seed set to ", self.SNANA_RANSEED, flush=True)
+		np.random.seed(self.SNANA_RANSEED)
+
+		if not PATH_VERSION.endswith('/') and os.path.isdir(PATH_VERSION):
+			PATH_VERSION = PATH_VERSION.rstrip()+'/'
+		self.PATH_VERSION = os.path.expandvars(os.path.dirname(PATH_VERSION))
+
+		self.host_param_names = [x.upper() for x in HOST_PARAM_NAMES.split(',')]
+		self.sn_id=None
+
+		self.sed_cache=SEDCache()
+		self.sed_cache_across_events=False
+
+	def find_paramfile(self,names):
+		"""Return the first of names that exists in PATH_VERSION."""
+		for name in names:
+			paramfile=os.path.join(self.PATH_VERSION,name)
+			if os.path.exists(paramfile):
+				return paramfile
+		raise RuntimeError('param file %s not found!'%os.path.join(self.PATH_VERSION,names[0]))
+
+	def init_sed_cache(self,max_size,across_events=False):
+		"""Set the SED cache size; across_events=True keeps cached
+		fluxes from one event to the next (only valid if the SED does
+		not depend on per-event parameters)."""
+		self.sed_cache=SEDCache(max_size)
+		self.sed_cache_across_events=across_events
+
+	def fetchSED_NLAM(self):
+		"""
+		Returns the length of the wavelength vector
+		"""
+		return self.wavelen
+
+	def fetchSED_LAM(self):
+		"""
+		Returns the wavelength vector
+		"""
+		return list(self.wave)
+
+	def check_maxlam(self,maxlam):
+		if len(self.wave)>maxlam:
+			raise RuntimeError("Your wavelength array cannot be larger than %i but is %i"%(maxlam,len(self.wave)))
+
+	def evalSED(self,trest,external_id,new_event,hostpars):
+		"""Return the flux array (len(trest) x len(self.wave)) of one
+		event; draw new event parameters if new_event is True."""
+		raise NotImplementedError("evalSED must be implemented by %s"%self.__class__.__name__)
+
+	def fetchSED(self,trest,maxlam=5000,external_id=1,new_event=1,hostpars=''):
+		"""
+		Returns the flux at every wavelength for a single phase, as a
+		list for the C code, using the SED cache for repeated phases.
+		"""
+		if new_event == 1:
+			if self.verbose or self.dump:
+				print('SED cache: %s'%self.sed_cache.stats(), flush=True)
+			if not self.sed_cache_across_events:
+				self.sed_cache.clear()
+
+		if new_event != 1 or self.sed_cache_across_events:
+			flux=self.sed_cache.get(trest)
+			if flux is not None:
+				self.sn_id=external_id
+				return flux.tolist()
+
+		flux=self.fetchSED_batch([trest],maxlam,external_id,new_event,hostpars)[0]
+
+		self.sed_cache.put(trest,flux)
+		return flux.tolist()
+
+	def fetchSED_batch(self,trest,maxlam=5000,external_id=1,new_event=1,hostpars=''):
+		"""
+		Returns a 2-D array (len(trest) x len(self.wave)) with the
+		flux of one event at every requested rest-frame phase.
+		"""
+		try:
+			self.check_maxlam(maxlam)
+			trest=np.atleast_1d(np.asarray(trest,dtype=float))
+		except Exception as e:
+			print('Python Error :',e)
+			print_err()
+
+		self.sn_id=external_id
+		return self.evalSED(trest,external_id,new_event == 1,hostpars)
+
+	def fetchSED_events(self,trest,hostpars,external_id=None,maxlam=5000):
+		"""
+		Returns a 3-D array (n_event x len(trest) x len(self.wave))
+		for several events evaluated at the same phases. Row i of
+		hostpars holds the host parameters of event i; each event
+		draws new parameters as for new_event=1.
+		"""
+		hostpars=np.atleast_2d(hostpars)
+		if external_id is None:
+			external_id=np.arange(1,len(hostpars)+1)
+		return(np.array([self.fetchSED_batch(trest,maxlam,external_id[i],1,hostpars[i])
+						 for i in range(len(hostpars))]))
+
+
+class SEDCache(object):
+	"""Bounded memo of SED flux arrays keyed by phase (rounded to 1e-6),
+	with least-recently-used eviction and hit/miss counters."""
+	def __init__(self,max_size=1000):
+		self.max_size=max_size
+		self._data=OrderedDict()
+		self.hits=0
+		self.misses=0
+		self.evictions=0
+
+	def __len__(self):
+		return len(self._data)
+
+	def _key(self,trest):
+		return float(np.round(trest,6))
+
+	def get(self,trest):
+		"""Return the cached flux array for trest, or None."""
+		key=self._key(trest)
+		flux=self._data.get(key)
+		if flux is None:
+			self.misses+=1
+		else:
+			self.hits+=1
+			self._data.move_to_end(key)
+		return flux
+
+	def put(self,trest,flux):
+		if self.max_size<=0:
+			return
+		self._data[self._key(trest)]=np.array(flux,dtype=float)
+		while len(self._data)>self.max_size:
+			self._data.popitem(last=False)
+			self.evictions+=1
+
+	def clear(self):
+		self._data.clear()
+
+	def stats(self):
+		ntot=self.hits+self.misses
+		return('size=%i/%i hits=%i misses=%i evictions=%i hit_rate=%.3f'%
+			   (len(self._data),self.max_size,self.hits,self.misses,self.evictions,
+				self.hits/ntot if ntot>0 else 0.))
+
+
+class RegularGridSED(object):
+	"""Bilinear interpolation of an SED on its fixed (phase x wave) grid.
+
+	The flux is resampled to the output wavelengths once, using bracket
+	indices and weights precomputed per wavelength; a call then only
+	computes the phase brackets and one weighted sum of two rows. Grid
+	points are reproduced exactly and phases outside the grid raise
+	ValueError. Extra trailing axes of flux (e.g. model components)
+	are carried through: flux has shape (nphase,...,nwave).
+	"""
+	def __init__(self,phase,wave,flux,out_wave=None):
+		self.phase=np.asarray(phase,dtype=float)
+		self.wave=np.asarray(wave,dtype=float)
+		self.out_wave=self.wave if out_wave is None else np.asarray(out_wave,dtype=float)
+		flux=np.asarray(flux,dtype=float)
+
+		iwave,wwave=grid_brackets(self.wave,self.out_wave)
+		self.flux=flux[...,iwave]*(1-wwave)+flux[...,iwave+1]*wwave
+
+	def __call__(self,phase):
+		"""Return the flux at each phase, shape (len(phase),...,len(out_wave))."""
+		phase=np.atleast_1d(np.asarray(phase,dtype=float))
+		if np.any(phase<self.phase[0]) or np.any(phase>self.phase[-1]):
+			raise ValueError("Phase outside of SED range [%.2f,%.2f]"%(self.phase[0],self.phase[-1]))
+		iphase,wphase=grid_brackets(self.phase,phase)
+		wphase=wphase.reshape((len(phase),)+(1,)*(self.flux.ndim-1))
+		return self.flux[iphase]*(1-wphase)+self.flux[iphase+1]*wphase
+
+def grid_brackets(grid,x):
+	"""Lower bracket index and linear weight of each x on a sorted grid;
+	the last grid point maps to the last interval with weight 1."""
+	i=np.clip(np.searchsorted(grid,x,side='right')-1,0,len(grid)-2)
+	return i,(x-grid[i])/(grid[i+1]-grid[i])
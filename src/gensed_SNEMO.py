@@ -1,51 +1,70 @@
+#  ***********************************************************************
+#  SNEMO (SNfactory Empirical Model, Saunders et al. 2018) SED model
+#  called by genmag_PySEDMODEL.c
+#
+#  The params file (SNEMO.params, YAML) in PATH_VERSION has keys
+#
+#    SED_FILE:  snemo_data.dat   # columns: PHASE WAVE M0 M1 ... Mn
+#    NORM:      0.0              # optional mag offset, flux *= 10^(-0.4*NORM)
+#    PARAM_DIST:                 # optional Gaussian [mean, sigma] per
+#      C1: [0.0, 1.0]            # component coefficient; default [0,0]
+#      C2: [0.0, 1.0]
+#
+#  and the SED is  x0 * ( M0 + sum_i C_i * M_i ),  with the C_i drawn
+#  once per event. All components are interpolated in phase together,
+#  so each phase costs one weighted sum over the components.
+#
+
 import sys
 import os
 import yaml
+import numpy as np
+from gensed_PySEDMODEL import PySEDMODEL,RegularGridSED,print_err
 
-mask_bit_locations = {'verbose':1,'dump':2}
-
-def print_err():
-	print("""
-			   ______
-			 /	  x  \\
-			/	--------<  ABORT Python on Fatal Error.
-		__ /  _______/
-/^^^^^^^^^^^^^^/  __/
-\________________/
-				""")
-	raise RuntimeError
 
-
-class gensed_SNEMO:
+class gensed_SNEMO(PySEDMODEL):
 		def __init__(self,PATH_VERSION,OPTMASK,ARGLIST,HOST_PARAM_NAMES):
 			try:
-				self.verbose = OPTMASK & (1 << mask_bit_locations['verbose']) > 0
-
-				self.host_param_names = [x.upper() for x in HOST_PARAM_NAMES.split(',')]
-
-				self.dump = OPTMASK & (1 << mask_bit_locations['dump'])>0
-
-				self.PATH_VERSION = os.path.expandvars(os.path.dirname(PATH_VERSION))
-				
-				if os.path.exists(os.path.join(self.PATH_VERSION,'SNEMO.params')):
-					self.paramfile = os.path.join(self.PATH_VERSION,'SNEMO.params')
-				elif os.path.exists(os.path.join(self.PATH_VERSION,'SNEMO.PARAMS')):
-					self.paramfile = os.path.join(self.PATH_VERSION,'SNEMO.PARAMS')
-				else:
-					raise RuntimeError('param file %s not found!'%\
-									   os.path.join(self.PATH_VERSION,'SNEMO.params'))
-
-				self.params_file_contents = yaml.load(open(self.paramfile),
-													  Loader=yaml.FullLoader)
-				print('PARAMS FILE:')
-				print(self.params_file_contents)
-				
-
-				### FILL IN THESE REQUIRED ELEMENTS
-				#self.wave = 
-				#self.wavelen = len(self.wave)
-				#self.parameter_names = []
-				#self.parameter_values = {}
+				self.init_PySEDMODEL(PATH_VERSION,OPTMASK,ARGLIST,HOST_PARAM_NAMES)
+
+				self.paramfile = self.find_paramfile(['SNEMO.params','SNEMO.PARAMS'])
+
+				with open(self.paramfile) as f:
+					self.params_file_contents = yaml.load(f,Loader=yaml.FullLoader)
+				if self.verbose:
+					print('PARAMS FILE:')
+					print(self.params_file_contents)
+
+				sed_file = os.path.expandvars(self.params_file_contents['SED_FILE'])
+				if not os.path.isabs(sed_file):
+					sed_file = os.path.join(self.PATH_VERSION,sed_file)
+				self.x0 = 10**(-0.4*float(self.params_file_contents.get('NORM',0.0)))
+
+				# load the eigenvector components once: (phase,ncomp+1,wave)
+				data = np.loadtxt(sed_file)
+				phase = np.unique(data[:,0])
+				self.wave = np.unique(data[:,1])
+				self.wavelen = len(self.wave)
+				ncomp = data.shape[1]-3
+				components = data[:,2:].reshape((len(phase),len(self.wave),ncomp+1))
+				components = np.swapaxes(components,1,2)*self.x0
+				self.sedInterp = RegularGridSED(phase,self.wave,components)
+
+				self.parameter_names = ['C%i'%i for i in range(1,ncomp+1)]
+				param_dist = {k.upper():v for k,v in
+							  (self.params_file_contents.get('PARAM_DIST') or {}).items()}
+				for name in param_dist.keys():
+					if name not in self.parameter_names:
+						raise RuntimeError('Unknown PARAM_DIST %s; model has %s'%
+										   (name,','.join(self.parameter_names)))
+				dist = np.array([param_dist.get(name,[0.,0.]) for name in self.parameter_names],dtype=float)
+				self.param_mean = dist[:,0]
+				self.param_sigma = dist[:,1]
+				self.coeffs = np.append(1.,self.param_mean)
+				self.parameter_values = dict(zip(self.parameter_names,self.param_mean))
+
+				cache_size = int(self.params_file_contents.get('SED_CACHE_SIZE',1000))
+				self.init_sed_cache(cache_size,not np.any(self.param_sigma>0))
 
 			except Exception as e:
 				exc_type, exc_obj, exc_tb = sys.exc_info()
@@ -54,24 +73,11 @@ class gensed_SNEMO:
 				print_err()
 
 			return
-		
-				
-		def fetchSED_NLAM(self):
-			"""
-			Returns the length of the wavelength vector
-			"""
-			return self.wavelen
 
-		def fetchSED_LAM(self):
-			"""
-			Returns the wavelength vector
-			"""
-			return list(self.wave)
-		
 		def fetchSED_SNEMO(self,trest,maxlam=5000,external_id=1,new_event=1,hostpars=''):
 			"""
 			Returns the flux at every wavelength, for a given phase.
-			
+
 			Parameters
 			----------
 			trest : float
@@ -86,29 +92,31 @@ class gensed_SNEMO:
 			     1 if new event, 0 if same SN
 			hostpars : str
 			     Comma separated list of host parameters
-			
+
 			Returns
 			-------
 			A list of length self.wavelen containing the flux at
 			every wavelength in self.wave, at the phase trest
 			"""
-					
+			return self.fetchSED(trest,maxlam,external_id,new_event,hostpars)
+
+		def evalSED(self,trest,external_id,new_event,hostpars):
+			"""
+			Returns the flux (len(trest) x len(self.wave)) as the linear
+			combination of the components with this event's coefficients.
+			"""
 			try:
-				if len(self.wave)>maxlam:
-					raise RuntimeError("Your wavelength array cannot be larger than %i but is %i"%(maxlam,len(self.wave)))
-				
-				# Calculation for flux at self.wave wavelengths for phase trest
-			
-				
-				return flux_at_all_wavelengths_for_trest
-
- 
+				if new_event:
+					values = np.random.normal(self.param_mean,self.param_sigma)
+					self.coeffs = np.append(1.,values)
+					self.parameter_values = dict(zip(self.parameter_names,values))
+
+				return np.einsum('c,pcw->pw',self.coeffs,self.sedInterp(trest))
+
 			except Exception as e:
 				print('Python Error :',e)
 				print_err()
-			
 
-		
 		def fetchParNames_SNEMO(self):
 			"""
 			Returns the names of model parameters
@@ -119,22 +127,23 @@ class gensed_SNEMO:
 			"""
 			Returns the number of model parameters
 			"""
-			return len(self.self.parameter_names)
+			return len(self.parameter_names)
 
 		def fetchParVals_SNEMO_4SNANA(self,varname):
 			"""
 			Returns the value of parameter 'varname'
-			
+
 			Parameters
 			----------
 			varname : str
 			     A parameter name from self.parameter_names
 			"""
 			return self.parameter_values[varname]
-	
+
 
 def main():
-	mySED=gensed_SNEMO('$WFIRST_USERS/jpierel/pySED_test/SNEMO.P20/',2,[],'z,AGE,ZCMB,METALLICITY')
+	mySED=gensed_SNEMO('$WFIRST_USERS/jpierel/pySED_test/SNEMO.P20/',2,'','z,AGE,ZCMB,METALLICITY')
+	print(np.sum(mySED.fetchSED_SNEMO(0,5000,1,1,[.1,1,1,.5])))
 
 
 
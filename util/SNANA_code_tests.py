@@ -32,6 +32,10 @@
 #   + write $HOST to HOST_MONITOR.INFO
 #   + increas batch time from 20min to 1hr in case of batch delay
 #
+# Oct 17 2026: each task appends its DONE file to DONE_MANIFEST_FILE;
+#   monitor task counts DONE files from manifest (no directory listing)
+#   and polls with exponential backoff (1 to 10 sec) instead of 10 sec.
+#
 
 import os, sys, datetime, shutil, time, glob
 import subprocess, argparse
@@ -53,6 +57,9 @@ CPU_FILE_DEFAULT        = 'CPU_ASSIGN.DAT'
 RESULT_TASKS_FILE       = 'RESULTS_TASKS.DAT'
 RESULT_DIFF_FILE        = 'RESULTS_DIFF.DAT'
 SNANA_INFO_FILE         = 'SNANA.INFO'
+DONE_MANIFEST_FILE      = 'DONE_MANIFEST.LIST'  # list of DONE files
+T_SLEEP_MONITOR         = [ 1, 10 ]  # min,max sleep (sec) in monitor
+T_SCAN_FULL_MONITOR     = 60   # glob DONE files if count stuck this long
 STOP_FILE               = f"{LOG_TOPDIR}/STOP"
 MEMORY                  = 2000   # Mb
 WALLTIME_MAX            = "01:00:00"    # 1 hr to allow queue delay
@@ -785,6 +792,10 @@ def execute_task(itask, CPU_TASKLIST, INPUTS) :
     f.write(f"{DONE_STRING}\n")
     f.close()
 
+    # and append DONE file name to manifest read by monitor task
+    with open(f"{LOGDIR}/{DONE_MANIFEST_FILE}", 'at') as f:
+        f.write(f"{os.path.basename(DONEFILE)}\n")
+
     return 1
 
 # ============================
@@ -1134,6 +1145,21 @@ def make_tarfiles(LOGDIR):
         os.system(cmd_all)
 
 # ========================================
+def count_done_files(LOGDIR, use_glob=False):
+    # return number of DONE files in LOGDIR; read manifest written
+    # by execute_task, or use glob if there is no manifest yet.
+    # If use_glob is True, return max of manifest and glob counts
+    # in case appends to manifest were lost.
+    manifest_file = f"{LOGDIR}/{DONE_MANIFEST_FILE}"
+    if not os.path.isfile(manifest_file) :
+        return len(glob.glob1(LOGDIR,"*.DONE"))
+    with open(manifest_file, 'rt') as f:
+        done_list = f.read().split()
+    NDONE = len(set(done_list))
+    if use_glob :
+        NDONE = max(NDONE, len(glob.glob1(LOGDIR,"*.DONE")))
+    return NDONE
+
 def monitorTasks_driver(INPUTS,SUBMIT_INFO,RESULTS_INFO_REF):
 
     t_start = time.time()
@@ -1152,22 +1178,34 @@ def monitorTasks_driver(INPUTS,SUBMIT_INFO,RESULTS_INFO_REF):
 
     print(f"\n Begin monitor of {NTASK} {REFTEST} tasks")
 
-    NDONE = 0
+    NDONE = 0 ; NDONE_LAST = -1 ; t_sleep = T_SLEEP_MONITOR[0]
+    t_change = time.time()
     while ( NDONE < NTASK ) :
-        NDONE = len(glob.glob1(LOGDIR,"*.DONE"))
-        # track total run time
-        t_now  = time.time()
-        t_proc = (t_now-t_start)/60.0  # time in minutes
-        print(f" Found {NDONE} of {NTASK} done files  " \
-              f"({t_proc:0.1f} minutes elapsed).")
-        sys.stdout.flush()
+        use_glob = time.time() - t_change > T_SCAN_FULL_MONITOR
+        NDONE = count_done_files(LOGDIR, use_glob)
+        if NDONE > NDONE_LAST or use_glob : t_change = time.time()
+
+        # track total run time; print when NDONE changes, 
+        # or after each max sleep
+        if NDONE > NDONE_LAST or t_sleep == T_SLEEP_MONITOR[1] :
+            t_now  = time.time()
+            t_proc = (t_now-t_start)/60.0  # time in minutes
+            print(f" Found {NDONE} of {NTASK} done files  " \
+                  f"({t_proc:0.1f} minutes elapsed).")
+            sys.stdout.flush()
+
         if ( os.path.isfile(STOP_FILE) == True ) :
             cmd_cp = f"cp {STOP_FILE} {LOGDIR}"
             os.system(cmd_cp)
             sys.exit()
 
         if ( NDONE < NTASK ) :
-            time.sleep(10)
+            if NDONE > NDONE_LAST :
+                t_sleep = T_SLEEP_MONITOR[0]
+            else:
+                t_sleep = min(2*t_sleep, T_SLEEP_MONITOR[1])
+            NDONE_LAST = NDONE
+            time.sleep(t_sleep)
 
     # everything has finished.
     # Catenate the one-line summary from each DONE file
@@ -24,6 +24,13 @@
 # Aug 02 2021 Dillon
 #    + update to handle option to subtract MUERR_VPEC
 #
+# Oct 2026
+#    + new --lowmem option: keep only the diff vector (rank-1 factor)
+#      of each FITOPT/MUOPT contribution and build each COVOPT matrix
+#      from them, instead of storing a dense NxN matrix per systematic.
+#    + write_covariance formats a full row per write, logs ln|cov| from
+#      slogdet, and with --npy also writes a binary .npy cov matrix.
+#
 # ===============================================
 
 import argparse
@@ -121,6 +128,12 @@ def get_args():
 
     msg = "Subtract MUERR(VPEC) from MUERR. Forces unbinned."
     parser.add_argument("-s", "--subtract_vpec", help=msg, action="store_true")
+
+    msg = "store rank-1 syst contributions (low memory for large --unbinned)"
+    parser.add_argument("--lowmem", help=msg, action="store_true")
+
+    msg = "also write each cov matrix as binary .npy (for np.load mmap_mode)"
+    parser.add_argument("--npy", help=msg, action="store_true")
     args = parser.parse_args()
     if args.subtract_vpec: args.unbinned = True
 
@@ -444,10 +457,17 @@ def get_fitopt_scales(lcfit_info, sys_scales):
 
 def get_cov_from_diff(df1, df2, scale):
     """ Returns both the covariance contribution and summary stats (slope and mean abs diff) """
+    diff, summary = get_diff_from_diff(df1, df2, scale)
+    cov = diff[:, None] @ diff[None, :]
+    return cov, summary
+
+
+def get_diff_from_diff(df1, df2, scale):
+    """ Returns the scaled MU difference vector (the rank-1 factor of the
+    covariance contribution) and summary stats """
     assert df1[VARNAME_MU].size == df2[VARNAME_MU].size, "Oh no, looks like you have a different number of bins/supernova for your systematic and this is not good."
     diff = scale * ((df1[VARNAME_MU] - df1[VARNAME_MUREF]) - (df2[VARNAME_MU] - df2[VARNAME_MUREF])).to_numpy()
     diff[~np.isfinite(diff)] = 0
-    cov = diff[:, None] @ diff[None, :]
 
     # Determine the gradient using simple linear regression
     reg = LinearRegression()
@@ -458,30 +478,58 @@ def get_cov_from_diff(df1, df2, scale):
 
     mean_abs_deviation = np.average(np.abs(diff), weights=weights)
     max_abs_deviation = np.max(np.abs(diff))
-    return cov, (coef, mean_abs_deviation, max_abs_deviation)
+    return diff, (coef, mean_abs_deviation, max_abs_deviation)
 
 
 def get_cov_from_covfile(data, covfile, scale):
     covindf = pd.read_csv(covfile,float_precision='high',low_memory=False)
-    covindf['CID1'] = covindf['CID1'].astype(str)+"_"+covindf['IDSURVEY1'].astype(str)
-    covindf['CID2'] = covindf['CID2'].astype(str)+"_"+covindf['IDSURVEY2'].astype(str)
-    covindf = covindf.set_index(["CID1", "CID2"])
-    covout = np.zeros((len(data),len(data)))
-    for i,cid1,ra1,dec1 in zip(range(len(data)),data['CIDstr'],data['RA'],data['DEC']):
-        nmissing = 0
-        for j,cid2,ra2,dec2 in zip(range(len(data)),data['CIDstr'],data['RA'],data['DEC']):
-            try:
-                covout[i,j] = covindf.loc[(cid1,cid2), "MU_COV"]
-            except KeyError:
-                nmissing+=1
-        if nmissing > 100:
-            logging.info(f'{i} {cid1} RA {ra1} DEC {dec1} \t MISSING FROM COVFILE')
-        
+    cid1 = covindf['CID1'].astype(str)+"_"+covindf['IDSURVEY1'].astype(str)
+    cid2 = covindf['CID2'].astype(str)+"_"+covindf['IDSURVEY2'].astype(str)
+
+    # map CID strings to unique-CID index once, then scatter all
+    # (i,j,MU_COV) triples; pairs with a CID not in data get index -1
+    # and are skipped. Duplicate CIDs in data (allowed by the original
+    # loop) each get the same row/column.
+    nsn       = len(data)
+    cid_code, cid_uniq = pd.factorize(data['CIDstr'])
+    nuniq     = len(cid_uniq)
+    row_index = pd.Index(cid_uniq)
+    i_list    = row_index.get_indexer(cid1)
+    j_list    = row_index.get_indexer(cid2)
+    mask      = (i_list >= 0) & (j_list >= 0)
+    i_list, j_list = i_list[mask], j_list[mask]
+
+    covout = np.zeros((nuniq,nuniq))
+    covout[i_list, j_list] = covindf['MU_COV'].to_numpy()[mask]
+    if nuniq < nsn :
+        covout = covout[np.ix_(cid_code, cid_code)]
+
+    # report missing pairs in bulk: count found (i,j) pairs per row
+    # from unique pairs, weighted by number of data rows for CID j
+    pair_list = np.unique(i_list * nuniq + j_list)
+    n_per_cid = np.bincount(cid_code, minlength=nuniq)
+    nfound    = np.bincount(pair_list // nuniq,
+                            weights=n_per_cid[pair_list % nuniq],
+                            minlength=nuniq)
+    nmissing_list = nsn - nfound[cid_code].astype(int)
+
+    for i in np.where(nmissing_list > 100)[0]:
+        cid1, ra1, dec1 = data['CIDstr'].iloc[i], data['RA'].iloc[i], data['DEC'].iloc[i]
+        logging.info(f'{i} {cid1} RA {ra1} DEC {dec1} \t MISSING FROM COVFILE')
+
+    n_unused = np.count_nonzero(~mask)
+    logging.info(f"\t {covfile}: {np.sum(nmissing_list)} of {nsn*nsn} " \
+                 f"cov elements missing; {n_unused} rows with unknown CID")
+
     return covout, (0, 0, 0)
 
-def get_contributions(m0difs, fitopt_scales, muopt_labels, muopt_scales, extracovdict):
-    """ Gets a dict mapping 'FITOPT_LABEL|MUOPT_LABEL' to covariance)"""
+def get_contributions(m0difs, fitopt_scales, muopt_labels, muopt_scales, extracovdict,
+                      lowmem=False):
+    """ Gets a dict mapping 'FITOPT_LABEL|MUOPT_LABEL' to covariance).
+    If lowmem, FITOPT/MUOPT contributions are stored as their 1D diff
+    vector d (covariance = outer(d,d)) instead of a dense NxN matrix."""
     result, slopes = {}, []
+    get_contrib = get_diff_from_diff if lowmem else get_cov_from_diff
 
     for name, df in m0difs.items():
         f, m = get_fitopt_muopt_from_name(name)
@@ -503,16 +551,19 @@ def get_contributions(m0difs, fitopt_scales, muopt_labels, muopt_scales, extraco
         if f == f_REF and m == m_REF :
             # This is the base file, so don't return anything.
             # CosmoMC will add the diag terms itself.
-            cov = np.zeros((df[VARNAME_MU].size, df[VARNAME_MU].size))
+            if lowmem:
+                cov = np.zeros(df[VARNAME_MU].size)
+            else:
+                cov = np.zeros((df[VARNAME_MU].size, df[VARNAME_MU].size))
             summary = 0, 0, 0
         elif m != m_REF :
             # This is a muopt, to compare it against the MUOPT000 for the same FITOPT
             df_compare = m0difs[get_name_from_fitopt_muopt(f, 0)]
-            cov,summary = get_cov_from_diff(df, df_compare, fitopt_scale*muopt_scale)
+            cov,summary = get_contrib(df, df_compare, fitopt_scale*muopt_scale)
         else:
             # This is a fitopt with MUOPT000, compare to base file
             df_compare = m0difs[get_name_from_fitopt_muopt(0, 0)]
-            cov, summary = get_cov_from_diff(df, df_compare, fitopt_scale)
+            cov, summary = get_contrib(df, df_compare, fitopt_scale)
 
         result[f"{fitopt_label}|{muopt_label}"] = cov
         slopes.append([name, fitopt_label, muopt_label, *summary])
@@ -569,6 +620,7 @@ def get_cov_from_covopt(covopt, contributions, base, calibrators):
                   f"'{fitopt_filter}' and MUOPT filter '{muopt_filter}'")
 
     final_cov = None
+    factors   = []  # rank-1 contributions (diff vectors) from --lowmem
 
     if calibrators:
         mask_calib = base.reset_index()["CID"].isin(calibrators)
@@ -578,17 +630,38 @@ def get_cov_from_covopt(covopt, contributions, base, calibrators):
 
         if apply_filter(fitopt_label, fitopt_filter) and \
            apply_filter(muopt_label, muopt_filter):
-            if final_cov is None:
+            # If we have calibrators and this is VPEC term, filter out calib
+            # (not applied to the first matching contribution)
+            is_first  = final_cov is None and len(factors) == 0
+            do_filter = calibrators and not is_first and \
+                (apply_filter(fitopt_label, "+VPEC") or apply_filter(muopt_label, "+VPEC"))
+
+            if cov.ndim == 1:
+                if do_filter:
+                    cov = cov.copy()
+                    cov[mask_calib.to_numpy()] = 0
+                factors.append(cov)
+            elif final_cov is None and not do_filter:
                 final_cov = cov.copy()
-            else:
-                # If we have calibrators and this is VPEC term, filter out calib
-                if calibrators and (apply_filter(fitopt_label, "+VPEC") or apply_filter(muopt_label, "+VPEC")):
-                    cov2 = cov.copy()
-                    cov2[mask_calib, :] = 0
-                    cov2[:, mask_calib] = 0
-                    final_cov += cov2
+            elif do_filter:
+                cov2 = cov.copy()
+                cov2[mask_calib, :] = 0
+                cov2[:, mask_calib] = 0
+                if final_cov is None:
+                    final_cov = cov2
                 else:
-                    final_cov += cov
+                    final_cov += cov2
+            else:
+                final_cov += cov
+
+    if len(factors) > 0:
+        # sum of outer(d,d) over all factors in a single BLAS product
+        diff_matrix = np.vstack(factors)
+        if final_cov is None:
+            final_cov = diff_matrix.T @ diff_matrix
+        else:
+            final_cov += diff_matrix.T @ diff_matrix
+        del diff_matrix
 
     assert final_cov is not None, f"No systematics matched COVOPT {label} with " \
         f"FITOPT filter '{fitopt_filter}' and MUOPT filter '{muopt_filter}'!"
@@ -666,42 +739,45 @@ def write_covariance(path, cov):
 
     cosmomc_method = config["COSMOMC_METHOD"]
     file_base      = os.path.basename(path)
-    covdet         = np.linalg.det(cov)
     nrow           = cov.shape[0]
 
+    # slogdet avoids the over/underflow of det for large matrices
+    covsign, covlogdet = np.linalg.slogdet(cov)
+
     logging.info(f"Write cov to {path}")
 
     # RK - write diagnostic to check if anything changes
-    logging.info(f"    {file_base}: size={nrow}  |cov| = {covdet:.5e}")
+    logging.info(f"    {file_base}: size={nrow}  " \
+                 f"ln|cov| = {covlogdet:.5e} (sign={covsign:.0f})")
 
     # - - - - -
-    # Write out the matrix
-    nwr = 0 ; rownum = 0; colnum=0
-
+    # Write out the matrix, formatting one full row per write
     with open(path, "w") as f:
         f.write(f"{nrow}\n")
 
-        for c in cov.flatten():
-
-            if cosmomc_method == COSMOMC_METHOD_JLA :
-                f.write(f"{c:.14f}\n")
-            else:
-                # for bbc method write human-readable cov:
-                # comment line for each new row, and off-diag elements
-                # are indented with pad_space
-                nwr += 1
-                is_new_row = False
-                pad_space  = "   "   # few spaces for off-diag
-                if (nwr-1) % nrow == 0 : 
-                    is_new_row = True ; rownum += 1 ; colnum = 0
-                colnum += 1
-                if rownum == colnum : 
-                    pad_space = ""  # no pad space for diagonal
-
-                if is_new_row:
-                    f.write(f"# -------- Begin Row {rownum} of {nrow} " \
-                            f"-----------\n")
-                f.write(f"{pad_space}{c:11.8f}\n")
+        if cosmomc_method == COSMOMC_METHOD_JLA :
+            fmt_row = "%.14f\n" * nrow
+            for row in cov:
+                f.write(fmt_row % tuple(row))
+        else:
+            # for bbc method write human-readable cov:
+            # comment line for each new row, and off-diag elements
+            # are indented with pad_space
+            fmt_diag = "%11.8f\n"
+            fmt_off  = "   %11.8f\n"   # few spaces for off-diag
+            for irow, row in enumerate(cov):
+                rownum  = irow + 1
+                fmt_row = fmt_off*irow + fmt_diag + fmt_off*(nrow-rownum)
+                f.write(f"# -------- Begin Row {rownum} of {nrow} " \
+                        f"-----------\n")
+                f.write(fmt_row % tuple(row))
+
+    # optional binary copy that can be memory-mapped with
+    # np.load(file, mmap_mode='r')
+    if config.get('write_npy',False):
+        path_npy = Path(path).with_suffix(".npy")
+        logging.info(f"Write binary cov to {path_npy}")
+        np.save(path_npy, np.ascontiguousarray(cov, dtype=np.float64))
 
 
 def write_cosmomc_output(config, covs, base):
@@ -896,7 +972,8 @@ def create_covariance(config, args):
     data, base = remove_nans(data)
     # Now that we have the data, figure out how each much each FITOPT/MUOPT pair contributes to cov
     contributions, summary = get_contributions(data, fitopt_scales,
-                                               muopt_labels, muopt_scales, extracovdict)
+                                               muopt_labels, muopt_scales, extracovdict,
+                                               lowmem=args.lowmem)
     # find contributions which match to construct covs for each COVOPT
     logging.info(f"Compute covariance for COVOPTS")
     covopts = ["[ALL] [,]"] + config.get("COVOPTS",[])  # Adds covopt to compute everything
@@ -923,6 +1000,7 @@ def prep_config(config,args):
     #sys.exit(f" xxx nbin(x1,c) = {args.nbin_x1} {args.nbin_c} ")
     config['nbin_x1'] = args.nbin_x1
     config['nbin_c']  = args.nbin_c
+    config['write_npy'] = args.npy
 
     # check override args (RK, Feb 15 2021)
 
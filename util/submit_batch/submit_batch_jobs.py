@@ -22,6 +22,8 @@
 # Jan 22 2021: garbage above CONFIG is ignored.
 # Jan 23 2021: begin adding train_SALT3
 # May 24 2021: call submit_iter2()
+# Oct 17 2026: add --merge_daemon arg
+# Oct 17 2026: add --job_queue arg
 #
 # - - - - - - - - - -
 
@@ -99,6 +101,14 @@ def get_args():
     msg = "abort on missing DOCANA keys in maps & libraries"
     parser.add_argument("--require_docana", help=msg, action="store_true")
 
+    msg = "run one long-lived merge process instead of a merge task " + \
+          "after each job (see -H MERGE)"
+    parser.add_argument("--merge_daemon", help=msg, action="store_true")
+
+    msg = "cores claim jobs from shared queue instead of fixed " + \
+          "assignment (see -H MERGE)"
+    parser.add_argument("--job_queue", help=msg, action="store_true")
+
     msg = "DEBUG MODE: submit jobs, but skip merge process"
     parser.add_argument("--nomerge", help=msg, action="store_true")
 
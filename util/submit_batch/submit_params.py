@@ -77,6 +77,9 @@ MERGE_LOG_FILE    = "MERGE.LOG"
 SUBMIT_INFO_FILE  = "SUBMIT.INFO"
 TABLE_SPLIT       = "SPLIT"  # yaml table in MERGE.LOG
 TABLE_MERGE       = "MERGE"  # yaml table in MERGE.LOG
+MERGE_JOURNAL_FILE = "MERGE.JOURNAL" # json copy of MERGE.LOG tables
+MERGE_JOURNAL_COMPACT = 4   # rewrite journal if n_update > 4*n_row
+JOB_STATS_CACHE_FILE  = "JOB_YAML.CACHE" # parsed split-job YAML files
 
 # True -> uses 'set -e' in each CPU*.CMD script to stop all
 # all future processing upon any merge failures.
@@ -113,6 +116,55 @@ DEFAULT_DONE_FILE = "ALL.DONE"  # default if DONE_STAMP not in CONFIG
 BUSY_FILE_PREFIX = "BUSY_MERGE_CPU"
 BUSY_FILE_SUFFIX = "LOCK"
 
+# optional merge service (--merge_daemon): one long-lived merge process
+# runs in background of CPU0000 script, and each SciJob drops a token
+# file in MERGE_SPOOL_DIR instead of launching its own merge task.
+MERGE_SPOOL_DIR        = "MERGE_SPOOL"   # subdir of script_dir
+MERGE_SPOOL_SUFFIX     = "TOKEN"
+T_SLEEP_MERGE_DAEMON   = 5     # sec between checks for new tokens
+T_UPDATE_MERGE_DAEMON  = 300   # sec: check states even without new token
+MERGE_ALIVE_SUFFIX     = "ALIVE" # touched by each running CPU script
+T_ALIVE_MERGE_DAEMON   = 60    # sec between touches of ALIVE file
+T_DEAD_MERGE_DAEMON    = 600   # sec: older ALIVE file -> CPU script ended
+T_IDLE_MERGE_DAEMON    = 14400 # sec: stop waiting for CPU scripts that
+                               #  never started (e.g., cancelled in queue)
+
+# completion detection for monitor tasks (see util.wait_for_files):
+# each job appends name of its DONE file to DONE_MANIFEST_FILE, and
+# wait uses inotify (Linux) with exponential-backoff polling.
+DONE_MANIFEST_FILE     = "DONE_MANIFEST.LIST"  # in dir of DONE files
+T_SLEEP_WAIT_FILES     = [ 1, 20, 120 ]  # min,max sleep, full-scan (sec)
+T_SLEEP_BUSY_WAIT      = [ 0.5, 5 ]      # min,max sleep for BUSY files
+INOTIFY_MASK           = 0x08 | 0x80 | 0x100 | 0x200 # CLOSE_WRITE,MOVED_TO,
+                                                     # CREATE,DELETE
+INOTIFY_FLAGS          = 0o4000 | 0o2000000  # IN_NONBLOCK | IN_CLOEXEC
+
+# max number of threads to merge tables for newly DONE rows in
+# MERGE table (LCFIT only; see merge_job_wrapup_pool)
+NTHREAD_MERGE_WRAPUP   = 8
+
+# max number of concurrent batch-submit (e.g., sbatch) calls in launch_jobs
+NTHREAD_BATCH_SUBMIT   = 16
+
+# BBC catenation of INPDIR+ FITRES files (see util.catenate_table_TEXT):
+# max number of processes, and value for column missing in some files
+NPROC_CAT_TABLE        = 8
+NULL_VALUE_MISSING     = "-9.0"
+VARNAME_MISSING_CAT    = "PROB*"
+
+# moving sim data files to merged GENVERSION (see move_sim_data_files):
+# number of gzip threads, and journal of DUMP-file appends in
+# GENVERSION dir, so that interrupted merge can resume.
+NTHREAD_GZIP           = 8
+GZIP_LEVEL             = 6       # same as default for linux gzip
+MOVE_JOURNAL_FILE      = "MOVE_FILES.JOURNAL"
+
+# optional work-stealing job queue (--job_queue): each job is a separate
+# script in JOB_QUEUE_DIR, and each CPU*CMD script claims the next job
+# by renaming it (atomic) JOBQ[rank]_JOB[ijob].CMD -> *.CPU[icpu]
+JOB_QUEUE_DIR          = "JOB_QUEUE"     # subdir of script_dir
+JOB_QUEUE_SUFFIX       = "CMD"           # suffix for unclaimed job
+
 # define processing states
 COLNUM_MERGE_STATE = 0  # first colmun of any MERGE table must be STATE
 SUBMIT_STATE_WAIT = "WAIT"
@@ -694,6 +746,34 @@ expected sequence of events:
     all merge tasks are done. It runs only the cleanup to compress and 
     create summary file(s).
 
+MERGE SERVICE (--merge_daemon)
+For many split jobs, launching a python merge task after every SciJob
+wastes node time re-reading SUBMIT.INFO and MERGE.LOG, and fights over
+BUSY*LOCK files. With
+   submit_batch_jobs.py <inputFile> --merge_daemon
+CPU0000 starts a single merge service in the background at the top of
+its CMD script, and after each SciJob the CMD scripts only do
+   touch [script_dir]/{MERGE_SPOOL_DIR}/JOB[ijob]_CPU[icpu].{MERGE_SPOOL_SUFFIX}
+The merge service keeps SUBMIT.INFO and MERGE.LOG in memory, runs the
+merge update each time new tokens appear (or every {T_UPDATE_MERGE_DAEMON} sec),
+and re-writes MERGE.LOG only when a state changes. After all DONE files
+exist it runs the final cleanup and exits; CPU0000 waits for it.
+Each CMD script also touches
+   [script_dir]/{MERGE_SPOOL_DIR}/CPU[icpu].{MERGE_ALIVE_SUFFIX}
+every {T_ALIVE_MERGE_DAEMON} sec while it runs. If DONE files are missing but
+no CMD script is running (e.g., killed by walltime), the merge service
+marks the unfinished jobs FAIL and exits.
+
+       JOB QUEUE (--job_queue)
+By default, jobs are assigned to cores before submit. With
+   submit_batch_jobs.py <inputFile> --job_queue
+each job (plus its merge task) is written to a separate script,
+   [script_dir]/{JOB_QUEUE_DIR}/JOBQ[rank]_JOB[ijob].{JOB_QUEUE_SUFFIX}
+where rank is the run order (largest predicted job first). Each
+CPU*CMD script is a worker loop that claims the next unclaimed job
+with an atomic rename to *.CPU[icpu] and runs it, until the queue is
+empty; a fast core thus takes over jobs from a slow core. The final
+merge (-M) runs on CPU0000 after its worker loop, unless --merge_daemon.
 
 """
 
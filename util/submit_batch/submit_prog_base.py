@@ -21,13 +21,39 @@
 #
 # May 24 2021: new function submit_iter2()
 #
+# Oct 17 2026: optional merge service (--merge_daemon); see
+#              merge_daemon_driver().
+#
+# Oct 17 2026: pack jobs on cores with LPT heuristic using CPU history
+#              from previous submit (see prep_job_pack).
+#
+# Oct 17 2026: optional work-stealing job queue (--job_queue); see
+#              open_job_file() and write_job_queue_worker().
+#
+# Oct 17 2026: monitor tasks wait for DONE/BUSY files with inotify
+#              and backoff polling, and count DONE files from manifest
+#              (see util.wait_for_files).
+#
+# Oct 17 2026: run merge_job_wrapup for newly DONE rows on a thread pool
+#              if program allows it (see merge_job_wrapup_pool).
+#
+# Oct 17 2026: merge processes read MERGE.LOG tables from json journal
+#              and append only changed rows (see util.read_merge_state).
+#
+# Oct 17 2026: cache parsed split-job YAML files across merge processes
+#              (see read_job_yaml).
+#
+# Oct 17 2026: submit batch jobs concurrently and read pid from sbatch
+#              output; remove per-core sleep added Jan 2 2021.
+#
 # ============================================
 
 #import argparse
 import os, sys, shutil, yaml
 import logging, coloredlogs
 import datetime, time, subprocess
-import getpass, ntpath, glob
+import getpass, ntpath, glob, contextlib, json, io, zlib
+import threading, concurrent.futures
 
 #from   datetime import datetime
 from   abc import ABC, abstractmethod
@@ -312,6 +338,14 @@ class Program:
         #
         # Jan 21 2201: write_command_file returns n_job_cpu;
         #     if n_job_cpu==0, add extra delay to avoid npid error
+        #
+        # Oct 17 2026: for --merge_daemon, CPU0000 launches merge 
+        #     service in background and waits for it at the end.
+        #     Each CPU script also touches ALIVE file while it runs.
+        # Oct 17 2026: for --job_queue, jobs are written to JOB_QUEUE_DIR
+        #     and each CMD file is a worker loop claiming jobs.
+        # Oct 17 2026: remove per-core delay and no-job sleep; pid of
+        #     each batch job is read from sbatch output (launch_jobs).
 
         CONFIG      = self.config_yaml['CONFIG']
         input_file  = self.config_yaml['args'].input_file 
@@ -322,6 +356,18 @@ class Program:
         node_list   = self.config_prep['node_list']
         program     = self.config_prep['program']
         submit_iter = self.config_prep['submit_iter']
+        no_merge    = self.config_yaml['args'].nomerge
+        use_daemon  = self.config_yaml['args'].merge_daemon and not no_merge
+        use_queue   = self.config_yaml['args'].job_queue
+
+        # create spool dir for job-finished tokens read by merge service
+        if use_daemon :
+            os.mkdir(f"{script_dir}/{MERGE_SPOOL_DIR}")
+
+        # create dir for job scripts claimed by workers
+        if use_queue :
+            os.mkdir(f"{script_dir}/{JOB_QUEUE_DIR}")
+            self.config_prep['n_job_queue'] = 0
 
         # for each cpu, store name of script and batch file
         command_file_list = []  # command file name, no path
@@ -355,13 +401,6 @@ class Program:
                 ii        = f"iter{submit_iter}"
                 job_name  = f"{input_file}_{ii}-{cpu_name}"
 
-            # compute small (0.1s) delay per core to avoid first jobs
-            # finishing before all are submitted, then failing
-            # the pid-submit check. Delay is largest for core 0, 
-            # then is reduced by 0.2 sec per core. For 100 cores,
-            # first delay is 20 sec.
-            delay = float(n_core - icpu)/5.0
-
             command_file_list.append(command_file)
             cmdlog_file_list.append(log_file)
             COMMAND_FILE_LIST.append(COMMAND_FILE)
@@ -377,10 +416,6 @@ class Program:
                 f.write(f"echo TIME_START: " \
                         f"`date +%Y-%m-%d` `date +%H:%M:%S` \n")
 
-                f.write(f"echo 'Sleep {delay} sec " \
-                        f"(wait for remaining batch-submits)' \n")
-                f.write(f"sleep {delay} \n")
-
                 f.write(f"echo ' ' \n")
 
                 f.write(f"echo 'Begin {command_file}' \n\n")
@@ -390,18 +425,28 @@ class Program:
                 #if 'SNANA_LOGIN_SETUP' in CONFIG:
                 #    f.write(f"{CONFIG['SNANA_LOGIN_SETUP']} \n")
 
+                if use_daemon :
+                    self.write_merge_alive_task(icpu,f)
+
+                if use_daemon and icpu == 0 :
+                    self.write_merge_daemon_task(f)
+
                 # write program-specific content
                 n_job_cpu = self.write_command_file(icpu,f)
 
-                # if there are no jobs, sleep another 5 seconds so that
-                # batch job does not immediately exit and fail npid check.
-                if n_job_cpu == 0 :
-                    f.write(f"echo 'No jobs -> sleep 10s to " \
-                            f"ensure npid check is ok' \n")
-                    f.write(f"sleep 10 \n")
-                else:
+                # jobs went to queue; write worker loop to claim them
+                if use_queue :
+                    n_job_cpu = self.write_job_queue_worker(icpu,f)
+
+                if n_job_cpu > 0 :
                     n_core_with_jobs += 1
 
+                # keep CPU0000 alive until merge service has finished
+                if use_daemon and icpu == 0 :
+                    f.write(f"kill $ALIVE_PID \n")
+                    f.write(f"echo 'Wait for merge service to finish' \n")
+                    f.write(f"wait \n")
+
             # - - - - - 
             # write extra batch file for batch mode
             if ( submit_mode == SUBMIT_MODE_BATCH ):
@@ -506,8 +551,15 @@ class Program:
         #  --cpunum <cpunum>  in case specific CPU needs to be identified    
         #
         #  May 24 2021: check outdir override from command line
+        #  Oct 17 2026: with --merge_daemon, also return token file
+        #               to touch instead of running merge task.
+        #  Oct 17 2026: with --job_queue, cpu is not known until job is
+        #               claimed -> --cpunum $CPUNUM (set by worker loop),
+        #               and ijob=None is the -M task after worker loop.
         input_file     = self.config_yaml['args'].input_file
         no_merge       = self.config_yaml['args'].nomerge
+        merge_daemon   = self.config_yaml['args'].merge_daemon
+        use_queue      = self.config_yaml['args'].job_queue
         output_dir_override = self.config_yaml['args'].outdir 
         devel_flag          = self.config_yaml['args'].devel_flag
 
@@ -524,7 +576,16 @@ class Program:
 
         # - - - - 
         # determine if this is last job for this cpu
-        last_job_cpu  = (n_job_tot - ijob) < n_core
+        if use_queue :
+            last_job_cpu  = ijob is None
+            ijob_last     = None
+        elif 'job_pack' in self.config_prep :
+            job_pack      = self.config_prep['job_pack']
+            last_job_cpu  = ijob == job_pack['cpu_job_list'][icpu][-1]
+            ijob_last     = job_pack['ijob_last']
+        else:
+            last_job_cpu  = (n_job_tot - ijob) < n_core
+            ijob_last     = n_job_tot
  
         # check where to flag last merge process with -M
         if NCPU_MERGE_DISTRIBUTE == 0 :
@@ -532,12 +593,15 @@ class Program:
             last_merge =  last_job_cpu and icpu == 0
         else:
             # last merge is after last job, regardless of cpunum
-            last_merge =  ijob == n_job_tot
+            last_merge =  ijob == ijob_last
 
         m_arg = "-m"
         if last_merge :  m_arg = "-M" 
 
-        arg_list = (f"{m_arg} -t {Nsec} --cpunum {icpu}")
+        cpunum = icpu
+        if use_queue and not last_merge : cpunum = "$CPUNUM"
+
+        arg_list = (f"{m_arg} -t {Nsec} --cpunum {cpunum}")
 
         # check for outdir override (May 24 2021)
         if output_dir_override is not None:
@@ -549,11 +613,253 @@ class Program:
 
         JOB_INFO['merge_input_file']  = input_file
         JOB_INFO['merge_arg_list']    = arg_list
+
+        if merge_daemon and ijob is not None :
+            script_dir  = self.config_prep['script_dir']
+            spool_file  = (f"JOB{ijob:05d}_CPU{icpu:04d}.{MERGE_SPOOL_SUFFIX}")
+            JOB_INFO['merge_spool_file'] = \
+                (f"{script_dir}/{MERGE_SPOOL_DIR}/{spool_file}")
         
         return JOB_INFO
 
         # prep_JOB_INFO_merge
 
+    def read_cost_history(self,output_dir):
+
+        # Created Oct 2026
+        # Read MERGE.LOG and SUBMIT.INFO from previous submit in 
+        # output_dir, and return dictionary of CPU minutes per job
+        # (cost_history[key]) from program-specific 
+        # get_merge_cost_history(). History is optional, so return
+        # empty dictionary if files are missing or cannot be parsed.
+
+        MERGE_LOG_PATHFILE = (f"{output_dir}/{MERGE_LOG_FILE}")
+        INFO_PATHFILE      = (f"{output_dir}/{SUBMIT_INFO_FILE}")
+        cost_history       = {}
+
+        if not os.path.isfile(MERGE_LOG_PATHFILE) : return cost_history
+        if not os.path.isfile(INFO_PATHFILE)      : return cost_history
+
+        try:
+            MERGE_INFO_CONTENTS,comment_lines = \
+                util.read_merge_file(MERGE_LOG_PATHFILE)
+            submit_info_yaml = util.extract_yaml(INFO_PATHFILE, None, None)
+            cost_history = self.get_merge_cost_history(MERGE_INFO_CONTENTS,
+                                                       submit_info_yaml)
+        except Exception as e:
+            logging.info(f"  Ignore CPU history in {MERGE_LOG_FILE}: {e}")
+            cost_history = {}
+
+        if len(cost_history) > 0 :
+            logging.info(f"  Found CPU history for {len(cost_history)} " \
+                         f"job types in previous {MERGE_LOG_FILE}")
+        return cost_history
+
+        # end read_cost_history
+
+    def get_merge_cost_history(self, MERGE_INFO_CONTENTS, submit_info_yaml):
+        # Return dictionary of CPU minutes per job from MERGE.LOG tables
+        # of a previous submit; key must match the key_list passed to
+        # prep_job_pack. Default is no history.
+        return {}
+
+    def prep_job_pack(self, key_list, est_list):
+
+        # Created Oct 2026
+        # Assign jobs to cores to minimize wall time (makespan).
+        # Inputs:
+        #   key_list[j] = job-type key to look up CPU history
+        #                 (e.g., VERSION+FITOPT, or sim TMP-GENVERSION)
+        #   est_list[j] = fall-back cost estimate (e.g., number of events)
+        #
+        # Predicted cost is CPU history if available; otherwise the 
+        # estimate is scaled to CPU minutes using jobs that have both;
+        # if no job has history, the estimate is used for all jobs.
+        # Jobs are then packed with util.pack_jobs_lpt; equal costs
+        # result in the original round-robin assignment.
+        #
+        # Stores config_prep['job_pack'] with
+        #   cpu_job_list[icpu] : job indices (1 to n_job) in run order
+        #   ijob_last          : job to run last merge task (-M); 
+        #                        last job on core with max load.
+
+        n_core       = self.config_prep['n_core']
+        cost_history = self.config_prep.get('cost_history',{})
+        n_job        = len(key_list)
+
+        # scale for estimate -> CPU minutes
+        sum_cpu = 0.0 ;  sum_est = 0.0;  n_hist = 0
+        for key, est in zip(key_list,est_list):
+            if key in cost_history and cost_history[key] > 0.0 :
+                n_hist  += 1
+                sum_cpu += cost_history[key]
+                sum_est += est
+
+        use_hist = n_hist > 0 and sum_est > 0.0
+        cost_list = []
+        for key, est in zip(key_list,est_list):
+            if use_hist and key in cost_history and cost_history[key] > 0.0 :
+                cost = cost_history[key]
+            elif use_hist :
+                cost = est * sum_cpu / sum_est
+            else:
+                cost = est
+            cost_list.append(float(cost))
+
+        cpu_job_list, load_list = util.pack_jobs_lpt(cost_list, n_core)
+
+        # last merge task goes after last job on core with max load;
+        # for equal loads pick largest job index (as for round-robin)
+        ijob_last = 0;  load_last = -1.0
+        for icpu in range(0,n_core):
+            if len(cpu_job_list[icpu]) == 0 : continue
+            ijob = cpu_job_list[icpu][-1]
+            load = load_list[icpu]
+            if (load,ijob) > (load_last,ijob_last) :
+                ijob_last = ijob ;  load_last = load
+
+        # compare predicted wall time with round-robin
+        load_rr = [ 0.0 ] * n_core
+        for j in range(0,n_job) : load_rr[j % n_core] += cost_list[j]
+        unit = "CPU-minutes" if use_hist else "(est)"
+        logging.info(f"  Pack {n_job} jobs on {n_core} cores " \
+                     f"({n_hist} with CPU history): ")
+        logging.info(f"\t predicted max load per core = " \
+                     f"{max(load_list):.1f} {unit}  " \
+                     f"(round-robin: {max(load_rr):.1f})")
+
+        # for job queue, all jobs are written once (icpu=0) in the
+        # LPT order so that workers claim largest jobs first.
+        if self.config_yaml['args'].job_queue :
+            job_order    = sorted(range(1,n_job+1), 
+                                  key=lambda j: (-cost_list[j-1], j))
+            cpu_job_list = [ job_order ] + [ [] ] * (n_core-1)
+            ijob_last    = None
+
+        job_pack = {
+            'cpu_job_list' : cpu_job_list,
+            'ijob_last'    : ijob_last
+        }
+        self.config_prep['job_pack'] = job_pack
+
+        # end prep_job_pack
+
+    @contextlib.contextmanager
+    def open_job_file(self, f, icpu, ijob):
+
+        # Created Oct 2026
+        # Return (file pointer, cpunum) to write commands for job ijob.
+        # By default this is the CPU command file f and icpu.
+        # With --job_queue, each job is a separate script in 
+        # JOB_QUEUE_DIR named by rank (order written), and the cpu 
+        # is known only when the job is claimed (CPUNUM env).
+        #
+        # Usage in write_command_file:
+        #   with self.open_job_file(f, icpu, ijob) as (fjob, cpunum):
+        #       util.write_job_info(fjob, job_info, cpunum)
+
+        if not self.config_yaml['args'].job_queue :
+            yield f, icpu
+            return
+
+        script_dir  = self.config_prep['script_dir']
+        self.config_prep['n_job_queue'] += 1
+        rank        = self.config_prep['n_job_queue']
+        job_file    = (f"JOBQ{rank:05d}_JOB{ijob:05d}.{JOB_QUEUE_SUFFIX}")
+        with open(f"{script_dir}/{JOB_QUEUE_DIR}/{job_file}", 'w') as fjob:
+            fjob.write(f"#!/usr/bin/env bash \n")
+            fjob.write(f"echo 'Begin {job_file} on CPU'$CPUNUM \n\n")
+            if STOP_ALL_ON_MERGE_ERROR :
+                fjob.write(f"set -e \n")
+            yield fjob, "$CPUNUM"
+
+        # end open_job_file
+
+    def write_job_queue_worker(self, icpu, f):
+
+        # Created Oct 2026
+        # Write worker loop for --job_queue: claim next unclaimed job
+        # script with atomic rename (only one worker can succeed),
+        # and run it; stop when nothing is left to claim. All jobs
+        # are written before any worker starts, so a single glob is
+        # enough. CPU0000 runs final merge (-M) after its loop.
+        # Returns number of jobs in queue.
+
+        script_dir  = self.config_prep['script_dir']
+        n_job_tot   = self.config_prep['n_job_tot']
+        n_job_queue = self.config_prep['n_job_queue']
+        program     = self.config_prep['program']
+        queue_dir   = f"{script_dir}/{JOB_QUEUE_DIR}"
+        cpu_name    = f"CPU{icpu:04d}"
+
+        if n_job_queue != n_job_tot :
+            msgerr = []
+            msgerr.append(f"Expected {n_job_tot} jobs in {JOB_QUEUE_DIR}")
+            msgerr.append(f"but found {n_job_queue}; --job_queue " \
+                          f"is not implemented for {program}")
+            self.log_assert(False,msgerr)
+
+        f.write(f"# ---------------------------------------------------- \n")
+        f.write(f"export CPUNUM={icpu} \n")
+        f.write(f"for job_file in {queue_dir}/*.{JOB_QUEUE_SUFFIX} ; do \n")
+        f.write(f"  claim_file=${{job_file%.{JOB_QUEUE_SUFFIX}}}.{cpu_name}\n")
+        f.write(f"  mv $job_file $claim_file 2>/dev/null || continue \n")
+        f.write(f"  sh $claim_file \n")
+        f.write(f"done \n")
+        f.write(f"echo 'No more jobs in {JOB_QUEUE_DIR}' \n\n")
+
+        if icpu == 0 and not self.config_yaml['args'].merge_daemon :
+            job_info_merge = self.prep_JOB_INFO_merge(icpu,None)
+            util.write_jobmerge_info(f, job_info_merge, icpu)
+
+        return n_job_queue
+
+        # end write_job_queue_worker
+
+    def write_merge_alive_task(self,icpu,f):
+        # Created Oct 2026
+        # For --merge_daemon, write background loop that touches
+        #    {script_dir}/MERGE_SPOOL/CPU[icpu].ALIVE
+        # every T_ALIVE_MERGE_DAEMON sec while this CPU script runs.
+        # Loop ends when the script exits or is killed (kill -0 $$),
+        # so that merge service can tell that a script has ended
+        # without writing all of its DONE files.
+
+        script_dir  = self.config_prep['script_dir']
+        alive_file  = (f"{script_dir}/{MERGE_SPOOL_DIR}/" \
+                       f"CPU{icpu:04d}.{MERGE_ALIVE_SUFFIX}")
+
+        f.write(f"( while kill -0 $$ 2>/dev/null ; do " \
+                f"touch {alive_file} ; sleep {T_ALIVE_MERGE_DAEMON} ; " \
+                f"done ) & \n")
+        f.write(f"ALIVE_PID=$! \n\n")
+
+        # end write_merge_alive_task
+
+    def write_merge_daemon_task(self,f):
+        # Created Oct 2026
+        # Write background launch of the merge service to CPU0000 
+        # script; stdout goes to the CPU0000 log. The merge service
+        # takes the role of the -M merge task (cpunum=0), and all
+        # SciJobs only touch a token file (see prep_JOB_INFO_merge).
+
+        input_file          = self.config_yaml['args'].input_file
+        output_dir_override = self.config_yaml['args'].outdir 
+        devel_flag          = self.config_yaml['args'].devel_flag
+        Nsec                = seconds_since_midnight
+
+        arg_list = (f"-m --merge_daemon -t {Nsec} --cpunum 0")
+        if output_dir_override is not None:
+            arg_list += f"  --outdir {output_dir_override}"
+        if devel_flag != 0 :
+            arg_list += f" --devel_flag {devel_flag}"
+
+        merge_task = (f"{sys.argv[0]} {input_file} {arg_list}")
+        f.write(f"echo 'Launch merge service in background' \n")
+        f.write(f"( cd {CWD} ; {merge_task} ) & \n\n")
+
+        # end write_merge_daemon_task
+
 
     def create_info_file(self):
 
@@ -680,6 +986,9 @@ class Program:
         if kill_flag : return
         # - - - - - - - - - 
 
+        # read CPU history of previous submit before clobbering it
+        self.config_prep['cost_history'] = self.read_cost_history(output_dir)
+
         logging.info(f" Create output dir:\n   {output_dir}")
         if  os.path.exists(output_dir) : shutil.rmtree(output_dir)
         os.mkdir(output_dir)
@@ -726,15 +1035,28 @@ class Program:
         if submit_mode == SUBMIT_MODE_BATCH :
             batch_command    = self.config_prep['batch_command'] 
             batch_file_list  = self.config_prep['batch_file_list']
-            for batch_file in batch_file_list :
-                cmd = (f"{cddir} ; {batch_command} {batch_file}")
-                #os.system(cmd)
+            n_thread = min(NTHREAD_BATCH_SUBMIT, len(batch_file_list))
+            n_thread = max(n_thread,1)
+            logging.info(f"  Submit {len(batch_file_list)} batch jobs " \
+                         f"with {batch_command} ({n_thread} threads)")
 
-                ret = subprocess.run( [ batch_command, batch_file], 
-                                      cwd=script_dir,
-                                      capture_output=True, text=True )
+            # submit calls wait on scheduler, so run them concurrently;
+            # results are returned in order of batch_file_list.
+            with concurrent.futures.ThreadPoolExecutor(n_thread) as pool:
+                ret_list = list(pool.map(self.submit_batch_file,
+                                         batch_file_list))
 
-            self.fetch_slurm_pid_list()
+            msgerr = []
+            for batch_file, ret in zip(batch_file_list, ret_list):
+                if ret.returncode != 0 :
+                    msgerr.append(f"{batch_command} {batch_file} failed " \
+                                  f"with: {ret.stderr.strip()}")
+            if len(msgerr) > 0 :
+                msgerr.append(f"Check for {batch_command} problem; " \
+                              f"e.g., njob limit.")
+                self.log_assert(False, msgerr)
+
+            self.fetch_slurm_pid_list(ret_list)
 
         else:
             # SSH
@@ -767,6 +1089,20 @@ class Program:
                 #print(f" xxx {node} ret = {ret}")
 
         # end launch_jobs
+
+    def submit_batch_file(self, batch_file):
+
+        # Created Oct 2026
+        # submit one batch_file; called from launch_jobs thread pool.
+        # Returns subprocess result with stdout of batch_command.
+
+        batch_command  = self.config_prep['batch_command'] 
+        script_dir     = self.config_prep['script_dir']
+        ret = subprocess.run( [ batch_command, batch_file], 
+                              cwd=script_dir,
+                              capture_output=True, text=True )
+        return ret
+        # end submit_batch_file
         
     def submit_iter2(self):
 
@@ -798,10 +1134,14 @@ class Program:
         # .xyz
         # end launch_jobs_iter2
 
-    def fetch_slurm_pid_list(self):
+    def fetch_slurm_pid_list(self, ret_list):
 
         # for sbatch, fetch process id for each CPU; otherwise do nothing.
         # Nov 25 2020: list all pid failures before aborting.
+        # Oct 17 2026: read pid from sbatch output in ret_list 
+        #   ("Submitted batch job <pid>") so that jobs finishing 
+        #   before squeue is called cannot fail the pid check.
+        #   squeue is used only if pid cannot be read from sbatch output.
 
         batch_command    = self.config_prep['batch_command']
         output_dir       = self.config_prep['output_dir']
@@ -810,21 +1150,31 @@ class Program:
         msgerr = []
         if batch_command != 'sbatch' : return
 
-        # prep squeue command with format: i=pid, j=jobname            
-        cmd = (f"squeue -u {USERNAME} -h -o '%i %j' ")
-        ret = subprocess.run( [cmd], shell=True, 
-                              capture_output=True, text=True )
-        pid_all = ret.stdout.split()
+        pid_list = []
+        for ret in ret_list :
+            # last word is pid; --parsable output is pid[;cluster]
+            word_list = ret.stdout.split()
+            pid = word_list[-1].split(';')[0] if len(word_list) > 0 else ''
+            pid_list.append(pid if pid.isdigit() else None)
+
+        if None in pid_list :
+            # prep squeue command with format: i=pid, j=jobname            
+            cmd = (f"squeue -u {USERNAME} -h -o '%i %j' ")
+            ret = subprocess.run( [cmd], shell=True, 
+                                  capture_output=True, text=True )
+            pid_all = ret.stdout.split()
         
         INFO_PATHFILE  = (f"{output_dir}/{SUBMIT_INFO_FILE}")
         f = open(INFO_PATHFILE, 'a') 
         f.write(f"\nSBATCH_LIST:  # [CPU,PID,JOB_NAME] \n")
 
         npid_fail = 0 ; njob_tot = len(job_name_list)
-        for job_name in job_name_list :
-            if job_name in pid_all:
+        for job_name, pid in zip(job_name_list, pid_list) :
+            if pid is None and job_name in pid_all:
                 j_job    = pid_all.index(job_name)
                 pid      = pid_all[j_job-1]
+
+            if pid is not None :
                 cpunum   = int(job_name[-4:])
                 logging.info(f"\t pid = {pid} for {job_name}")
                 f.write(f"  - [ {cpunum:3d}, {pid}, {job_name} ] \n")
@@ -901,6 +1251,11 @@ class Program:
         # make sure time stamps are consistent
         self.merge_check_time_stamp(output_dir)
 
+        # merge service handles all merge tasks for this submit
+        if self.config_yaml['args'].merge_daemon :
+            self.merge_daemon_driver()
+            return
+
         # if last merge call (-M), then must wait for all of the done
         # files since there will be no more chances to merge.
         if MERGE_LAST : self.merge_last_wait()
@@ -917,53 +1272,212 @@ class Program:
         logging.info(f"# {fnam}: examine {MERGE_LOG_FILE}")
         MERGE_LOG_PATHFILE  = (f"{output_dir}/{MERGE_LOG_FILE}")
         MERGE_INFO_CONTENTS,comment_lines = \
-            util.read_merge_file(MERGE_LOG_PATHFILE)
+            util.read_merge_state(MERGE_LOG_PATHFILE)
+
+        self.merge_config_prep(output_dir)  # restore config_prep
+
+        n_done, n_job_merge = \
+            self.merge_update_pass(MERGE_INFO_CONTENTS, comment_lines,
+                                   not MERGE_LAST)
+
+        # Only last merge process does cleanup tasks and DONE stamps
+        if MERGE_LAST and n_done == n_job_merge :
+            self.merge_final_wrapup()
+
+        # remove busy lock file
+        self.set_merge_busy_lock(-1)
+        
+        # end merge_driver
+
+    def merge_daemon_driver(self):
+
+        # Created Oct 2026
+        # Merge service for --merge_daemon: one process, launched in
+        # background by CPU0000 script, replaces the merge task after
+        # each SciJob. Each SciJob touches a token file in
+        #     {script_dir}/MERGE_SPOOL
+        # and this process
+        #   + reads SUBMIT.INFO and MERGE.LOG only once, and keeps
+        #     the MERGE.LOG tables in memory,
+        #   + runs a merge update pass whenever new tokens appear, or
+        #     every T_UPDATE_MERGE_DAEMON sec (e.g., if a job dies before
+        #     writing its token),
+        #   + re-writes MERGE.LOG only when a STATE changes,
+        #   + after all DONE files exist, does the same final pass and
+        #     cleanup as the -M merge task,
+        #   + if DONE files are missing but no CPU script is running
+        #     (ALIVE files older than T_DEAD_MERGE_DAEMON), does a final
+        #     pass and marks unfinished jobs FAIL (merge_fail_missing).
+        #     CPU scripts that never started are given up after
+        #     T_IDLE_MERGE_DAEMON sec without any activity.
+        # The BUSY lock is held for the lifetime of the service so that
+        # an interactive 'submit_batch_jobs.py <inFile> -m' exits.
+
+        fnam             = "merge_daemon"
+        output_dir       = self.config_prep['output_dir']
+        submit_info_yaml = self.config_prep['submit_info_yaml']
+        script_dir       = submit_info_yaml['SCRIPT_DIR'] 
+        n_done_tot       = submit_info_yaml['N_DONE_TOT']
+        jobfile_wildcard = submit_info_yaml['JOBFILE_WILDCARD']
+        n_core           = submit_info_yaml['N_CORE']
+        done_wildcard    = (f"{jobfile_wildcard}.DONE")
+        token_wildcard   = (f"*.{MERGE_SPOOL_SUFFIX}")
+        alive_wildcard   = (f"*.{MERGE_ALIVE_SUFFIX}")
+        spool_dir        = (f"{script_dir}/{MERGE_SPOOL_DIR}")
+
+        self.set_merge_busy_lock(+1)
+
+        logging.info(f"# {fnam}: examine {MERGE_LOG_FILE}")
+        MERGE_LOG_PATHFILE  = (f"{output_dir}/{MERGE_LOG_FILE}")
+        MERGE_INFO_CONTENTS,comment_lines = \
+            util.read_merge_state(MERGE_LOG_PATHFILE)
 
         self.merge_config_prep(output_dir)  # restore config_prep
 
+        n_token_tot = 0 ;  n_pass = 0;  t_last_pass = 0.0
+        n_done_file = 0 ;  t_activity  = time.time()
+        last_pass   = False ;  stop_dead = False
+        fd          = util.open_dir_watch(spool_dir)
+        manifest    = {}
+
+        while not last_pass :
+            token_list = glob.glob1(spool_dir, token_wildcard)
+            n_token    = len(token_list)
+            t_now      = time.time()
+            if n_token == 0 and t_now - t_last_pass < T_UPDATE_MERGE_DAEMON :
+                util.wait_dir_change(fd, T_SLEEP_MERGE_DAEMON)
+                continue
+
+            # remove tokens before the pass so that jobs finishing
+            # during the pass trigger another pass.
+            for token in token_list :
+                os.remove(f"{spool_dir}/{token}")
+            n_token_tot += n_token
+
+            # check DONE files before the pass so that the last pass
+            # sees every finished job.
+            n_done_last = n_done_file
+            n_done_file = util.count_done_files(script_dir, done_wildcard,
+                                                manifest)
+            last_pass   = n_done_file >= n_done_tot
+
+            # check if any CPU script can still write DONE files
+            n_start, n_alive = \
+                util.count_alive_files(spool_dir, alive_wildcard,
+                                       T_DEAD_MERGE_DAEMON)
+            if n_token > 0 or n_alive > 0 or n_done_file > n_done_last :
+                t_activity = t_now
+            t_idle    = t_now - t_activity
+            stop_dead = not last_pass and n_alive == 0 and \
+                        (n_start >= n_core or t_idle > T_IDLE_MERGE_DAEMON)
+            if stop_dead :
+                logging.info(f"# {fnam}: {n_start} of {n_core} CPU scripts "\
+                             f"started, none running -> last pass")
+                last_pass = True
+
+            n_pass += 1 ;  t_last_pass = t_now
+            tstr = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            logging.info(f"# {fnam}: pass {n_pass} at {tstr} for " \
+                         f"{n_token} new tokens ({n_done_file} of " \
+                         f"{n_done_tot} DONE files)")
+
+            n_done, n_job_merge = \
+                self.merge_update_pass(MERGE_INFO_CONTENTS, comment_lines,
+                                       not last_pass)
+            sys.stdout.flush()
+
+        logging.info(f"# {fnam}: {n_token_tot} tokens in {n_pass} passes")
+        util.close_dir_watch(fd)
+        shutil.rmtree(spool_dir, ignore_errors=True)
+
+        if stop_dead and n_done < n_job_merge :
+            self.merge_fail_missing(MERGE_INFO_CONTENTS, comment_lines)
+        elif n_done == n_job_merge :
+            self.merge_final_wrapup()
+
+        self.set_merge_busy_lock(-1)
+
+        # end merge_daemon_driver
+
+    def merge_fail_missing(self, MERGE_INFO_CONTENTS, comment_lines):
+
+        # Created Oct 2026
+        # Called by merge service when CPU scripts have ended without
+        # writing all DONE files (e.g., killed by walltime or segfault).
+        # Mark each unfinished MERGE row FAIL, re-write MERGE.LOG, and
+        # write FAIL to the done stamp(s) so that higher level pipelines
+        # do not wait forever.
+
+        fnam             = "merge_fail_missing"
+        output_dir       = self.config_prep['output_dir']
+        submit_info_yaml = self.config_prep['submit_info_yaml']
+        done_stamp_list  = submit_info_yaml['DONE_STAMP_LIST']
+
+        row_list_start = util.copy_merge_rows(MERGE_INFO_CONTENTS)
+        done_list      = self.get_merge_done_list(3, MERGE_INFO_CONTENTS)
+        row_list_merge = MERGE_INFO_CONTENTS[TABLE_MERGE]
+        n_fail = 0
+        for row, done in zip(row_list_merge, done_list) :
+            if done : continue
+            row[COLNUM_MERGE_STATE] = SUBMIT_STATE_FAIL
+            n_fail += 1
+
+        self.write_merge_log(MERGE_INFO_CONTENTS, comment_lines,
+                             row_list_start)
+
+        msg_list = [ f"# {fnam}: no CPU script is running, but " \
+                     f"{n_fail} MERGE rows are not finished -> FAIL",
+                     f"#   (batch job killed? check CPU*.LOG files)" ]
+        for msg in msg_list : logging.info(msg)
+        self.append_merge_file(msg_list)
+
+        util.write_done_stamp(output_dir, done_stamp_list, STRING_FAIL)
+
+        # end merge_fail_missing
+
+    def merge_update_pass(self, MERGE_INFO_CONTENTS, comment_lines,
+                          check_force):
+
+        # Created Oct 2026 (moved from merge_driver so that merge service
+        # can call it repeatedly with MERGE_INFO_CONTENTS kept in memory).
+        # Check for STATE changes, re-write MERGE.LOG if any STATE
+        # changed, and run wrapup for each newly finished MERGE row.
+        # check_force = True -> check --force_[crash,abort]_merge.
+        # Returns number of finished MERGE rows, and number of MERGE rows.
+
+        Nsec             = seconds_since_midnight
+        fnam             = "merge_driver"
+        output_dir       = self.config_prep['output_dir']
+        submit_info_yaml = self.config_prep['submit_info_yaml']
+        MERGE_LOG_PATHFILE  = (f"{output_dir}/{MERGE_LOG_FILE}")
+
         # make boolean list of which MERGED processes have already finished;
         # below will check which processes are newly DONE.
         done_list_start = self.get_merge_done_list(3,MERGE_INFO_CONTENTS)
 
+        # keep copy of rows to journal only the rows that change
+        row_list_start  = util.copy_merge_rows(MERGE_INFO_CONTENTS)
+
         # check for changes in state for SPLIT and MERGE tables.
         # function returns updated set of SPLIT and MERGE table rows.
         row_list_split, row_list_merge, n_change = \
             self.merge_update_state(MERGE_INFO_CONTENTS)
         
-        if not MERGE_LAST:  self.force_merge_failure(submit_info_yaml)
+        self.write_job_yaml_cache()
+
+        if check_force :  self.force_merge_failure(submit_info_yaml)
 
         use_split = len(row_list_split) > 0
         use_merge = len(row_list_merge) > 0
 
+        # keep in-memory tables current for next pass of merge service
+        if use_split : MERGE_INFO_CONTENTS[TABLE_SPLIT] = row_list_split
+        if use_merge : MERGE_INFO_CONTENTS[TABLE_MERGE] = row_list_merge
+
         # Modify MERGE.LOG if there is a change in the processing STATE
         if n_change > 0 :
-            itable = 0 
-            # redefine SPLIT table
-            if use_split :
-                INFO_STATE_SPLIT = {
-                    'header_line' : comment_lines[itable],
-                    'primary_key' : TABLE_SPLIT,
-                    'row_list'    : row_list_split }
-                itable += 1
-
-            if use_merge :
-                INFO_STATE_MERGE = {
-                    'header_line' : comment_lines[itable],
-                    'primary_key' : TABLE_MERGE, 
-                    'row_list'    : row_list_merge }
-                itable += 1
-
-            # re-write MERGE.LOG file with new set of STATEs
-            # Note that SPLIT table is optional; MERGE table is required.
-            # Any comment_lines after the tables are re-written so that
-            # we don't lose information or merge-abort messages.
-            with open(MERGE_LOG_PATHFILE, 'w') as f :
-                if use_split :
-                    util.write_merge_file(f, INFO_STATE_SPLIT, [] )
-                if use_merge :
-                    util.write_merge_file(f, INFO_STATE_MERGE, \
-                                          comment_lines[itable:] )
-
+            self.write_merge_log(MERGE_INFO_CONTENTS, comment_lines,
+                                 row_list_start)
             msg_update = (f"Finished {n_change} STATE updates ({Nsec}).")
         else:
             msg_update = (f"No merge updates -> do nothing. ")
@@ -980,7 +1494,7 @@ class Program:
         fail_list_end = self.get_merge_done_list(2, MERGE_INFO_CONTENTS)
         n_job_merge   = len(MERGE_INFO_CONTENTS[TABLE_MERGE]) # entire list
         n_done        = 0  
-        n_wrapup      = 0
+        wrapup_list   = []
         for job_merge in range(0,n_job_merge):
             done_now     = done_list_end[job_merge]  # DONE or FAIL
             fail_now     = fail_list_end[job_merge]  # FAILED
@@ -989,39 +1503,159 @@ class Program:
             if done_now :
                 n_done += 1
             if done_new and not fail_now :
-                n_wrapup += 1
-                self.merge_job_wrapup(job_merge,MERGE_INFO_CONTENTS)
+                wrapup_list.append(job_merge)
+
+        n_wrapup = len(wrapup_list)
+        self.merge_job_wrapup_pool(wrapup_list, MERGE_INFO_CONTENTS)
 
         logging.info(f"# {fnam}: finished {n_wrapup} wrapup tasks ")
 
-        # Only last merge process does cleanup tasks and DONE stamps
-        if MERGE_LAST and n_done == n_job_merge :
-            nfail_tot = self.failure_summary()
-
-            #self.merge_write_misc_info()     # write task-specific info
-            misc_info     = self.get_misc_merge_info()
-            proctime_info = self.get_proctime_info() 
-            self.append_merge_file(misc_info+proctime_info)
-
-            if nfail_tot == 0 :
-                logging.info(f"\n# {fnam}: ALL JOBS DONE -> " \
-                             f"BEGIN FINAL CLEANUP ")
-                cleanup_flag  = submit_info_yaml['CLEANUP_FLAG']
-                if cleanup_flag:  self.merge_cleanup_final()  
-                STRING_STATUS = STRING_SUCCESS
+        return n_done, n_job_merge
+
+        # end merge_update_pass
+
+    def write_merge_log(self, MERGE_INFO_CONTENTS, comment_lines,
+                        row_list_start):
+
+        # Created Oct 2026 (moved from merge_update_pass)
+        # re-write MERGE.LOG file with tables in MERGE_INFO_CONTENTS,
+        # and append changed rows (w.r.t. row_list_start) to journal.
+        # Note that SPLIT table is optional; MERGE table is required.
+        # Any comment_lines after the tables are re-written so that
+        # we don't lose information or merge-abort messages.
+
+        output_dir          = self.config_prep['output_dir']
+        MERGE_LOG_PATHFILE  = (f"{output_dir}/{MERGE_LOG_FILE}")
+        row_list_split      = MERGE_INFO_CONTENTS.get(TABLE_SPLIT,[])
+        row_list_merge      = MERGE_INFO_CONTENTS.get(TABLE_MERGE,[])
+        use_split = len(row_list_split) > 0
+        use_merge = len(row_list_merge) > 0
+
+        itable = 0 
+        # redefine SPLIT table
+        if use_split :
+            INFO_STATE_SPLIT = {
+                'header_line' : comment_lines[itable],
+                'primary_key' : TABLE_SPLIT,
+                'row_list'    : row_list_split }
+            itable += 1
+
+        if use_merge :
+            INFO_STATE_MERGE = {
+                'header_line' : comment_lines[itable],
+                'primary_key' : TABLE_MERGE, 
+                'row_list'    : row_list_merge }
+            itable += 1
+
+        # write to memory first so that journal gets crc of these bytes
+        # without reading MERGE.LOG back.
+        f = io.StringIO()
+        if use_split :
+            util.write_merge_file(f, INFO_STATE_SPLIT, [] )
+        if use_merge :
+            util.write_merge_file(f, INFO_STATE_MERGE, \
+                                  comment_lines[itable:] )
+        merge_bytes = f.getvalue().encode()
+
+        with open(MERGE_LOG_PATHFILE, 'wb') as f :
+            f.write(merge_bytes)
+
+        util.write_merge_journal(MERGE_LOG_PATHFILE, MERGE_INFO_CONTENTS,
+                                 comment_lines, row_list_start,
+                                 zlib.crc32(merge_bytes))
+
+        # end write_merge_log
+
+    def merge_job_wrapup_pool(self, wrapup_list, MERGE_INFO_CONTENTS):
+
+        # Created Oct 2026
+        # Call merge_job_wrapup for each MERGE row in wrapup_list.
+        # If get_merge_wrapup_nthread() > 1, rows are processed on a
+        # thread pool (wrapup is mostly I/O and external programs).
+        # Each row is isolated: a failed row does not stop the others.
+        # In worker threads, log_assert only raises; after all rows are
+        # finished, errors are reported here with one log_assert call
+        # so that MERGE.LOG and DONE stamps are written by one thread.
+        # merge_wrapup_lock is available to serialize steps of 
+        # merge_job_wrapup that are not thread safe.
+
+        self.merge_wrapup_lock = threading.Lock()
+        n_row    = len(wrapup_list)
+        n_thread = min(self.get_merge_wrapup_nthread(), n_row)
+
+        if n_thread <= 1 :
+            for irow in wrapup_list :
+                self.merge_job_wrapup(irow, MERGE_INFO_CONTENTS)
+            return
+
+        logging.info(f"  Run {n_row} merge wrapup tasks on " \
+                     f"{n_thread} threads")
+
+        with concurrent.futures.ThreadPoolExecutor(n_thread) as pool :
+            future_list = [ pool.submit(self.merge_job_wrapup, irow,
+                                        MERGE_INFO_CONTENTS) 
+                            for irow in wrapup_list ]
+
+        msgerr = []
+        for irow, future in zip(wrapup_list,future_list) :
+            err = future.exception()
+            if err is None : continue
+            msgerr.append(f"merge wrapup failed for {TABLE_MERGE} row {irow}:")
+            if isinstance(err,AssertionError) and \
+               isinstance(err.args[0],list) :
+                msgerr += [ f"   {msg}" for msg in err.args[0] ]
             else:
-                STRING_STATUS = STRING_FAIL
+                msgerr.append(f"   {type(err).__name__}: {err}")
 
-            done_stamp_list = submit_info_yaml['DONE_STAMP_LIST']
-            util.write_done_stamp(output_dir, done_stamp_list, STRING_STATUS)
+        if len(msgerr) > 0 :
+            self.log_assert(False, msgerr)
 
-            logging.info(f"\n# {fnam}: finished with {STRING_STATUS}. " \
-                         f"Bye Bye" )
+        # end merge_job_wrapup_pool
 
-        # remove busy lock file
-        self.set_merge_busy_lock(-1)
-        
-        # end merge_driver
+    def get_merge_wrapup_nthread(self):
+        # number of threads for merge_job_wrapup_pool; default is 1
+        # (one row at a time). Override if merge_job_wrapup is thread safe.
+        return 1
+
+    def merge_final_wrapup(self):
+
+        # Created Oct 2026 (moved from merge_driver)
+        # Called after all jobs and merge tasks have finished:
+        # failure summary, final cleanup, and DONE stamps.
+
+        fnam             = "merge_driver"
+        output_dir       = self.config_prep['output_dir']
+        submit_info_yaml = self.config_prep['submit_info_yaml']
+
+        # journal and YAML cache are not needed after last update 
+        # of MERGE.LOG tables
+        for tmp_file in [ MERGE_JOURNAL_FILE, JOB_STATS_CACHE_FILE ] :
+            if os.path.isfile(f"{output_dir}/{tmp_file}") :
+                os.remove(f"{output_dir}/{tmp_file}")
+
+        nfail_tot = self.failure_summary()
+
+        #self.merge_write_misc_info()     # write task-specific info
+        misc_info     = self.get_misc_merge_info()
+        proctime_info = self.get_proctime_info() 
+        self.append_merge_file(misc_info+proctime_info)
+
+        if nfail_tot == 0 :
+            logging.info(f"\n# {fnam}: ALL JOBS DONE -> " \
+                         f"BEGIN FINAL CLEANUP ")
+            cleanup_flag  = submit_info_yaml['CLEANUP_FLAG']
+            if cleanup_flag:  self.merge_cleanup_final()  
+            STRING_STATUS = STRING_SUCCESS
+        else:
+            STRING_STATUS = STRING_FAIL
+
+        done_stamp_list = submit_info_yaml['DONE_STAMP_LIST']
+        util.write_done_stamp(output_dir, done_stamp_list, STRING_STATUS)
+
+        logging.info(f"\n# {fnam}: finished with {STRING_STATUS}. " \
+                     f"Bye Bye" )
+
+        # end merge_final_wrapup
 
     def merge_reset_driver(self):
 
@@ -1080,6 +1714,8 @@ class Program:
         #  + all DONE files to exist
         #  + no BUSY files from other merge process
         # 
+        # Oct 2026: wait for BUSY files with inotify/backoff instead
+        #           of fixed 5 sec sleep.
 
         submit_info_yaml = self.config_prep['submit_info_yaml'] 
         n_job_tot        = submit_info_yaml['N_JOB_TOT']
@@ -1092,11 +1728,16 @@ class Program:
         time.sleep(1)
 
         # sleep until there are no more busy files.
+        output_dir = self.config_prep['output_dir']
+        fd         = util.open_dir_watch(output_dir)
+        t_sleep    = T_SLEEP_BUSY_WAIT[0]
         n_busy,busy_list = self.get_busy_list()
         while n_busy > 0 :
             logging.info(f"\t Wait for {busy_list} to clear")
-            time.sleep(5)
+            util.wait_dir_change(fd, t_sleep)
+            t_sleep = min(2.0*t_sleep, T_SLEEP_BUSY_WAIT[1])
             n_busy,busy_list = self.get_busy_list()
+        util.close_dir_watch(fd)
 
         # end merge_last_wait
 
@@ -1610,6 +2251,13 @@ class Program:
         script_dir       = submit_info_yaml['SCRIPT_DIR'] 
 
         command_file_list  = glob.glob1(script_dir,CMD_wildcard)
+
+        # include job scripts from --job_queue
+        queue_dir = f"{script_dir}/{JOB_QUEUE_DIR}"
+        if os.path.isdir(queue_dir) :
+            command_file_list += [ f"{JOB_QUEUE_DIR}/{job_file}" for \
+                                   job_file in sorted(os.listdir(queue_dir)) ]
+
         command_lines      = []
         for cmd_file in command_file_list :
             CMD_FILE = (f"{script_dir}/{cmd_file}")
@@ -1701,6 +2349,7 @@ class Program:
         # check_for_failures so that ABORT message can be
         # extracted elsewhere .
         #
+        # Oct 2026: each YAML file is parsed once (see read_job_yaml)
         
         n_key              = len(yaml_key_list)
         n_split            = len(log_file_list)
@@ -1717,15 +2366,17 @@ class Program:
             job_stats[key_list] = [ 0 ] * n_split
             job_stats[key_sum]  =   0
     
+        key_read_list = [ key_AIZ ] + \
+            [ self.keynames_for_job_stats(item)[0] for item in yaml_key_list ]
+
         for isplit in range(0,n_split):
             log_file  = log_file_list[isplit]
             yaml_file = yaml_file_list[isplit]
             LOG_FILE  = (f"{script_dir}/{log_file}")
             YAML_FILE = (f"{script_dir}/{yaml_file}")
 
-            if os.path.isfile(YAML_FILE) :
-                stats_yaml       = util.extract_yaml(YAML_FILE, None, None )
-            
+            stats_yaml = self.read_job_yaml(YAML_FILE, key_read_list)
+            if stats_yaml is not None :
                 aiz              = stats_yaml[key_AIZ]
                 aiz_list[isplit] = aiz
                 if aiz > aiz_max : aiz_max = aiz
@@ -1774,6 +2425,67 @@ class Program:
 
         # end get_job_stats
 
+    def read_job_yaml(self, YAML_FILE, key_list):
+
+        # Created Oct 2026
+        # Return dictionary of numeric key_list values from split-job
+        # YAML_FILE, or None if it does not exist. Values are cached
+        # with key (mtime,size) in {output_dir}/{JOB_STATS_CACHE_FILE}
+        # so that each YAML file is parsed only once, rather than by
+        # every merge process; a re-written YAML file (e.g., after
+        # resubmit) is parsed again. This is only a parse cache: the
+        # caller still sums over all YAML files.
+        # Cache is written by write_job_yaml_cache.
+
+        if 'job_yaml_cache' not in self.config_prep :
+            output_dir  = self.config_prep['output_dir']
+            CACHE_FILE  = f"{output_dir}/{JOB_STATS_CACHE_FILE}"
+            cache       = {}
+            if os.path.isfile(CACHE_FILE) :
+                try:
+                    with open(CACHE_FILE,"rt") as f : cache = json.load(f)
+                except Exception :
+                    cache = {}   # corrupted -> re-parse YAML files
+            self.config_prep['job_yaml_cache']   = cache
+            self.config_prep['n_job_yaml_parse'] = 0
+
+        try:
+            stat = os.stat(YAML_FILE)
+        except OSError :
+            return None
+
+        cache     = self.config_prep['job_yaml_cache']
+        stat_key  = f"{stat.st_mtime_ns} {stat.st_size}"
+        item      = cache.get(YAML_FILE)
+        if item is not None and item[0] == stat_key and \
+           all(key in item[1] for key in key_list) :
+            return item[1]
+
+        # keep only the numbers that are summed, so that cache is
+        # plain json (YAML values such as dates are not)
+        stats_yaml = util.extract_yaml(YAML_FILE, None, None )
+        stats_yaml = { key : stats_yaml[key] for key in key_list 
+                       if isinstance(stats_yaml.get(key),(int,float)) }
+        cache[YAML_FILE] = [ stat_key, stats_yaml ]
+        self.config_prep['n_job_yaml_parse'] += 1
+        return stats_yaml
+
+        # end read_job_yaml
+
+    def write_job_yaml_cache(self):
+        # Created Oct 2026
+        # write cache from read_job_yaml if any YAML file was parsed.
+        n_parse = self.config_prep.get('n_job_yaml_parse',0)
+        if n_parse == 0 : return
+
+        output_dir  = self.config_prep['output_dir']
+        CACHE_FILE  = f"{output_dir}/{JOB_STATS_CACHE_FILE}"
+        with open(f"{CACHE_FILE}.TMP","wt") as f :
+            json.dump(self.config_prep['job_yaml_cache'], f)
+        os.replace(f"{CACHE_FILE}.TMP", CACHE_FILE)
+        self.config_prep['n_job_yaml_parse'] = 0
+        # end write_job_yaml_cache
+
     def keynames_for_job_stats(self,keyname_base):
         keyname_sum  = (f"{keyname_base}_sum")
         keyname_list = (f"{keyname_base}_list")
@@ -1785,8 +2497,13 @@ class Program:
         # + writes FAIL to done_stamp_file
         # + appends msgerr to MERGE.LOG
         # + remove BUSY file
+        # Oct 2026: in merge_job_wrapup_pool worker thread, only raise 
+        #    with msgerr; main thread reports all errors at the end.
 
         if condition is False :
+            if threading.current_thread() is not threading.main_thread() :
+                raise AssertionError(msgerr)
+
             output_dir      = self.config_prep['output_dir']
             done_stamp_list = self.config_prep['done_stamp_list']
             MERGE_LOG_PATHFILE  = (f"{output_dir}/{MERGE_LOG_FILE}")
@@ -42,13 +42,22 @@
 # May 24 2021: check option to use events from FITOPT000
 # May 27 2021: new def make_FITOPT_OUT_LIST 
 #                 (append_fitopt_info_file is obsolete)
+# Oct 17 2026: assign jobs to cores by size of input FITRES file
+#              (see prep_job_pack)
+# Oct 17 2026: write jobs via open_job_file for --job_queue
+# Oct 17 2026: make_reject_summary reads only CID,IDSURVEY columns
+#              and builds REJECT/ACCEPT tables with vectorized ops.
+# Oct 17 2026: catenate INPDIR+ FITRES files in python with parallel
+#              processes (replaces SALT2mu.exe cat_only).
+# Oct 17 2026: parse BBC/wfit YAML once for all summary files, and
+#              write BBC_SUMMARY_TABLE.csv (see get_summary_results).
 #
 # - - - - - - - - - -
 
 
 import os, sys, shutil, yaml, glob
 import logging, coloredlogs
-import datetime, time
+import datetime, time, concurrent.futures
 import submit_util as util
 import numpy  as np
 import pandas as pd
@@ -86,6 +95,7 @@ PREFIX_wfit = "wfit"
 FITPAR_SUMMARY_FILE   = "BBC_SUMMARY_FITPAR.YAML"   # Mar 28 2021
 SPLITRAN_SUMMARY_FILE = "BBC_SUMMARY_SPLITRAN.FITRES"
 WFIT_SUMMARY_FILE     = "BBC_SUMMARY_wfit.FITRES"
+SUMMARY_TABLE_FILE    = "BBC_SUMMARY_TABLE.csv"     # Oct 2026
 
 BBC_REJECT_SUMMARY_FILE  = "BBC_REJECT_SUMMARY.LIST"
 BBC_ACCEPT_SUMMARY_FILE  = "BBC_ACCEPT_SUMMARY.LIST"
@@ -1035,6 +1045,10 @@ class BBC(Program):
         # FITRES file includes multiple surveys
         # For NSPLITRAN, copy only to first split-dir to avoid
         # duplicate copies of input FITRES files.
+        #
+        # Oct 2026: catenate in python (util.catenate_table_TEXT) instead
+        #   of SALT2mu.exe cat_only + gzip; independent (version,fitopt)
+        #   pairs are catenated in parallel processes.
 
         if not USE_INPDIR: return
 
@@ -1047,11 +1061,10 @@ class BBC(Program):
         n_splitran         = self.config_prep['n_splitran']
         USE_SPLITRAN       = n_splitran > 1
 
-        cat_file_log   = (f"{output_dir}/cat_FITRES_SALT2mu.LOG")
-
         logging.info("\n  Prepare input FITRES files")
         iver_last = -9
 
+        cat_arg_list = []
         for iver,ifit in zip(iver_list2, ifit_list2):
 
             idir0 = 0  # some things just need first INPDIR index
@@ -1063,16 +1076,40 @@ class BBC(Program):
 
             cat_list   = self.make_cat_fitres_list(iver,ifit)
 
-            #print(" xxx ---------------------------------- " )
-            #print(f" xxx iver={iver} ifit={ifit} :")
-            #print(f" xxx cat_list = {cat_list} ")
-
-            # execute the FITRES catenation
             fitopt_num     = fitopt_num_outlist[ifit]
             ff             = (f"{fitopt_num}.{SUFFIX_FITRES}")
             input_ff       = "INPUT_" + ff
-            cat_file_out   = (f"{V_DIR}/{input_ff}")
-            nrow = self.exec_cat_fitres(cat_list, cat_file_out, cat_file_log)
+            cat_file_out   = (f"{V_DIR}/{input_ff}.gz")
+            cat_arg_list.append( [cat_list.split(','), cat_file_out, 
+                                  "SN:", VARNAME_MISSING_CAT] )
+
+        # execute the FITRES catenations; columns in a subset of
+        # files are kept only if they match VARNAME_MISSING_CAT,
+        # as for "SALT2mu.exe cat_only append_varname_missing='PROB*'"
+        nproc = max(1, min(NPROC_CAT_TABLE, len(cat_arg_list)))
+        with concurrent.futures.ProcessPoolExecutor(nproc) as pool:
+            future_list = [ pool.submit(util.catenate_table_TEXT, *cat_arg)
+                            for cat_arg in cat_arg_list ]
+            # worker exception (e.g., bad row, disk full, killed worker)
+            # -> error message so that log_assert reports the file
+            result_list = []
+            for future in future_list :
+                try:
+                    result_list.append(future.result())
+                except Exception as e :
+                    result_list.append( (0, [f"{type(e).__name__}: {e}"]) )
+
+        for iver, ifit, cat_arg, result in \
+            zip(iver_list2, ifit_list2, cat_arg_list, result_list):
+            v_dir   = v_out_list[idir0][iver]
+            v_dir  += self.suffix_splitran(n_splitran,1)
+            ff      = (f"{fitopt_num_outlist[ifit]}.{SUFFIX_FITRES}")
+            nrow, msgerr = result
+
+            if len(msgerr) > 0 :
+                msgerr.insert(0, f"Cannot catenate FITRES files into")
+                msgerr.insert(1, f"  {cat_arg[1]}")
+                self.log_assert(False,msgerr)
 
             if iver != iver_last : logging.info(f"    {v_dir}: ")
             iver_last = iver
@@ -1080,46 +1117,9 @@ class BBC(Program):
             logging.info(f"\t Catenate {n_inpdir} {ff} files"\
                          f" -> {nrow} events ")
 
-        # - - - - - 
-        logging.info("   gzip the catenated FITRES files.")
-        cmd_gzip = (f"cd {output_dir}; gzip */INPUT_FITOPT*.{SUFFIX_FITRES}")
-        os.system(cmd_gzip)
-
-        # remove cat log file
-        rm_log = (f"cd {output_dir}; rm {cat_file_log}")
-        os.system(rm_log)
-
         # end bbc_prep_combine_tables
     
         
-    def exec_cat_fitres(self,cat_list, cat_file_out, cat_file_log):
-
-        # prepare & execute catenate command for this cat_list 
-        # (comma-sep list of files) into cat_file_out.
-        # Use the "SALT2mu.exe cat_only" option to handle different
-        # columns in each FITRES file. While .gz extensions are
-        # not included, SALT2mu handles files with or without
-        # .gz extensions.
-        #
-        # function returns number of rows in catenated file
-
-        cmd_cat = f"SALT2mu.exe  " \
-                  f"cat_only  "    \
-                  f"datafile={cat_list}  " \
-                  f"append_varname_missing='PROB*'  " \
-                  f"catfile_out={cat_file_out}  " \
-                  f" &> {cat_file_log}"
-
-        #print(f" xxx command to cat fitres files, \n {cmd_cat} \n")
-        os.system(cmd_cat)
-
-        # check number of rows
-        nrow = util.nrow_table_TEXT(cat_file_out, "SN:")
-
-        return nrow
-
-        # end exec_cat_fitres
-
     def make_cat_fitres_list(self, iver, ifit ):
         
         # Use input indices for version (iver) and fitopt (ifit)
@@ -1298,28 +1298,30 @@ class BBC(Program):
         self.config_prep['n_done_tot']  = n_job_tot
         self.config_prep['use_wfit']    = use_wfit
 
-        n_job_local = 0
+        # assign all jobs to cores once (Oct 2026), then pick out
+        # the ones for this icpu
+        job_list = list(zip(iver_list4,ifit_list4,imu_list4,isplitran_list4))
+        if icpu == 0 :
+            self.bbc_prep_job_pack(job_list)
+        cpu_job_list = self.config_prep['job_pack']['cpu_job_list'][icpu]
 
-        for iver,ifit,imu,isplitran in \
-            zip(iver_list4,ifit_list4,imu_list4,isplitran_list4):
-
-            n_job_local += 1
+        for ijob in cpu_job_list :
+            iver,ifit,imu,isplitran = job_list[ijob-1]
             index_dict = \
                 { 'iver':iver, 'ifit':ifit, 'imu':imu, 'icpu':icpu,
                   'isplitran': isplitran }
 
-            if ( (n_job_local-1) % n_core ) == icpu :
-
-                n_job_cpu += 1
-                job_info_bbc   = self.prep_JOB_INFO_bbc(index_dict)
-                util.write_job_info(f, job_info_bbc, icpu)
+            n_job_cpu += 1
+            job_info_bbc   = self.prep_JOB_INFO_bbc(index_dict)
+            job_info_merge = self.prep_JOB_INFO_merge(icpu,ijob) 
+            with self.open_job_file(f,icpu,ijob) as (fjob,cpunum) :
+                util.write_job_info(fjob, job_info_bbc, cpunum)
 
                 if use_wfit :
                     job_info_wfit  = self.prep_JOB_INFO_wfit(index_dict)
-                    util.write_job_info(f, job_info_wfit, icpu)
+                    util.write_job_info(fjob, job_info_wfit, cpunum)
 
-                job_info_merge = self.prep_JOB_INFO_merge(icpu,n_job_local) 
-                util.write_jobmerge_info(f, job_info_merge, icpu)
+                util.write_jobmerge_info(fjob, job_info_merge, icpu)
 
         # - - - - 
 
@@ -1327,6 +1329,36 @@ class BBC(Program):
 
         # end write_command_file
 
+    def bbc_prep_job_pack(self, job_list):
+
+        # Created Oct 2026
+        # Prepare cost estimate for each BBC job in job_list, and pass
+        # to prep_job_pack that assigns jobs to cores. MERGE.LOG has no
+        # CPU column for BBC, so there is no CPU history; estimate is
+        # size of input FITRES file (proxy for number of events).
+
+        output_dir   = self.config_prep['output_dir']
+        version_list = self.config_prep['version_out_list']
+        fitopt_list  = self.config_prep['fitopt_num_outlist']
+        n_splitran   = self.config_prep['n_splitran']
+
+        size_dict = {}
+        key_list  = []  ;  est_list = []
+        for iver,ifit,imu,isplitran in job_list :
+            version = version_list[iver] + self.suffix_splitran(n_splitran,1)
+            ff      = f"{version}/INPUT_{fitopt_list[ifit]}.{SUFFIX_FITRES}"
+            if ff not in size_dict :
+                size = 0
+                for FF in [ f"{output_dir}/{ff}", f"{output_dir}/{ff}.gz" ]:
+                    if os.path.isfile(FF) : size = os.path.getsize(FF)
+                size_dict[ff] = size
+            key_list.append(None)
+            est_list.append(size_dict[ff])
+
+        self.prep_job_pack(key_list, est_list)
+
+        # end bbc_prep_job_pack
+
     def prep_JOB_INFO_bbc(self,index_dict):
         # Return JOB_INFO dictionary with 
         #   cd job_dir
@@ -1759,6 +1791,7 @@ class BBC(Program):
         n_state_change     = 0
         row_list_merge_new = []
 
+        file_index = {}  # one scan of script_dir for all rows (Oct 2026)
         nrow_check = 0
         for row in row_list_merge :
             row_list_merge_new.append(row) # default output is same as input
@@ -1786,7 +1819,8 @@ class BBC(Program):
 
                 # get list of LOG, DONE, and YAML files 
                 log_list, done_list, yaml_list = \
-                    util.get_file_lists_wildcard(script_dir,search_wildcard)
+                    util.get_file_lists_wildcard(script_dir,search_wildcard,
+                                                 file_index)
 
                 # careful to sum only the files that are NOT None
                 NLOG   = sum(x is not None for x in log_list)  
@@ -1889,16 +1923,22 @@ class BBC(Program):
         use_wfit         = submit_info_yaml['USE_WFIT']
         script_subdir    = SUBDIR_SCRIPTS_BBC
 
+        # read BBC and wfit YAML output once for all summary files
+        summary_list = self.get_summary_results()
+
+        logging.info(f"  BBC cleanup: create {SUMMARY_TABLE_FILE}") 
+        self.make_summary_table(summary_list)
+
         logging.info(f"  BBC cleanup: create {FITPAR_SUMMARY_FILE}") 
-        self.make_fitpar_summary()
+        self.make_fitpar_summary(summary_list)
         
         if use_wfit :
             logging.info(f"  BBC cleanup: create {WFIT_SUMMARY_FILE}")
-            self.make_wfit_summary()
+            self.make_wfit_summary(summary_list)
             
         if n_splitran > 1 :
             logging.info(f"  BBC cleanup: create {SPLITRAN_SUMMARY_FILE}")
-            self.make_splitran_summary()
+            self.make_splitran_summary(summary_list)
 
         for vout in vout_list :
             self.make_reject_summary(vout)
@@ -1943,38 +1983,34 @@ class BBC(Program):
         logging.info(f"  BBC cleanup: create {vout}/{accept_file}")
 
         n_ff     = len(fitres_list) # number of FITRES files
-        # xxx cid_list = []
-        # xxx mark delete n_file   = 0
 
-        
-        first_fitres = VOUT+"/"+fitres_list[0]
-        first_fitres_cids = pd.read_csv(first_fitres, comment="#", delim_whitespace=True)['CID']
-        counts = np.unique(first_fitres_cids, return_counts=True)[1]
-        has_duplicates = len(counts[counts>1])>0
+        # use CID+IDSURVEY if CIDs are duplicated in first FITRES file
+        cid_dict       = self.get_cid_list(fitres_list, VOUT)
+        cid_unique     = cid_dict['cid_unique']
+        idsurvey       = cid_dict['idsurvey_unique']
+        n_count        = cid_dict['n_count']
+        n_reject       = cid_dict['n_reject']
+        has_duplicates = idsurvey is not None
         if has_duplicates:
-            print('Detected duplicates in first fitres! Using duplicate logic...')
-            cid_dict = self.get_cid_list_duplicates(fitres_list, VOUT)
-            unique_dict = cid_dict['unique_dict']
-        else:
-            cid_dict = self.get_cid_list(fitres_list, VOUT)
-
-        cid_list = cid_dict['cid_list']
-        cid_unique = cid_dict['cid_unique']
-        n_count = cid_dict['n_count']
-        n_reject = cid_dict['n_reject']
+            logging.info(f"  Detected duplicate CIDs in first fitres; " \
+                         f"use CID+IDSURVEY")
 
-        
-        # xxx mark delete if n_file == -9 :
-        # xxx    sys.exit(f" xxx cid_unique={cid_unique}\n xxx n_count = {n_count}\n xxx n_rej={n_reject}\n xxx n_ff= {n_ff}\n")
-            
-        cid_all_pass    = cid_unique[n_count == n_ff]
-        cid_some_fail   = cid_unique[n_count <  n_ff]
+        # CIDs counted more than n_ff times (duplicates in later FITRES
+        # files) have n_reject < 0 and go to neither file.
+        some_fail       = (n_reject >  0)
+        pass_all        = (n_reject == 0)
         n_all           = len(cid_unique)
-        n_some_fail     = len(cid_some_fail)
-        n_all_pass      = len(cid_all_pass)
+        n_all_pass      = int(np.count_nonzero(pass_all))
+        n_some_fail     = int(np.count_nonzero(some_fail))
         f_some_fail     = float(n_some_fail)/float(n_all)
         str_some_fail   = (f"{f_some_fail:.4f}")
 
+        # build all table rows at once
+        cid_str = pd.Series(cid_unique).str.ljust(12)
+        if has_duplicates:
+            cid_str = cid_str + " " + pd.Series(idsurvey)
+        nrej_str = pd.Series(n_reject).map('{:3d}'.format)
+
         # - - - - - - - -
         with open(REJECT_FILE,"wt") as f:
             f.write(f"# BBC-FF = BBC FITRES file.\n")
@@ -1989,14 +2025,12 @@ class BBC(Program):
             if has_duplicates:
                 f.write(f"# Beware of Duplicate CIDs (each CID + IDSURVEY is unique) \n")
                 f.write(f"VARNAMES: CID IDSURVEY NJOB_REJECT \n")
-                for ucid,nrej in zip(cid_unique,n_reject) :
-                    cid = unique_dict[ucid]['CID']
-                    idsurv = unique_dict[ucid]['IDSURVEY']
-                    if nrej>0: f.write(f"SN:  {cid:<12} {idsurv}  {nrej:3d} \n")
+                sep = "  "
             else:
                 f.write(f"VARNAMES: CID NJOB_REJECT \n")
-                for cid,nrej in zip(cid_unique,n_reject) :
-                    if nrej>0: f.write(f"SN:  {cid:<12}   {nrej:3d} \n")
+                sep = "   "
+            rows = "SN:  " + cid_str[some_fail] + sep + nrej_str[some_fail] + " \n"
+            f.write("".join(rows))
             f.write(f"\n")
 
         with open(ACCEPT_FILE,"wt") as f:
@@ -2011,14 +2045,11 @@ class BBC(Program):
             if has_duplicates:
                 f.write(f"# Beware of Duplicate CIDs (each CID + IDSURVEY is unique) \n")
                 f.write(f"VARNAMES: CID IDSURVEY \n")
-                for ucid,nrej in zip(cid_unique,n_reject) :
-                    cid = unique_dict[ucid]['CID']
-                    idsurv = unique_dict[ucid]['IDSURVEY']
-                    if nrej==0: f.write(f"SN:  {cid:<12} {idsurv} \n")
+                rows = "SN:  " + cid_str[pass_all] + " \n"
             else:
                 f.write(f"VARNAMES: CID  \n")
-                for cid,nrej in zip(cid_unique,n_reject) :
-                    if nrej==0: f.write(f"SN:  {cid:<12}  \n")
+                rows = "SN:  " + cid_str[pass_all] + "  \n"
+            f.write("".join(rows))
 
             f.write(f"\n")
 
@@ -2028,61 +2059,63 @@ class BBC(Program):
         # get cid_list of all CIDs in all files. If same events appear in 
         # each file, each CID appears n_ff times. If a CID appears less 
         # than n_ff times, it goes into reject list.
-        n_ff     = len(fitres_list)
-        cid_list = []
-        for ff in fitres_list:
-            FF       = (f"{VOUT}/{ff}")
-            df       = pd.read_csv(FF, comment="#", delim_whitespace=True)
-            cid_list = np.concatenate((cid_list, df.CID.astype(str)))
-
-        # - - - - - - - - - - - - -
-        # get list of unique CIDs, and how many times each CID appears
-        cid_unique, n_count = np.unique(cid_list, return_counts=True)
-
-        # number of times each CID does not appear in a fitres file
-        n_reject        = n_ff - n_count
-
-        cid_dict = {}
-        cid_dict['cid_list'] = cid_list
-        cid_dict['cid_unique'] = cid_unique
-        cid_dict['n_count'] = n_count
-        cid_dict['n_reject'] = n_reject
-
-        return cid_dict
+        # If CIDs are duplicated in first FITRES file, each event
+        # is identified by CID+IDSURVEY; else idsurvey_unique = None.
+        #
+        # Oct 2026: read only CID[,IDSURVEY] columns, and count with
+        #   one concatenate + np.unique over all files.
 
-    def get_cid_list_duplicates(self,fitres_list,VOUT):
-        # get cid_list of all CIDs in all files. If same events appear in 
-        # each file, each CID appears n_ff times. If a CID appears less 
-        # than n_ff times, it goes into reject list.
         n_ff     = len(fitres_list)
-        unique_dict = {}
-        ucid_list = []
-        for ff in fitres_list:
-            FF       = (f"{VOUT}/{ff}")
-            df       = pd.read_csv(FF, comment="#", delim_whitespace=True)
-            ucid_list = np.concatenate((ucid_list, df.CID.astype(str)+"__"+df.IDSURVEY.astype(str)))
-
-        # - - - - - - - - - - - - -
-        # get list of unique CIDs, and how many times each CID appears
-        cid_unique, n_count = np.unique(ucid_list, return_counts=True)
-
-        for ucid in cid_unique:
-            unique_dict[ucid] = {}
-            unique_dict[ucid]['CID'] = ucid.split("__")[0]
-            unique_dict[ucid]['IDSURVEY'] = ucid.split("__")[1]
+        varlist  = [ 'CID', 'IDSURVEY' ]
+        df_list  = [ self.read_fitres_columns(f"{VOUT}/{ff}", varlist) 
+                     for ff in fitres_list ]
+
+        cid_first      = df_list[0]['CID'].to_numpy()
+        has_duplicates = len(np.unique(cid_first)) < len(cid_first)
+
+        cid_list = np.concatenate([ df['CID'].to_numpy() for df in df_list ])
+        if has_duplicates :
+            idsurvey_list = np.concatenate([ df['IDSURVEY'].to_numpy()
+                                             for df in df_list ])
+            # unique (CID,IDSURVEY) pairs via int codes for each column
+            cid_code, cid_val = pd.factorize(cid_list)
+            ids_code, ids_val = pd.factorize(idsurvey_list)
+            pair_code = cid_code.astype(np.int64)*len(ids_val) + ids_code
+            pair_unique, n_count = np.unique(pair_code, return_counts=True)
+            cid_unique      = cid_val[pair_unique // len(ids_val)]
+            idsurvey_unique = ids_val[pair_unique %  len(ids_val)]
+            # same order as unique 'CID__IDSURVEY' strings
+            isort           = np.argsort(np.char.add(np.char.add(
+                cid_unique.astype(str), "__"), idsurvey_unique.astype(str)))
+            cid_unique      = cid_unique[isort]
+            idsurvey_unique = idsurvey_unique[isort]
+            n_count         = n_count[isort]
+        else:
+            cid_unique, n_count = np.unique(cid_list, return_counts=True)
+            idsurvey_unique = None
 
         # number of times each CID does not appear in a fitres file
         n_reject        = n_ff - n_count
 
         cid_dict = {}
-        cid_dict['cid_list'] = ucid_list
-        cid_dict['cid_unique'] = cid_unique
-        cid_dict['unique_dict'] = unique_dict
-        cid_dict['n_count'] = n_count
-        cid_dict['n_reject'] = n_reject
+        cid_dict['cid_unique']      = np.asarray(cid_unique)
+        cid_dict['idsurvey_unique'] = idsurvey_unique
+        cid_dict['n_count']         = n_count
+        cid_dict['n_reject']        = n_reject
 
         return cid_dict
+        # end get_cid_list
+
+    def read_fitres_columns(self, FF, varlist):
 
+        # Created Oct 2026
+        # Read FITRES file FF and return data frame with only the
+        # columns in varlist that exist in file. All values are read
+        # as strings so that CIDs are written exactly as in FF.
+        df = pd.read_csv(FF, comment="#", sep=r"\s+",
+                         usecols=lambda var: var in varlist, dtype=str)
+        return df
+        # end read_fitres_columns
 
     def get_fflist_reject_summary(self,VOUT):
 
@@ -2124,13 +2157,102 @@ class BBC(Program):
 
         # end get_fflist_reject_summary
 
-    def make_fitpar_summary(self):
+    def get_summary_results(self):
+
+        # Created Oct 2026
+        # Read MERGE.LOG once and parse BBC-YAML (and wfit-YAML) output
+        # for each row. Returns list (one dict per MERGE row) used to
+        # write all of the summary files; each YAML file is parsed once.
+
+        output_dir       = self.config_prep['output_dir']
+        submit_info_yaml = self.config_prep['submit_info_yaml']
+        script_dir       = submit_info_yaml['SCRIPT_DIR']
+        use_wfit         = submit_info_yaml['USE_WFIT']
+        n_splitran       = submit_info_yaml['NSPLITRAN']
+
+        # read the whole MERGE.LOG file to figure out where things are
+        MERGE_LOG_PATHFILE  = (f"{output_dir}/{MERGE_LOG_FILE}")
+        MERGE_INFO_CONTENTS,comment_lines = \
+            util.read_merge_file(MERGE_LOG_PATHFILE)
+
+        summary_list = []
+        for row in MERGE_INFO_CONTENTS[TABLE_MERGE]:
+            version    = row[COLNUM_BBC_MERGE_VERSION] # sim data version
+            fitopt_num = row[COLNUM_BBC_MERGE_FITOPT]  # e.g., FITOPT002
+            muopt_num  = row[COLNUM_BBC_MERGE_MUOPT]   # e.g., MUOPT003
+            isplitran  = row[COLNUM_BBC_MERGE_SPLITRAN]
+
+            # remove suffix from version to get base version
+            suffix       = self.suffix_splitran(n_splitran,isplitran)
+            version_base = version[0:len(version)-len(suffix)]
+
+            # BBC-YAML file is still in script_dir
+            prefix_orig, prefix_final = self.bbc_prefix("bbc", row)
+            YAML_FILE  = (f"{script_dir}/{version}_{prefix_final}.YAML")
+            bbc_yaml   = util.extract_yaml(YAML_FILE, None, None )
+
+            # wfit-YAML file has been moved to version dir
+            wfit_yaml  = None
+            if use_wfit :
+                prefix_orig, prefix_final = self.bbc_prefix("wfit", row)
+                YAML_FILE = (f"{output_dir}/{version}/{prefix_final}.YAML")
+                wfit_yaml = util.extract_yaml(YAML_FILE, None, None )
+
+            summary_list.append( {
+                'VERSION'      : version,
+                'VERSION_BASE' : version_base,
+                'FITOPT'       : fitopt_num,
+                'MUOPT'        : muopt_num,
+                'ISPLITRAN'    : isplitran,
+                'bbc_yaml'     : bbc_yaml,
+                'wfit_yaml'    : wfit_yaml } )
+
+        return summary_list
+        # end get_summary_results
+
+    def make_summary_table(self, summary_list):
+
+        # Created Oct 2026
+        # write one CSV row per MERGE row with BBC fit params and
+        # optional wfit results, to be read with e.g. pandas.read_csv
+
+        output_dir   = self.config_prep['output_dir']
+        KEYLIST_NEVT = [ 'NEVT_DATA', 'NEVT_BIASCOR', 'NEVT_CCPRIOR',
+                         'NEVT_REJECT_BIASCOR' ]
+        KEYLIST_WFIT = [ 'w', 'w_sig', 'omm', 'omm_sig', 'chi2', 'sigint' ]
+
+        table_rows = []
+        for summary in summary_list :
+            bbc_yaml  = summary['bbc_yaml']
+            wfit_yaml = summary['wfit_yaml']
+            table_row = { key : summary[key] for key in 
+                          ['VERSION', 'FITOPT', 'MUOPT', 'ISPLITRAN'] }
+            for key in KEYLIST_NEVT :
+                table_row[key] = bbc_yaml.get(key)
+            for result in bbc_yaml['BBCFIT_RESULTS']:
+                for key,val in result.items():
+                    val_list = str(val).split()
+                    table_row[key]        = float(val_list[0])
+                    table_row[f"{key}_err"] = float(val_list[1])
+            if wfit_yaml is not None :
+                for key in KEYLIST_WFIT :
+                    table_row[f"{key}_wfit"] = wfit_yaml.get(key)
+            table_rows.append(table_row)
+
+        SUMMARY_TABLE  = (f"{output_dir}/{SUMMARY_TABLE_FILE}")
+        pd.DataFrame(table_rows).to_csv(SUMMARY_TABLE, index=False)
+
+        # end make_summary_table
+
+    def make_fitpar_summary(self, summary_list):
 
         # Mar 28 2021: 
         # write summary info for each version/fitopt/muopt.
         # Output is YAML, but designed mainly for human readability.
         # When this function was written, there were no codes expected
         # to read this; only for human eyes.
+        #
+        # Oct 2026: BBC-YAML output is from summary_list
 
         output_dir       = self.config_prep['output_dir']
         submit_info_yaml = self.config_prep['submit_info_yaml']
@@ -2141,30 +2263,21 @@ class BBC(Program):
 
         if n_splitran > 1 : return
 
-        # read the whole MERGE.LOG file to figure out where things are
-        MERGE_LOG_PATHFILE  = (f"{output_dir}/{MERGE_LOG_FILE}")
-        MERGE_INFO_CONTENTS,comment_lines = \
-            util.read_merge_file(MERGE_LOG_PATHFILE)
-
         # - - - 
         SUMMARYF_FILE     = (f"{output_dir}/{FITPAR_SUMMARY_FILE}")
         f = open(SUMMARYF_FILE,"wt") 
         version_last = "BLEH"
 
-        for row in MERGE_INFO_CONTENTS[TABLE_MERGE]:
-            version    = row[COLNUM_BBC_MERGE_VERSION] # sim data version
-            fitopt_num = row[COLNUM_BBC_MERGE_FITOPT]  # e.g., FITOPT002
-            muopt_num  = row[COLNUM_BBC_MERGE_MUOPT]   # e.g., MUOPT003
+        for summary in summary_list:
+            version    = summary['VERSION']  # sim data version
+            fitopt_num = summary['FITOPT']   # e.g., FITOPT002
+            muopt_num  = summary['MUOPT']    # e.g., MUOPT003
             
             # get indices for summary file
             ifit = int(f"{fitopt_num[6:]}")
             imu  = int(f"{muopt_num[5:]}")
             
-            # figure out name of BBC-YAML file and read it 
-            prefix_orig, prefix_final = self.bbc_prefix("bbc", row)
-            YAML_FILE  = (f"{script_dir}/{version}_{prefix_final}.YAML")
-            #print(f"  YAML_FILE = {YAML_FILE}")
-            bbc_yaml   = util.extract_yaml(YAML_FILE, None, None )
+            bbc_yaml       = summary['bbc_yaml']
             BBCFIT_RESULTS = bbc_yaml['BBCFIT_RESULTS']
 
             NEVT_DATA            = bbc_yaml['NEVT_DATA']
@@ -2210,7 +2323,7 @@ class BBC(Program):
 
         # end make_fitpar_summary
 
-    def make_wfit_summary(self):
+    def make_wfit_summary(self, summary_list):
         
         output_dir       = self.config_prep['output_dir']
         submit_info_yaml = self.config_prep['submit_info_yaml']
@@ -2227,27 +2340,18 @@ class BBC(Program):
                     f"chi2 sigint wrand ommrand  \n" )
         f.write(f"{varnames}\n")
 
-        # read the whole MERGE.LOG file to figure out where things are
-        MERGE_LOG_PATHFILE  = (f"{output_dir}/{MERGE_LOG_FILE}")
-        MERGE_INFO_CONTENTS,comment_lines = \
-            util.read_merge_file(MERGE_LOG_PATHFILE)
-
         nrow = 0 
-        for row in MERGE_INFO_CONTENTS[TABLE_MERGE]:
+        for summary in summary_list:
             nrow += 1
-            version    = row[COLNUM_BBC_MERGE_VERSION] # sim data version
-            fitopt_num = row[COLNUM_BBC_MERGE_FITOPT]  # e.g., FITOPT002
-            muopt_num  = row[COLNUM_BBC_MERGE_MUOPT]   # e.g., MUOPT003
-            isplitran  = row[COLNUM_BBC_MERGE_SPLITRAN]
+            version    = summary['VERSION']  # sim data version
+            fitopt_num = summary['FITOPT']   # e.g., FITOPT002
+            muopt_num  = summary['MUOPT']    # e.g., MUOPT003
             
             # get indices for summary file
             ifit = (f"{fitopt_num[6:]}")
             imu  = (f"{muopt_num[5:]}")
             
-            # figure out name of wfit-YAML file and read it
-            prefix_orig,prefix_final = self.bbc_prefix("wfit", row)
-            YAML_FILE  = (f"{output_dir}/{version}/{prefix_final}.YAML")
-            wfit_yaml  = util.extract_yaml(YAML_FILE, None, None )
+            wfit_yaml  = summary['wfit_yaml']
 
             # extract wfit values into local variables
             w   = wfit_yaml['w']   ; w_sig   = wfit_yaml['w_sig']
@@ -2267,11 +2371,12 @@ class BBC(Program):
 
         # end make_wfit_summary
 
-    def make_splitran_summary(self):
+    def make_splitran_summary(self, summary_list):
 
         # collect all BBC fit params, and optional w(wfit);
         # write them out into a FITRES-formatted text file.
         # Include column indices for FITOPT and MUOPT.
+        # Oct 2026: group splitran results from summary_list
 
         output_dir       = self.config_prep['output_dir']
         submit_info_yaml = self.config_prep['submit_info_yaml']
@@ -2286,37 +2391,26 @@ class BBC(Program):
         self.write_splitran_comments(f)
         self.write_splitran_header(f)
 
-        # read the whole MERGE.LOG file to figure out where things are
-        MERGE_LOG_PATHFILE  = (f"{output_dir}/{MERGE_LOG_FILE}")
-        MERGE_INFO_CONTENTS,comment_lines = \
-            util.read_merge_file(MERGE_LOG_PATHFILE)
+        # group rows by version/fitopt/muopt; dict keeps MERGE.LOG order
+        summary_group_dict = {}
+        for summary in summary_list:
+            key = (summary['VERSION_BASE'],summary['FITOPT'],summary['MUOPT'])
+            summary_group_dict.setdefault(key,[]).append(summary)
 
         nrow = 0 
-        for row in MERGE_INFO_CONTENTS[TABLE_MERGE]:
-            version    = row[COLNUM_BBC_MERGE_VERSION] # sim data version
-            fitopt_num = row[COLNUM_BBC_MERGE_FITOPT]  # e.g., FITOPT002
-            muopt_num  = row[COLNUM_BBC_MERGE_MUOPT]   # e.g., MUOPT003
-            isplitran  = row[COLNUM_BBC_MERGE_SPLITRAN]
-            
-            # remove suffix from version to get base version
-            suffix       = self.suffix_splitran(n_splitran,isplitran)
-            len_base     = len(version) - len(suffix)
-            version_base = version[0:len_base]
-            sys.stdout.flush()
+        for key, summary_group in summary_group_dict.items():
+            version_base, fitopt_num, muopt_num = key
 
             # get indices for summary file
             iver = vout_list.index(version_base)
             ifit = (f"{fitopt_num[6:]}")
             imu  = (f"{muopt_num[5:]}")
 
-            # process all splitran files upon reaching SPLITRAN=1
-            # in MERGE.LOG file
-            if isplitran > 1 : continue
             nrow += 1  # for row number in summary file
 
             # the ugly code is in get_splitran_values 
             varname_list, value_list2d, error_list2d = \
-                    self.get_splitran_values(row)
+                    self.get_splitran_values(summary_group)
 
             # for each list of values, get statistics, then print to table.
             n_var = len(varname_list)
@@ -2345,97 +2439,40 @@ class BBC(Program):
         f.close()
         # end make_splitran_summary
     
-    def get_splitran_values(self,row):
+    def get_splitran_values(self,summary_group):
 
-        # for input row from MERGE.LOG, return
+        # for input summary_group (summary_list items for all splitran
+        # of one version/fitopt/muopt), return
         #   varnames_list (list of variables names with BBC results)
         #   values_list2d (list of values vs. splitran for each variable)
 
-        output_dir       = self.config_prep['output_dir']
-        submit_info_yaml = self.config_prep['submit_info_yaml']
-        script_dir       = submit_info_yaml['SCRIPT_DIR']
-        use_wfit         = submit_info_yaml['USE_WFIT']
-        n_splitran       = submit_info_yaml['NSPLITRAN']
-        split_string     = self.suffix_splitran(n_splitran,1)
-
-        version          = row[COLNUM_BBC_MERGE_VERSION]
-        version_base     = version.rstrip(split_string) # remove "-0001"
-        prefix_orig,prefix_final = self.bbc_prefix("bbc", row)
-
-        # scoop up YAML files. Be careful that '-{isplitran} is the
-        # part we need to exlude from prefix, but we don't want to 
-        # remove other dashes in version name.
-
-        prefix_search = prefix_orig.replace(split_string,'*')
-        wildcard_yaml = (f"{prefix_search}*.YAML")
-        yaml_list     = glob.glob1(script_dir, wildcard_yaml)
-
-        bbc_results_yaml   = []
-        for yaml_file in yaml_list :
-            YAML_FILE = (f"{script_dir}/{yaml_file}")
-            tmp_yaml  = util.extract_yaml(YAML_FILE, None, None )
-            n_var     = len(tmp_yaml['BBCFIT_RESULTS'])
-            bbc_results_yaml.append(tmp_yaml)
-
-        if use_wfit :  n_var += 1 ;  
-
-        # Make list of varnames[ivar] and value_list2d[ivar][isplitran]
-        # Trick is to convert [isplitran][ivar] -> [ivar][isplitran]
-        #   (I hate this code)
-        
-        #print(f" xxx -----------------------")
-        #print(f" xxx bbc_results_yaml = {bbc_results_yaml} ")
-        #print(f" xxx n_var = {n_var} ")
-
         varname_list = []
-        value_list2d = [ 0.0 ] * n_var  # [ivar][isplitran]
-        error_list2d = [ 0.0 ] * n_var
+        value_list2d = []  # [ivar][isplitran]
+        error_list2d = []
 
-        for ivar in range(0,n_var): 
-            value_list2d[ivar] = []
-            error_list2d[ivar] = []
-        isplitran    = 0
-        
-        for results in bbc_results_yaml:  # loop over splitran
-            BBCFIT_RESULTS = results['BBCFIT_RESULTS']
+        for summary in summary_group:  # loop over splitran
+            BBCFIT_RESULTS = summary['bbc_yaml']['BBCFIT_RESULTS']
             ivar = 0 
             for item in BBCFIT_RESULTS:  # loop over variables
-                #print(f" xxx check item({ivar}) = {item}")
                 for key,val in item.items() :
                     str_val = str(val).split()[0]
                     str_err = str(val).split()[1]
+                    if len(varname_list) == ivar :
+                        varname_list.append(key)
+                        value_list2d.append([])
+                        error_list2d.append([])
                     value_list2d[ivar].append(float(str_val))
                     error_list2d[ivar].append(float(str_err))
-                    if isplitran == 0 : varname_list.append(key)
                 ivar += 1
-            isplitran += 1
 
         # - - - - - - - - 
         # check option to include w(wfit)
-        # Note that wfit_*YAML files have already been moved to 
-        # ../version-[splitran] and had version string removed from 
-        # file name; therefore, use prefix_final instead of prefix_orig
-
-        if use_wfit :
-            ivar = n_var - 1
-            w_list = [] ;  werr_list = []
+        wfit_list = [ summary['wfit_yaml'] for summary in summary_group
+                      if summary['wfit_yaml'] is not None ]
+        if len(wfit_list) > 0 :
             varname_list.append("w_wfit")
-            prefix_orig,prefix_final = self.bbc_prefix("wfit", row)
-            yaml_file     = (f"{prefix_final}.YAML"  )
-            v_wildcard    = (f"{output_dir}/{version_base}*" )
-            yaml_list     = glob.glob(f"{v_wildcard}/{yaml_file}")
-
-            #print(f" xxx wildcard = {v_wildcard}/{yaml_file}")
-            #print(f" xxx yaml_list = {yaml_list} ") 
-
-            for yaml_file in yaml_list :
-                tmp_yaml  = util.extract_yaml(yaml_file, None, None )
-                w         = tmp_yaml['w']
-                w_sig     = tmp_yaml['w_sig']
-                w_list.append(w)
-                werr_list.append(w_sig)
-            value_list2d[ivar] = w_list
-            error_list2d[ivar] = werr_list
+            value_list2d.append([ wfit_yaml['w']     for wfit_yaml in wfit_list ])
+            error_list2d.append([ wfit_yaml['w_sig'] for wfit_yaml in wfit_list ])
         
         return varname_list, value_list2d, error_list2d
 
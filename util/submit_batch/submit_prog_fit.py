@@ -24,6 +24,13 @@
 #     + set n_job_split = n_core to quickly process FITOPT000
 #     + write NEVT_COMMON  to MERGE.LOG
 #
+# Oct 17 2026: assign jobs to cores with CPU history from previous
+#              MERGE.LOG (see prep_job_pack)
+# Oct 17 2026: write jobs via open_job_file for --job_queue
+# Oct 17 2026: merge TEXT tables in python (util.merge_table_TEXT)
+# Oct 17 2026: merge_job_wrapup is thread safe -> newly DONE rows
+#              are merged in parallel (see merge_job_wrapup_pool)
+#
 # - - - - - - - - - -
 
 import os, sys, shutil, yaml, glob
@@ -777,43 +784,94 @@ class LightCurveFit(Program):
         n_core           = self.config_prep['n_core']
         n_job_cpu        = 0
 
-        # open CMD file for this icpu
-        # xxx mark delete f = open(COMMAND_FILE, 'a') 
+        # list of real jobs in submit order (skip sym links to FITOPT000)
+        job_list = [ (iver,iopt,isplit) for iver,iopt,isplit in 
+                     zip(iver_list,iopt_list,isplit_list)
+                     if not self.is_sym_link(fitopt_arg_list[iopt]) ]
+        n_job_real = len(job_list)
 
-        n_job_local = 0 ;   n_job_real=0 
+        if n_job_real != n_job_tot :
+            msgerr = []
+            msgerr.append(f"Expected {n_job_tot} total jobs;")
+            msgerr.append(f"but found {n_job_real} jobs.")
+            self.log_assert(False,msgerr)
 
-        for iver,iopt,isplit in zip(iver_list,iopt_list,isplit_list):
+        # assign jobs to cores once (Oct 2026)
+        if icpu == 0 :
+            self.fit_prep_job_pack(job_list)
+        cpu_job_list = self.config_prep['job_pack']['cpu_job_list'][icpu]
 
+        for ijob in cpu_job_list :
+            iver,iopt,isplit = job_list[ijob-1]
             index_dict = {
                 'iver':iver, 'iopt':iopt, 'isplit':isplit, 'icpu':icpu
             }  
-            n_job_local += 1
-            if self.is_sym_link(fitopt_arg_list[iopt]) : continue
-            n_job_real += 1  # use this to skip links
 
-            #if ( (n_job_local-1) % n_core ) == icpu :
-            if ( (n_job_real-1) % n_core ) == icpu :
+            n_job_cpu += 1
 
-                n_job_cpu += 1
-
-                job_info_fit   = self.prep_JOB_INFO_fit(index_dict)
-                util.write_job_info(f, job_info_fit, icpu)
-
-                job_info_merge = self.prep_JOB_INFO_merge(icpu,n_job_real) 
-                util.write_jobmerge_info(f, job_info_merge, icpu)
+            job_info_fit   = self.prep_JOB_INFO_fit(index_dict)
+            job_info_merge = self.prep_JOB_INFO_merge(icpu,ijob) 
+            with self.open_job_file(f,icpu,ijob) as (fjob,cpunum) :
+                util.write_job_info(fjob, job_info_fit, cpunum)
+                util.write_jobmerge_info(fjob, job_info_merge, icpu)
 
         # - - - - 
 
-        if n_job_real != n_job_tot :
-            msgerr = []
-            msgerr.append(f"Expected {n_job_tot} total jobs;")
-            msgerr.append(f"but found {n_job_local} jobs.")
-            self.log_assert(False,msgerr)
-
         return n_job_cpu
 
         # end write_command_file
 
+    def fit_prep_job_pack(self, job_list):
+
+        # Created Oct 2026
+        # Prepare job-type key and cost estimate for each job in
+        # job_list, and pass to prep_job_pack that assigns jobs to cores.
+        # Key is (VERSION,FITOPTnnn) to match MERGE table rows. Fall-back
+        # estimate is size of VERSION data dir (proxy for number of 
+        # events) divided by number of split jobs.
+        # With OPT_SNCID_LIST, FITOPT>0 jobs wait for FITOPT000 output,
+        # so keep round-robin order (equal costs) to avoid a FITOPT>0
+        # job blocking a core before its FITOPT000 job runs.
+
+        opt_sncid_list    = self.config_prep['opt_sncid_list']
+        version_list      = self.config_prep['version_list']
+        path_version_list = self.config_prep['path_version_list']
+        fitopt_num_list   = self.config_prep['fitopt_num_list']
+        n_job_split       = self.config_prep['n_job_split']
+
+        if opt_sncid_list > 0 :
+            n_job = len(job_list)
+            self.prep_job_pack([None]*n_job, [1.0]*n_job)
+            return
+
+        size_dict = {}
+        key_list  = []  ;  est_list = []
+        for iver,iopt,isplit in job_list :
+            version = version_list[iver]
+            if version not in size_dict :
+                path = path_version_list[iver]
+                size_dict[version] = util.get_dir_size(f"{path}/{version}")
+            key_list.append( (version, fitopt_num_list[iopt]) )
+            est_list.append( size_dict[version] / n_job_split )
+
+        self.prep_job_pack(key_list, est_list)
+
+        # end fit_prep_job_pack
+
+    def get_merge_cost_history(self, MERGE_INFO_CONTENTS, submit_info_yaml):
+        # return CPU minutes per split job for each (VERSION,FITOPT)
+        # of a previous submit; skip sym links with zero CPU.
+        n_job_split  = submit_info_yaml['N_JOB_SPLIT']
+        cost_history = {}
+        for row in MERGE_INFO_CONTENTS[TABLE_MERGE] :
+            if row[COLNUM_FIT_MERGE_STATE] != SUBMIT_STATE_DONE : continue
+            cpu = float(row[COLNUM_FIT_MERGE_CPU])
+            if cpu <= 0.0 : continue
+            key = (row[COLNUM_FIT_MERGE_VERSION], row[COLNUM_FIT_MERGE_FITOPT])
+            cost_history[key] = cpu / n_job_split
+        return cost_history
+        # end get_merge_cost_history
+
     def is_sym_link(self,fitopt_arg):
         # for input fitopt argument, return True if it means
         # symbolic link to FITOPT000.
@@ -1127,6 +1185,7 @@ class LightCurveFit(Program):
         row_list_merge_new = []
 
         #  - - - - -
+        file_index = {}  # one scan of script_dir for all rows (Oct 2026)
         irow = 0
         for row in row_list_merge :
             row_list_merge_new.append(row) # default output is same as input
@@ -1146,7 +1205,8 @@ class LightCurveFit(Program):
 
                 # get list of LOG, DONE, and YAML files 
                 log_list, done_list, yaml_list = \
-                    util.get_file_lists_wildcard(script_dir,search_wildcard)
+                    util.get_file_lists_wildcard(script_dir,search_wildcard,
+                                                 file_index)
 
                 # careful to sum only the files that are NOT None
                 NLOG   = sum(x is not None for x in log_list)  
@@ -1192,9 +1252,11 @@ class LightCurveFit(Program):
         # Merge separately for each table format; HBOOK, ROOT, TEXT ...
         # Also check for symLink option to replace table-merge
         # with sym link to FITOPT000.
-
-        # init name of merged table file for each format
-        self.config_prep['merge_table_file_list'] = [''] * NTABLE_FORMAT
+        #
+        # Oct 2026: may run in parallel for several rows, so per-row
+        #   info goes in version_fitopt_dict (not config_prep), and
+        #   sntable_dump/combine_fitres steps use merge_wrapup_lock
+        #   because they write fixed-name files in script_dir.
 
         row         = MERGE_INFO_CONTENTS[TABLE_MERGE][irow]
         state       = row[COLNUM_FIT_MERGE_STATE]
@@ -1240,7 +1302,8 @@ class LightCurveFit(Program):
             'version'         : version,
             'fitopt'          : fitopt_num,
             'version_fitopt'  : version_fitopt,
-            'nevt_expect'     : nevt_expect 
+            'nevt_expect'     : nevt_expect,
+            'merge_table_file_list' : [''] * NTABLE_FORMAT
         }
 
         # - - - - -
@@ -1270,6 +1333,10 @@ class LightCurveFit(Program):
 
         # end merge_job_wrapup 
 
+    def get_merge_wrapup_nthread(self):
+        # rows (VERSION x FITOPT) are merged independently
+        return NTHREAD_MERGE_WRAPUP
+
     def create_sym_link_tables(self, version, fitopt_num):
 
         # if this fitopt_num (e.g., FITOPT003) is on list of sym links,
@@ -1334,35 +1401,33 @@ class LightCurveFit(Program):
         flag_force_fail = \
             self.flag_force_merge_table_fail(itable,version_fitopt)
 
-        if flag_force_fail == FLAG_FORCE_MERGE_TABLE_CORRUPT :
-            table_wildcard += f(" {table_wildcard}") # double output
-
         # if no tables exist, bail out
-        table_list = glob.glob1(script_dir,table_wildcard)
+        table_list = sorted(glob.glob1(script_dir,table_wildcard))
         if len(table_list) == 0 :
             return
 
-        # construct linux command to catenate TEXT files,
-        # and then a special awk command to remove all VARNAMES
-        # lines EXCEPT for the first VARNAMES line.
+        if flag_force_fail == FLAG_FORCE_MERGE_TABLE_CORRUPT :
+            table_list += table_list  # double output
+
+        # catenate TEXT files in one pass, keeping only the first 
+        # VARNAMES line, and count rows (Oct 2026: replaces cat + awk).
         # Note that output extension is table name, not TEXT
-        cddir           = (f"cd {script_dir}")
         out_table_file  = (f"{prefix}_{version_fitopt}.{table_name}")
-        out_table_file2 = (f"{prefix}2_{version_fitopt}.{table_name}")# for awk
-
-        cmd_cat  = (f"cat {table_wildcard} > {out_table_file}")
-        cmd_awk  = (f"awk '!/^VARNAMES/ || ++n <= 1' {out_table_file} > " \
-                    f"{out_table_file2} ; " \
-                    f"mv {out_table_file2} {out_table_file}")
+        OUT_TABLE_FILE  = (f"{script_dir}/{out_table_file}")
+        TABLE_LIST      = [ f"{script_dir}/{t}" for t in table_list ]
+        merge_info      = (f"merge {table_wildcard} -> {out_table_file}")
 
         msg = (f"   merge {n_job_split} {suffix}-{table_name} table files.")
         logging.info(msg)
 
+        nevt_find = 0
         if flag_force_fail != FLAG_FORCE_MERGE_TABLE_MISSING :
-            cmd_all = f"{cmd_cat} ; {cmd_awk}"
-            os.system(f"{cddir} ; {cmd_all}")
+            nevt_find, msgerr = \
+                util.merge_table_TEXT(TABLE_LIST, OUT_TABLE_FILE, "SN:")
+            if len(msgerr) > 0 :
+                msgerr.append(f"Problem with table-merge: {merge_info}")
+                self.log_assert(False,msgerr)
 
-        OUT_TABLE_FILE = (f"{script_dir}/{out_table_file}")
         self.check_file_exists(OUT_TABLE_FILE,["Problem with table-merge"])
 
         # - - - - - -
@@ -1371,17 +1436,18 @@ class LightCurveFit(Program):
         # append variables to table.
 
         if table_name == SUFFIX_FITRES :
-            OUT_TABLE_FILE = (f"{script_dir}/{out_table_file}")
-            nevt_find = util.nrow_table_TEXT(OUT_TABLE_FILE,"SN:")
             self.nevt_table_check(nevt_expect, nevt_find, out_table_file,
-                                  cmd_all)
-            self.config_prep['merge_table_file_list'][itable] = out_table_file
+                                  merge_info)
+            version_fitopt_dict['merge_table_file_list'][itable] = \
+                out_table_file
 
             # check options to append FITRES file
             # 1. APPEND_TABLE_VARLIST  -> extract vars from HBOOK or ROOT file
             # 2. APPEND_TABLE_TEXTFILE -> append vars from external file.
-            self.append_table_varlist(version_fitopt_dict)  # optional
-            self.append_table_textfile(version_fitopt_dict)  # optional
+            # These write fixed-name files in script_dir -> one at a time.
+            with self.merge_wrapup_lock :
+                self.append_table_varlist(version_fitopt_dict)  # optional
+                self.append_table_textfile(version_fitopt_dict)  # optional
 
         # end merge_table_TEXT
 
@@ -1394,7 +1460,7 @@ class LightCurveFit(Program):
 
         CONFIG                = self.config_yaml['CONFIG']
         submit_info_yaml      = self.config_prep['submit_info_yaml']
-        merge_table_file_list = self.config_prep['merge_table_file_list']
+        merge_table_file_list = version_fitopt_dict['merge_table_file_list']
         script_dir            = submit_info_yaml['SCRIPT_DIR']
         use_table_format      = submit_info_yaml['USE_TABLE_FORMAT']
         version_fitopt        = version_fitopt_dict['version_fitopt']
@@ -1475,7 +1541,7 @@ class LightCurveFit(Program):
         # external TEXT file. See CONFIG key APPEND_TABLE_TEXFILE
         #
         submit_info_yaml      = self.config_prep['submit_info_yaml']
-        merge_table_file_list = self.config_prep['merge_table_file_list']
+        merge_table_file_list = version_fitopt_dict['merge_table_file_list']
         script_dir            = submit_info_yaml['SCRIPT_DIR']
         use_table_format      = submit_info_yaml['USE_TABLE_FORMAT']
         version_fitopt        = version_fitopt_dict['version_fitopt']
@@ -1584,7 +1650,7 @@ class LightCurveFit(Program):
         self.nevt_table_check(nevt_expect, nevt_find, out_table_file, cmd)
 
         # store merge table file for append_table_text()
-        merge_table_file_list =  self.config_prep['merge_table_file_list']
+        merge_table_file_list = version_fitopt_dict['merge_table_file_list']
         merge_table_file_list[itable] = out_table_file
 
         # end merge_table_CERN
@@ -1603,7 +1669,8 @@ class LightCurveFit(Program):
                     f" | grep 'NEVT:' ")
         print('xxxx','cmd_nevt',cmd_nevt)
         try: 
-            result_line = subprocess.check_output(cmd_nevt, shell=True)
+            with self.merge_wrapup_lock :
+                result_line = subprocess.check_output(cmd_nevt, shell=True)
             result_line = (result_line.rstrip()).decode('utf-8')
             nevt_find   = int(result_line.split()[1])
             # nevt_find = 0 # xxx REMOVE
@@ -1625,8 +1692,12 @@ class LightCurveFit(Program):
         submit_info_yaml = self.config_prep['submit_info_yaml']
         script_dir       = submit_info_yaml['SCRIPT_DIR']
 
-        table_wildcard   = (f"{PREFIX_MERGE}_*")
-        table_list       = glob.glob1(script_dir,table_wildcard)
+        # only this version_fitopt; other rows may be merging in parallel
+        version_fitopt   = version_fitopt_dict['version_fitopt']
+        table_list       = glob.glob1(script_dir,
+                                      f"{PREFIX_MERGE}_{version_fitopt}.*") + \
+                           glob.glob1(script_dir,
+                                      f"{PREFIX_MERGE}_{version_fitopt}_*.LOG")
 
         cmd = (f"cd {script_dir} ; ")
         for tfile in table_list :
@@ -31,6 +31,13 @@
 # Jan 06 2021: cidadd safety margin -> 1000 (was 10) to reduce chance
 #               of running out of random CIDs
 # Jan 14 2021: add MERGE.LOG column for NSPEC_WRITE
+# Oct 17 2026: assign jobs to cores with CPU history (see prep_job_pack)
+# Oct 17 2026: write jobs via open_job_file for --job_queue
+# Oct 17 2026: stream TMP DUMP rows into combined DUMP file and check
+#              VARNAMES (see append_merge_dump_file)
+# Oct 17 2026: move & gzip FITS files in python with atomic renames,
+#              gzip threads, and journal of DUMP appends so that an
+#              interrupted merge can resume (see move_sim_data_files).
 #
 # ==========================================
 
@@ -1400,36 +1407,39 @@ class Simulation(Program):
     
         TMP_list2d = self.config_prep['TMP_genversion']  # init array
 
-        # loop over ALL jobs, and pick out the ones for this ICPU
-        n_job_local = 0
-        for iver,ifile,isplit in zip(iver_list,ifile_list,isplit_list):
+        # assign all jobs to cores once (Oct 2026), then pick out
+        # the ones for this ICPU
+        job_list = list(zip(iver_list,ifile_list,isplit_list))
+        if icpu == 0 :
+            self.sim_prep_job_pack(job_list)
+        cpu_job_list = self.config_prep['job_pack']['cpu_job_list'][icpu]
 
+        for ijob in cpu_job_list :
+            iver,ifile,isplit = job_list[ijob-1]
             index_dict = {
                 'iver':iver, 'ifile':ifile, 'isplit':isplit, 'icpu':icpu
             }  
-            n_job_local += 1
-            if ( (n_job_local-1) % n_core ) == icpu :
-                n_job_cpu += 1
-
-                # define sim job and merge job; then glue together
-                job_info_sim   = self.prep_JOB_INFO_sim(index_dict)
-                util.write_job_info(f, job_info_sim, icpu)
+            n_job_cpu += 1
 
-                job_info_merge = self.prep_JOB_INFO_merge(icpu,n_job_local) 
-                util.write_jobmerge_info(f, job_info_merge, icpu)
+            # define sim job and merge job; then glue together
+            job_info_sim   = self.prep_JOB_INFO_sim(index_dict)
+            job_info_merge = self.prep_JOB_INFO_merge(icpu,ijob) 
+            with self.open_job_file(f,icpu,ijob) as (fjob,cpunum) :
+                util.write_job_info(fjob, job_info_sim, cpunum)
+                util.write_jobmerge_info(fjob, job_info_merge, icpu)
 
-                # store TMP_VERSION for later
-                TMP_list2d[iver][ifile] = job_info_sim['tmp_genversion']
+            # store TMP_VERSION for later
+            TMP_list2d[iver][ifile] = job_info_sim['tmp_genversion']
 
         # store TMP version strings needed later in MERGE.LOG file
         self.config_prep['TMP_genversion_list2d'] = TMP_list2d
 
         # xxx mark delete xxx  f.close()
 
-        if n_job_local != n_job_tot :
+        if len(job_list) != n_job_tot :
             msgerr = []
             msgerr.append(f"Expected {n_job_tot} total jobs;")
-            msgerr.append(f"but found {n_job_local} jobs.")
+            msgerr.append(f"but found {len(job_list)} jobs.")
             self.log_assert(False,msgerr)
 
         return n_job_cpu
@@ -1565,6 +1575,43 @@ class Simulation(Program):
 
         # end prep_JOB_INFO_sim
 
+    def sim_prep_job_pack(self, job_list):
+
+        # Created Oct 2026
+        # Prepare job-type key and cost estimate for each job in
+        # job_list, and pass to prep_job_pack that assigns jobs to cores.
+        # Key is the TMP-GENVERSION prefix (one row of SPLIT table);
+        # fall-back estimate is NGENTOT_LC for the job.
+
+        genversion_list = self.config_prep['genversion_list']
+        model_list2d    = self.config_prep['model_list2d']
+        ngentot_list2d  = self.config_prep['ngentot_list2d']
+
+        key_list = []  ;  est_list = []
+        for iver,ifile,isplit in job_list :
+            genversion   = genversion_list[iver]
+            model_string = self.model_string_suffix(model_list2d[iver][ifile],
+                                                    ifile)
+            key_list.append(f"TMP_{USER4}_{genversion}_{model_string}")
+            est_list.append(max(ngentot_list2d[iver][ifile],0))
+
+        self.prep_job_pack(key_list, est_list)
+
+        # end sim_prep_job_pack
+
+    def get_merge_cost_history(self, MERGE_INFO_CONTENTS, submit_info_yaml):
+        # return CPU minutes per split job for each TMP-GENVERSION
+        # in SPLIT table of a previous submit
+        cost_history = {}
+        for row in MERGE_INFO_CONTENTS[TABLE_SPLIT] :
+            if row[COLNUM_SIM_MERGE_STATE] != SUBMIT_STATE_DONE : continue
+            cpu    = float(row[COLNUM_SIM_MERGE_CPU])
+            nsplit = int(row[COLNUM_SIM_MERGE_NSPLIT])
+            if cpu <= 0.0 or nsplit <= 0 : continue
+            cost_history[row[COLNUM_SIM_MERGE_GENVERSION]] = cpu / nsplit
+        return cost_history
+        # end get_merge_cost_history
+
     def model_string_suffix(self,model,ifile):
         model_string = (f"{model}MODEL{ifile}")      # e.g., SNIaMODEL0
         return model_string
@@ -1810,6 +1857,7 @@ class Simulation(Program):
         for row in row_list_merge:
             row_merge_new.append(row) # default output is same as input
 
+        file_index = {}  # one scan of simlog_dir for all rows (Oct 2026)
         irow_split = 0
         for row in row_list_split:
             row_split_new.append(row)  # default output is same as input
@@ -1825,7 +1873,8 @@ class Simulation(Program):
             if not Finished :
 
                 TMP_LOG_LIST, TMP_DONE_LIST, TMP_YAML_LIST = \
-                    util.get_file_lists_wildcard(simlog_dir,TMP_GENV)
+                    util.get_file_lists_wildcard(simlog_dir, TMP_GENV,
+                                                 file_index)
 
                 # DONE and YAML lists are forced to have same length 
                 # as LOG list, 
@@ -1952,6 +2001,11 @@ class Simulation(Program):
         # If nfail > 0, create genversion_combine and write FAIL 
         # in README file; the quit. This allows downstream analysis codes 
         # to quickly check for FAIL.
+        #
+        # Oct 2026: move/gzip/DUMP-append in python so that calling again
+        #   after an interrupted merge finishes the job (see
+        #   util.move_files_atomic, util.gzip_file_atomic and
+        #   append_merge_dump_file).
 
         msg = (f"  move {genversion_split} files to {genversion_combine}")
         logging.info(msg)
@@ -1964,7 +2018,8 @@ class Simulation(Program):
         from_dir   = (f"{path_sndata_sim}/{genversion_split}"  )
         target_dir = (f"{path_sndata_sim}/{genversion_combine}")
 
-        dump_split_list     = glob.glob(f"{from_dir}/TMP*.DUMP")
+        dump_split_list     = glob.glob(f"{from_dir}/TMP*.DUMP") + \
+                              glob.glob(f"{from_dir}/TMP*.DUMP.gz")
 
         # defin aux files for combined version
         # xxx mark ignore_file = (f"{target_dir}/{genversion_combine}.IGNORE")
@@ -1973,21 +2028,21 @@ class Simulation(Program):
         list_file     = (f"{target_dir}/{genversion_combine}.LIST")
 
         # if target dir does NOT exist, create target dir along
-        # with aux files.
+        # with aux files. Aux files are checked separately in case 
+        # previous merge process was interrupted.
         if os.path.exists(target_dir) == False :
             os.mkdir(target_dir)
 
-            # create blank IGNORE file
-            # xxx mark delete with open (ignore_file,"w") as f :   pass
-
-            # create blank README file
+        # create blank README file
+        if os.path.exists(readme_file) == False :
             with open (readme_file,"w") as f :
                 if nfail > 0 : 
                     f.write("FAIL\n")  # leave message for snlc_fit
                 pass
 
-            # create combined DUMP file with VARNAMES & comments from
-            # first DUMP file. Protect against job failure.
+        # create combined DUMP file with VARNAMES & comments from
+        # first DUMP file. Protect against job failure.
+        if os.path.exists(dump_file) == False :
             if len(dump_split_list) > 0 :
                 dump_file_template = dump_split_list[0]
                 self.create_simgen_dump_file(dump_file_template,dump_file)
@@ -1997,29 +2052,20 @@ class Simulation(Program):
             return
 
         # - - - - - - - - - - 
-        # Move the FITS files, update [VERSION].LIST file, gzip FITS files.
+        # Move the FITS files with atomic rename, update [VERSION].LIST 
+        # file, and gzip FITS files on NTHREAD_GZIP threads.
         # Make sure to list the SNIa first, then NONIa, so that analysis 
-        # init is based on SNIa. 2>/dev/null suppresses linux error
-        # message when SNIa or NONIa FITS files are not there.
-        # 
-
-        cd_dir      = (f"cd {target_dir}")
-        mv_FITS      = (f"mv {from_dir}/*.FITS .")
-        
-        tmp_FITS  = (f"*{MODEL_SNIa}MODEL*HEAD.FITS*")
-        ls_SNIa      = (f"ls {tmp_FITS}  >     {list_file} 2>/dev/null")
-
-        tmp_FITS  = (f"*{MODEL_NONIa}MODEL*HEAD.FITS*")
-        ls_NONIa  = (f"ls {tmp_FITS} >> {list_file} 2>/dev/null")
+        # init is based on SNIa. LIST file does not include .gz extension.
 
-        ls_LIST      = (f"{ls_SNIa};  {ls_NONIa}")
+        FITS_list = []
+        for from_dir_split in sorted(glob.glob(from_dir)) :
+            FITS_list += glob.glob(f"{from_dir_split}/*.FITS")
+        util.move_files_atomic(FITS_list, target_dir)
 
-        # gzip FITS files, and remove .gz extensions in LIST file
-        gzip_FITS = (f"gzip *.FITS")
-        rm_gz      = (f"sed -i 's/FITS.gz/FITS/g' {list_file}")
+        self.write_sim_list_file(target_dir, list_file)
 
-        cmd     = (f"{cd_dir}; {mv_FITS}; {ls_LIST}; {rm_gz}; {gzip_FITS}")
-        os.system(cmd)
+        FITS_list = sorted(glob.glob(f"{target_dir}/*.FITS"))
+        util.gzip_files(FITS_list, NTHREAD_GZIP)
 
         # loop over TMP_*DUMP files and append combined DUMP file
         for dump_split_file in dump_split_list :
@@ -2028,11 +2074,37 @@ class Simulation(Program):
         # end move_sim_data_files
 
 
+    def write_sim_list_file(self, target_dir, list_file):
+
+        # Created Oct 2026
+        # write [VERSION].LIST file with HEAD files in target_dir;
+        # SNIa first, then NONIa, and without .gz extension.
+        # List is written from scratch so that calling again is safe.
+
+        list_lines = []
+        for model in [ MODEL_SNIa, MODEL_NONIa ] :
+            wildcard   = (f"{target_dir}/*{model}MODEL*HEAD.FITS*")
+            head_list  = [ os.path.basename(x).replace(".FITS.gz",".FITS") 
+                           for x in glob.glob(wildcard) 
+                           if not x.endswith(".TMP") ]
+            list_lines += sorted(set(head_list))
+
+        tmp_file = f"{list_file}.TMP"
+        with open(tmp_file,"wt") as f :
+            for line in list_lines :  f.write(f"{line}\n")
+        os.replace(tmp_file, list_file)
+
+        # end write_sim_list_file
+
     def append_merge_dump_file(self,dump_split_file,dump_file):
 
         # read input dump_split_file and save the lines
         # with "SN:" key. Append these SN lines to already
         # existing dump_file.
+        # Oct 2026: stream rows with util.append_table_TEXT, and abort
+        #    if VARNAMES differ from those in combined dump_file.
+        #    Each append is recorded in MOVE_JOURNAL_FILE so that
+        #    a dump_split_file is appended only once.
 
         # make sure both dump files exist
         msgerr = []
@@ -2043,21 +2115,39 @@ class Simulation(Program):
         util.check_file_exists(dump_file,msgerr)
 
         # - - - - 
-        lines_SN = []
-        with open (dump_split_file,"r") as f :
-            for line in f:
-                word_list = line.split()
-                if len(word_list) > 0 :
-                    if word_list[0] == 'SN:' :
-                        lines_SN.append(line)
+        # check journal: skip if already appended, or truncate dump_file
+        # if previous append was interrupted.
+        journal_file = f"{os.path.dirname(dump_file)}/{MOVE_JOURNAL_FILE}"
+        dump_split_base = os.path.basename(dump_split_file)
+        size_start   = None
+        for record in util.read_journal(journal_file) :
+            if record['dump'] != dump_split_file : continue
+            if record['done'] :
+                logging.info(f"\t {dump_split_base} already appended")
+                return
+            size_start = record['size']
+
+        if size_start is not None :
+            os.truncate(dump_file, size_start)
+        else:
+            size_start = os.path.getsize(dump_file)
+            util.append_journal(journal_file, { 'dump': dump_split_file, 
+                                'size': size_start, 'done': False } )
 
-#         nline_SN = len(lines_SN)
-#         print(f" xxx grab {nline_SN} lines from {dump_split_file} ")
+        varnames_ref = util.read_table_varnames(dump_file)
+        msgerr = [ f"Missing VARNAMES in combined DUMP file", 
+                   f"  {dump_file}" ]
+        self.log_assert(varnames_ref is not None, msgerr)
 
-        with open (dump_file,"a") as f :
-            f.write("".join(lines_SN) )
+        nrow, msgerr = util.append_table_TEXT(dump_split_file, dump_file, 
+                                              "SN:", varnames_ref)
+        self.log_assert(len(msgerr) == 0, msgerr)
 
-        # end update_merge_dump_file
+        util.append_journal(journal_file, { 'dump': dump_split_file, 
+                            'size': size_start, 'done': True } )
+        logging.info(f"\t append {nrow} SN rows from {dump_split_base}")
+
+        # end append_merge_dump_file
 
     def create_simgen_dump_file(self,dump_file_template,dump_file):
 
@@ -2068,7 +2158,7 @@ class Simulation(Program):
         dump_comment_lines = []
         dump_varnames_line = ""
         nline_read           = 0
-        with open (dump_file_template,"r") as f :
+        with util.open_table_TEXT(dump_file_template,"rt") as f :
             for line in f:
                 if len(line.strip()) > 1 :
                     nline_read += 1
@@ -2079,10 +2169,14 @@ class Simulation(Program):
                     if line.split()[0] == 'SN:' :
                         break
 
-        with open (dump_file,"w") as f :
+        # write temp file and rename so that an interrupted merge never
+        # leaves a header without VARNAMES (Oct 2026)
+        tmp_file = f"{dump_file}.TMP"
+        with open (tmp_file,"w") as f :
             for line in dump_comment_lines :
                 f.write(f"{line}\n")
             f.write(f"\n{dump_varnames_line}\n")
+        os.replace(tmp_file, dump_file)
 
         # end create_simgen_dump_file
 
@@ -2130,6 +2224,10 @@ class Simulation(Program):
         with open(readme_file,"w") as f : 
             self.merge_write_readme(f, iver_all, MERGE_INFO_CONTENTS)
 
+        # all split versions are merged, so remove journal of DUMP appends
+        journal_file  = (f"{path_genv}/{MOVE_JOURNAL_FILE}")
+        if os.path.exists(journal_file) : os.remove(journal_file)
+
         # move README files to misc/ for REPEAT only
         os.mkdir(misc_dir)
         TMP_GENV_LIST = []
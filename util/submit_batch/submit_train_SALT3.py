@@ -529,6 +529,7 @@ class train_SALT3(Program):
                 self.keynames_for_job_stats('CPU_MINUTES')
         key_list = [ key_nlc, key_nspec, key_cpu ] 
 
+        file_index = {}  # one scan of script_dir for all rows (Oct 2026)
         nrow_check = 0
         for row in row_list_merge :
             row_list_merge_new.append(row) # default output is same as input
@@ -549,7 +550,8 @@ class train_SALT3(Program):
 
                 # get list of LOG, DONE, and YAML files 
                 log_list, done_list, yaml_list = \
-                    util.get_file_lists_wildcard(script_dir,search_wildcard)
+                    util.get_file_lists_wildcard(script_dir,search_wildcard,
+                                                 file_index)
 
                 # careful to sum only the files that are NOT None
                 NLOG   = sum(x is not None for x in log_list)  
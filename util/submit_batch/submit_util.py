@@ -4,10 +4,14 @@
 # generic utilites for submit  script
 # ==============================================
 
-import os, sys, yaml, shutil, glob, math, ntpath
+import os, sys, yaml, shutil, glob, math, ntpath, heapq, fnmatch, select
+import gzip, json, zlib, bisect, errno, concurrent.futures
 import logging, coloredlogs, subprocess
 from   submit_params import *
 
+# use fast libyaml (C) loader if pyyaml was built with it
+YAML_SAFE_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 # =================================================
 
 def prep_jobopt_list(config_rows, string_jobopt, key_arg_file):
@@ -360,7 +364,7 @@ def compress_subdir(flag,dir_name):
 
     # end compress_subdir
 
-def get_file_lists_wildcard(search_dir, search_wildcard):
+def get_file_lists_wildcard(search_dir, search_wildcard, file_index=None):
 
     # for input search_wildcard, search for the following file lists:
     #    {search_dir}/{search_wildcard}.LOG
@@ -382,10 +386,23 @@ def get_file_lists_wildcard(search_dir, search_wildcard):
     # Mar 25 2021: find last dot (with .rindex) instead of first dot
     #              to allow for dot in version name.
     #
+    # Oct 2026: optional file_index dictionary is filled by the first
+    #   call (one os.scandir of search_dir; see scan_dir_index) and 
+    #   re-used for each later call with the same file_index, so that
+    #   each MERGE row does not need its own glob + isfile calls.
+    #   Caller passes file_index = {} before looping over rows.
+
+    if file_index is not None :
+        if len(file_index) == 0 :
+            file_index.update(scan_dir_index(search_dir))
+        log_list  = match_dir_index(file_index, f"{search_wildcard}.LOG")
+        file_set  = file_index['file_set']
+    else:
+        # search .LOG first to define list.
+        search_log = (f"{search_wildcard}.LOG")
+        log_list   = sorted(glob.glob1(search_dir, f"{search_log}") )
+        file_set   = None
 
-    # search .LOG first to define list.
-    search_log = (f"{search_wildcard}.LOG")
-    log_list   = sorted(glob.glob1(search_dir, f"{search_log}") )
     done_list = []
     yaml_list = []
 
@@ -395,14 +412,16 @@ def get_file_lists_wildcard(search_dir, search_wildcard):
         jdot      = log_file.rindex(".")
         prefix    = log_file[0:jdot]
         done_file = (f"{prefix}.DONE")
-        DONE_FILE = (f"{search_dir}/{done_file}")
-
         yaml_file = (f"{prefix}.YAML")
-        YAML_FILE = (f"{search_dir}/{yaml_file}")
-        if not os.path.isfile(DONE_FILE) :
-            done_file = None
-        if not os.path.isfile(YAML_FILE) :
-            yaml_file = None
+
+        if file_set is not None :
+            if done_file not in file_set : done_file = None
+            if yaml_file not in file_set : yaml_file = None
+        else:
+            if not os.path.isfile(f"{search_dir}/{done_file}") :
+                done_file = None
+            if not os.path.isfile(f"{search_dir}/{yaml_file}") :
+                yaml_file = None
                 
         done_list.append(done_file)
         yaml_list.append(yaml_file)
@@ -411,16 +430,365 @@ def get_file_lists_wildcard(search_dir, search_wildcard):
     
     # end get_file_lists_wildcard
 
+def scan_dir_index(search_dir):
+
+    # Created Oct 2026
+    # Single os.scandir pass over search_dir; returns index used by
+    # get_file_lists_wildcard:
+    #   log_list = sorted list of *.LOG files
+    #   file_set = set of *.DONE and *.YAML files
+
+    log_list = []
+    file_set = set()
+    with os.scandir(search_dir) as it :
+        for entry in it :
+            name = entry.name
+            if name.endswith(".LOG") :
+                log_list.append(name)
+            elif name.endswith(".DONE") or name.endswith(".YAML") :
+                file_set.add(name)
+
+    return { 'log_list' : sorted(log_list), 'file_set' : file_set }
+    # end scan_dir_index
+
+def match_dir_index(file_index, wildcard):
+    # return sorted list of index log files matching wildcard.
+    # Binary search on the literal part of wildcard before the first
+    # special character, so only files with that prefix are checked.
+    log_list = file_index['log_list']
+    jspecial = min([ wildcard.find(c) for c in "*?[" if c in wildcard ],
+                   default=len(wildcard))
+    literal  = wildcard[0:jspecial]
+    match_list = []
+    for i in range(bisect.bisect_left(log_list,literal), len(log_list)) :
+        name = log_list[i]
+        if not name.startswith(literal) : break
+        if fnmatch.fnmatchcase(name,wildcard) : match_list.append(name)
+    return match_list
+    # end match_dir_index
+
+
+def move_files_atomic(file_list, target_dir):
+
+    # Created Oct 2026
+    # Move each file in file_list into target_dir. Within a file system,
+    # os.rename is atomic so that each file is either in its original 
+    # dir or in target_dir, and an interrupted move is finished by 
+    # calling again. Across file systems, copy to temp name in target_dir
+    # and rename, then remove original.
+    # Returns number of moved files.
+
+    n_move = 0
+    for file_name in file_list :
+        target_file = f"{target_dir}/{os.path.basename(file_name)}"
+        try:
+            os.rename(file_name, target_file)
+        except OSError as e:
+            if e.errno != errno.EXDEV : raise
+            tmp_file = f"{target_file}.TMP"
+            shutil.copy2(file_name, tmp_file)
+            os.replace(tmp_file, target_file)
+            os.remove(file_name)
+        n_move += 1
+
+    return n_move
+    # end move_files_atomic
+
+def gzip_file_atomic(file_name):
+
+    # Created Oct 2026
+    # gzip file_name -> file_name.gz and remove file_name.
+    # Output is written to temp file and renamed, so that an existing
+    # .gz file is always complete; if found (interrupted after rename),
+    # only file_name is removed. FNAME in gzip header is base name of
+    # file_name (as for linux gzip), not the temp file name.
+    gz_file = f"{file_name}.gz"
+    if not os.path.exists(gz_file) :
+        tmp_file = f"{gz_file}.TMP"
+        with open(file_name,"rb") as f_in, open(tmp_file,"wb") as f_raw, \
+             gzip.GzipFile(filename=os.path.basename(file_name), mode="wb",
+                           compresslevel=GZIP_LEVEL, fileobj=f_raw) as f_out :
+            shutil.copyfileobj(f_in, f_out, 2**20)
+        os.replace(tmp_file, gz_file)
+    os.remove(file_name)
+    # end gzip_file_atomic
+
+def gzip_files(file_list, n_thread):
+    # Created Oct 2026
+    # gzip each file in file_list with gzip_file_atomic on n_thread
+    # threads (zlib releases the GIL while compressing).
+    n_thread = max(1, min(n_thread, len(file_list)))
+    with concurrent.futures.ThreadPoolExecutor(n_thread) as pool :
+        list(pool.map(gzip_file_atomic, file_list))
+    # end gzip_files
+
+def read_journal(journal_file):
+    # Created Oct 2026
+    # return list of json records in journal_file (empty list if no
+    # file); an incomplete last line from an interrupted write is ignored.
+    record_list = []
+    if not os.path.isfile(journal_file) : return record_list
+    with open(journal_file,"rt") as f :
+        for line in f :
+            if not line.endswith("\n") : break
+            record_list.append(json.loads(line))
+    return record_list
+    # end read_journal
+
+def append_journal(journal_file, record):
+    # Created Oct 2026
+    # append json record to journal_file and sync to disk before
+    # the action that it records.
+    with open(journal_file,"at") as f :
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    # end append_journal
+
+def get_dir_size(dir_name):
+    # Created Oct 2026
+    # return total size (bytes) of files in dir_name (not recursive);
+    # return 0 if dir_name does not exist.
+    size = 0
+    if not os.path.isdir(dir_name) : return size
+    with os.scandir(dir_name) as it :
+        for entry in it :
+            if entry.is_file() : size += entry.stat().st_size
+    return size
+    # end get_dir_size
+
+def pack_jobs_lpt(cost_list, n_core):
+
+    # Created Oct 2026
+    # Assign jobs to cores with the longest-processing-time (LPT)
+    # heuristic: jobs sorted by decreasing cost, each job goes to the
+    # core with the smallest load so far. Ties are broken by job index
+    # and by core index, so that equal costs reproduce the original
+    # round-robin assignment (job j -> core (j-1) % n_core).
+    #
+    # Inputs:
+    #   cost_list = predicted cost per job (any unit)
+    #   n_core    = number of cores
+    #
+    # Returns
+    #   cpu_job_list[icpu] = list of job indices (1 to n_job) in run order
+    #   load_list[icpu]    = predicted load per core
+
+    n_job        = len(cost_list)
+    cpu_job_list = [ [] for icpu in range(0,n_core) ]
+    load_list    = [ 0.0 ] * n_core
+    heap         = [ (0.0, icpu) for icpu in range(0,n_core) ]
+
+    job_order = sorted(range(0,n_job), key=lambda j: (-cost_list[j], j))
+    for j in job_order :
+        load, icpu = heapq.heappop(heap)
+        load += cost_list[j]
+        cpu_job_list[icpu].append(j+1)
+        load_list[icpu] = load
+        heapq.heappush(heap, (load, icpu) )
+
+    return cpu_job_list, load_list
+    # end pack_jobs_lpt
+
+def open_table_TEXT(table_file, mode):
+    # open TEXT table in binary mode; use gzip if file name ends in .gz
+    if table_file.endswith(".gz") :
+        return gzip.open(table_file, mode)
+    else:
+        return open(table_file, mode)
 
 def nrow_table_TEXT(table_file, row_key):
     # For input TEXT file, return number rows with 'row_key'
-    nrow        = 0
-    cmd_grep    = (f"grep '{row_key}' {table_file} | wc " )
-    result_line = subprocess.check_output(cmd_grep,shell=True).rstrip()
-    result_line = result_line.decode('utf-8')
-    nrow        = int(result_line.split()[0])
+    # Oct 2026: count in python instead of grep | wc subprocess
+    nrow     = 0
+    key      = row_key.encode()
+    with open_table_TEXT(table_file, "rb") as f :
+        for line in f :
+            if key in line : nrow += 1
     return nrow
-    # end nrow_table_TEXT                                                         
+    # end nrow_table_TEXT
+
+def merge_table_TEXT(table_list, out_file, row_key):
+
+    # Created Oct 2026
+    # Catenate TEXT tables in table_list into out_file in one pass,
+    # keeping only the first VARNAMES line (replaces cat + awk).
+    # Each input table is read once and the output is written once;
+    # out_file is gzipped if its name ends in .gz.
+    #
+    # Returns
+    #   nrow   = number of rows containing row_key (e.g., 'SN:')
+    #   msgerr = list of error messages; empty if VARNAMES lines
+    #            are the same for all tables.
+
+    KEY_VARNAMES = b"VARNAMES"
+    key          = row_key.encode()
+    varnames_ref = None ;  table_ref = None
+    nrow         = 0
+    msgerr       = []
+
+    with open_table_TEXT(out_file, "wb") as f_out :
+        for table_file in table_list :
+            with open_table_TEXT(table_file, "rb") as f_in :
+                for line in f_in :
+                    if line.startswith(KEY_VARNAMES) :
+                        varnames = line.split()
+                        if varnames_ref is None :
+                            varnames_ref = varnames ;  table_ref = table_file
+                        elif varnames != varnames_ref :
+                            if len(msgerr) == 0 :
+                                msgerr.append(f"VARNAMES in {table_ref}")
+                            msgerr.append(f"  differ from {table_file}")
+                            continue
+                        else:
+                            continue
+                    elif key in line :
+                        nrow += 1
+                    f_out.write(line)
+
+    return nrow, msgerr
+    # end merge_table_TEXT
+
+def read_table_varnames(table_file):
+    # Created Oct 2026
+    # return list of column names from first VARNAMES line of TEXT
+    # table (without VARNAMES key); None if there is no VARNAMES line.
+    with open_table_TEXT(table_file, "rb") as f :
+        for line in f :
+            if line.startswith(b"VARNAMES:") :
+                return line.decode().split()[1:]
+    return None
+    # end read_table_varnames
+
+def append_table_TEXT(table_file, out_file, row_key, varnames_ref):
+
+    # Created Oct 2026
+    # Append rows with row_key (e.g., 'SN:') from table_file to the end
+    # of existing out_file, streaming in one pass with large buffers.
+    # Either file is gzipped if its name ends in .gz.
+    # If varnames_ref is not None, VARNAMES in table_file must match.
+    #
+    # Returns
+    #   nrow   = number of rows appended
+    #   msgerr = list of error messages; if not empty, nothing appended
+
+    msgerr   = []
+    nrow     = 0
+    key      = row_key.encode()
+    n_buffer = 10000   # number of rows per write
+
+    if varnames_ref is not None :
+        varnames = read_table_varnames(table_file)
+        if varnames != varnames_ref :
+            msgerr.append(f"VARNAMES in {table_file}:")
+            msgerr.append(f"   {varnames}")
+            msgerr.append(f"differ from VARNAMES in {out_file}:")
+            msgerr.append(f"   {varnames_ref}")
+            return nrow, msgerr
+
+    with open_table_TEXT(table_file, "rb") as f_in, \
+         open_table_TEXT(out_file,   "ab") as f_out :
+        row_list = []
+        for line in f_in :
+            word_list = line.split(None,1)
+            if len(word_list) > 0 and word_list[0] == key :
+                row_list.append(line)
+                if len(row_list) == n_buffer :
+                    f_out.write(b"".join(row_list))
+                    nrow += len(row_list) ;  row_list = []
+        f_out.write(b"".join(row_list))
+        nrow += len(row_list)
+
+    return nrow, msgerr
+    # end append_table_TEXT
+
+def catenate_table_TEXT(table_list, out_file, row_key, varname_missing):
+
+    # Created Oct 2026
+    # Catenate TEXT tables that may have different columns, using the
+    # same column rules as "SALT2mu.exe cat_only" (store_output_varnames):
+    #  + keep columns that appear in every table (order of first table)
+    #  + append columns in a subset of tables if they match
+    #    comma-sep varname_missing (e.g., 'PROB*' -> contains PROB);
+    #    missing values are written as NULL_VALUE_MISSING.
+    #  + drop other columns
+    # With one table, columns from CUTMASK onward are dropped.
+    # Each table in table_list is read with or without .gz extension,
+    # and out_file is gzipped if its name ends in .gz.
+    #
+    # Returns
+    #   nrow   = number of rows with row_key written to out_file
+    #   msgerr = list of error messages (e.g., missing VARNAMES)
+
+    VARNAME_CHOP = "CUTMASK"  # first column appended by SALT2mu
+    msgerr       = []
+    key          = row_key.encode()
+
+    # read VARNAMES from each table
+    file_list = []  ;  varnames_list = []
+    for table_file in table_list :
+        if not os.path.exists(table_file) and \
+           os.path.exists(f"{table_file}.gz") :
+            table_file += ".gz"
+        varnames = read_table_varnames(table_file)
+        if varnames is None :
+            msgerr.append(f"Missing VARNAMES in {table_file}")
+        file_list.append(table_file)
+        varnames_list.append(varnames)
+
+    if len(msgerr) > 0 : return 0, msgerr
+
+    # get list of output columns
+    varnames0 = varnames_list[0]
+    if len(file_list) == 1 :
+        if VARNAME_CHOP in varnames0 :
+            varnames0 = varnames0[0:varnames0.index(VARNAME_CHOP)]
+        varnames_out = list(varnames0)
+    else:
+        varnames_out = [ var for var in varnames0 if var != VARNAME_CHOP and
+                         all(var in varnames for varnames in varnames_list) ]
+        for string in varname_missing.split(',') :
+            wildcard = string.endswith('*')
+            string   = string.rstrip('*')
+            for varnames in varnames_list :
+                for var in varnames :
+                    if var == VARNAME_CHOP or var in varnames_out : continue
+                    if (wildcard and string in var) or var == string :
+                        varnames_out.append(var)
+
+    # each dropped column once, in order of first appearance
+    drop_list = list(dict.fromkeys(
+        [ var for varnames in varnames_list for var in varnames
+          if var not in varnames_out ] ))
+
+    # stream rows from each table into out_file
+    null = NULL_VALUE_MISSING.encode()
+    nrow = 0
+    with open_table_TEXT(out_file, "wb") as f_out :
+        f_out.write(f"# Catenated data files: \n".encode())
+        for table_file in file_list :
+            f_out.write(f"#   + {table_file} \n".encode())
+        f_out.write(f"# Appended columns: {varname_missing} \n".encode())
+        f_out.write(f"# Dropped columns: {' '.join(drop_list)} \n".encode())
+        f_out.write(f"#\n".encode())
+        f_out.write(f"VARNAMES: {' '.join(varnames_out)} \n\n".encode())
+
+        for table_file, varnames in zip(file_list, varnames_list) :
+            # word index in each row (+1 for row key); None -> missing
+            iword_list = [ varnames.index(var)+1 if var in varnames else None
+                           for var in varnames_out ]
+            with open_table_TEXT(table_file, "rb") as f_in :
+                for line in f_in :
+                    if not line.startswith(key) : continue
+                    words = line.split()
+                    if words[0] != key : continue
+                    words_out = [ words[i] if i is not None else null
+                                  for i in iword_list ]
+                    f_out.write(key + b" " + b" ".join(words_out) + b" \n")
+                    nrow += 1
+
+    return nrow, msgerr
+    # end catenate_table_TEXT
 
 def extract_arg(key):
     # If key is of the form  KEY(ARG), function returns ARG.
@@ -595,6 +963,116 @@ def read_merge_file(merge_file) :
 
     # end read_merge_file
 
+def read_merge_state(merge_file):
+
+    # Created Oct 2026
+    # Same outputs as read_merge_file, but read from the JSON journal
+    # {dir}/{MERGE_JOURNAL_FILE} when it is in sync with merge_file,
+    # to avoid YAML parsing of all rows for each merge process.
+    # Journal lines:
+    #   {"snapshot": CONTENTS, "comment_lines": [...]}  # full state
+    #   {"update": [table, irow, row]}                  # one row
+    #   {"crc": crc32 of merge_file after it was written}
+    # If journal is missing or out of sync (e.g., MERGE.LOG edited by
+    # merge_reset or an abort message), read merge_file and start a
+    # new journal. MERGE.LOG remains the file for humans and Pippin.
+
+    journal_file = f"{os.path.dirname(merge_file)}/{MERGE_JOURNAL_FILE}"
+    contents = None ;  comment_lines = [] ;  crc = None;  n_update = 0
+
+    if os.path.isfile(journal_file) :
+        with open(journal_file,"rt") as f :
+            for line in f :
+                try:
+                    item = json.loads(line)
+                except ValueError :
+                    break   # partial last line from crash -> out of sync
+                if 'snapshot' in item :
+                    contents      = item['snapshot']
+                    comment_lines = item['comment_lines']
+                    n_update      = 0
+                elif 'update' in item and contents is not None :
+                    table, irow, row = item['update']
+                    contents[table][irow] = row
+                    n_update += 1
+                elif 'crc' in item :
+                    crc = item['crc']
+
+    crc_file = crc_merge_file(merge_file)
+    if contents is not None and crc == crc_file :
+        # compact journal if there are many more updates than rows
+        n_row = sum(len(v) for v in contents.values() if isinstance(v,list))
+        if n_update > MERGE_JOURNAL_COMPACT * max(n_row,1) :
+            write_merge_journal(merge_file, contents, comment_lines, None,
+                                crc_file)
+        return contents, comment_lines
+
+    contents, comment_lines = read_merge_file(merge_file)
+    write_merge_journal(merge_file, contents, comment_lines, None, crc_file)
+    return contents, comment_lines
+
+    # end read_merge_state
+
+def write_merge_journal(merge_file, contents, comment_lines, contents_start,
+                        crc):
+
+    # Created Oct 2026
+    # Call after merge_file is (re)written from contents.
+    # If contents_start is None, write new journal with full snapshot;
+    # else append rows that differ from contents_start (same tables and
+    # rows, before update). Finally record crc of merge_file; caller
+    # passes crc of the bytes it wrote so that merge_file is not re-read.
+    # Values are converted with json_plain so that YAML-only types
+    # (e.g., dates) do not abort json.dumps.
+
+    journal_file = f"{os.path.dirname(merge_file)}/{MERGE_JOURNAL_FILE}"
+
+    if contents_start is None or not os.path.isfile(journal_file) :
+        tmp_file = f"{journal_file}.TMP"
+        with open(tmp_file,"wt") as f :
+            item = { 'snapshot' : json_plain(contents), 
+                     'comment_lines' : comment_lines }
+            f.write(json.dumps(item) + "\n")
+            f.write(json.dumps({'crc' : crc}) + "\n")
+        os.replace(tmp_file, journal_file)
+        return
+
+    with open(journal_file,"at") as f :
+        for table, row_list in contents.items() :
+            if not isinstance(row_list,list) : continue
+            row_list_start = contents_start.get(table,[])
+            for irow, row in enumerate(row_list) :
+                if irow < len(row_list_start) and row == row_list_start[irow]:
+                    continue
+                item = { 'update' : [table, irow, json_plain(row)] }
+                f.write(json.dumps(item) + "\n")
+        f.write(json.dumps({'crc' : crc}) + "\n")
+
+    # end write_merge_journal
+
+def json_plain(value):
+    # Created Oct 2026
+    # return copy of value (dict/list of MERGE.LOG rows) with only
+    # json types; any other YAML value (e.g., date) is converted to str.
+    if isinstance(value,dict) :
+        return { str(key) : json_plain(val) for key, val in value.items() }
+    if isinstance(value,(list,tuple)) :
+        return [ json_plain(val) for val in value ]
+    if value is None or isinstance(value,(str,int,float)) :
+        return value
+    return str(value)
+
+def copy_merge_rows(contents):
+    # return copy of each row in each table of MERGE.LOG contents;
+    # used to find which rows change (see write_merge_journal).
+    return { table: [ list(row) for row in row_list ] 
+             for table, row_list in contents.items() 
+             if isinstance(row_list,list) }
+
+def crc_merge_file(merge_file):
+    with open(merge_file,"rb") as f :
+        return zlib.crc32(f.read())
+
 def write_done_stamp(output_dir,done_stamp_list,string):
 
     # if string is SUCCESS, write it only if stamp file doesn't exist.
@@ -636,26 +1114,163 @@ def backup_merge_file(merge_file):
     shutil.copyfile(merge_file, merge_file_save )
     # end backup_merge_file
 
+def open_dir_watch(wait_dir):
+
+    # Created Oct 2026
+    # Return inotify file descriptor watching wait_dir for new,
+    # written or moved-in files; return None if inotify is not
+    # available (non-Linux, or ctypes/libc problem). No external
+    # package is needed. Beware that inotify does not see files
+    # written from other hosts on shared file systems, so callers
+    # must still poll (see wait_dir_change).
+
+    try:
+        import ctypes, ctypes.util
+        libc  = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd    = libc.inotify_init1(INOTIFY_FLAGS)
+        if fd < 0 : return None
+        wd    = libc.inotify_add_watch(fd, wait_dir.encode(), INOTIFY_MASK)
+        if wd < 0 :
+            os.close(fd) ;  return None
+    except Exception :
+        return None
+
+    return fd
+    # end open_dir_watch
+
+def wait_dir_change(fd, t_wait):
+    # Created Oct 2026
+    # Wait up to t_wait seconds; return earlier if inotify fd 
+    # (from open_dir_watch) reports a change. fd=None -> just sleep.
+    if fd is None :
+        time.sleep(t_wait) ;  return
+    ready,_,_ = select.select([fd], [], [], t_wait)
+    if ready :
+        try:
+            os.read(fd, 65536)   # drain events; content is not needed
+        except BlockingIOError :
+            pass
+    # end wait_dir_change
+
+def close_dir_watch(fd):
+    if fd is not None : os.close(fd)
+
+def count_done_files(wait_dir, wait_files, manifest=None):
+
+    # Created Oct 2026
+    # Return number of files in wait_dir matching wait_files (wildcard).
+    # If wait_dir has DONE_MANIFEST_FILE (one line per DONE file, 
+    # appended by each job; see write_job_info), count from manifest
+    # and avoid a full directory listing. Optional manifest dictionary
+    # is kept by caller so that only new lines are read on each call.
+    # Without manifest file, use glob.
+    # In case appends to manifest are lost on a shared file system,
+    # also use glob if manifest count has not changed for T_SCAN_FULL
+    # (or on every call if there is no manifest dictionary).
+
+    T_SCAN_FULL   = T_SLEEP_WAIT_FILES[2]
+    MANIFEST_FILE = f"{wait_dir}/{DONE_MANIFEST_FILE}"
+    if not os.path.isfile(MANIFEST_FILE) :
+        return len(glob.glob1(wait_dir,wait_files))
+
+    use_glob = manifest is None
+    if manifest is None : manifest = {}
+    if 'done_set' not in manifest :
+        manifest['done_set'] = set() ;  manifest['offset'] = 0
+        manifest['n_done'] = 0       ;  manifest['t_change'] = time.time()
+
+    with open(MANIFEST_FILE,"rt") as f :
+        f.seek(manifest['offset'])
+        lines = f.read()
+
+    # only use complete lines; partial last line is read next time
+    n_char = lines.rfind("\n") + 1
+    manifest['offset'] += n_char
+    done_set = manifest['done_set']
+    for line in lines[0:n_char].split() :
+        done_file = os.path.basename(line)
+        if fnmatch.fnmatch(done_file, wait_files) :
+            done_set.add(done_file)
+
+    t_now = time.time()
+    if len(done_set) > manifest['n_done'] :
+        manifest['t_change'] = t_now
+    elif t_now - manifest['t_change'] > T_SCAN_FULL :
+        use_glob = True ;  manifest['t_change'] = t_now
+
+    if use_glob :
+        done_set.update(glob.glob1(wait_dir,wait_files))
+
+    manifest['n_done'] = len(done_set)
+    return len(done_set)
+    # end count_done_files
+
+def count_alive_files(alive_dir, alive_files, t_dead):
+
+    # Created Oct 2026
+    # Return number of files in alive_dir matching alive_files (wildcard),
+    # and number of these files touched within the last t_dead sec.
+    # Each file is touched periodically by a running CPU script, so an
+    # old file means that the script has finished or was killed.
+
+    t_now   = time.time()
+    n_file  = 0 ;   n_alive = 0
+    for alive_file in glob.glob1(alive_dir,alive_files) :
+        try:
+            t_touch = os.path.getmtime(f"{alive_dir}/{alive_file}")
+        except FileNotFoundError:
+            continue
+        n_file += 1
+        if t_now - t_touch < t_dead : n_alive += 1
+
+    return n_file, n_alive
+    # end count_alive_files
+
 def wait_for_files(n_file_wait, wait_dir, wait_files):
     # go to sleep until all wait_files exist
     # Inputs:
     #  n_file_wait     = number of files to wait for
     #  wait_dir        = directory to search for wait_files
     #  wait_files      = file specifier with wildcare; e.g, TMP*.DONE
-
-    T_SLEEP = 20  # sleep time until next file-exist check
+    #
+    # Oct 2026: replace fixed 20 sec sleep + glob with
+    #   + count from manifest file (count_done_files)
+    #   + wake up on inotify event in wait_dir (if available)
+    #   + otherwise exponential backoff from T_SLEEP_MIN to T_SLEEP_MAX,
+    #     reset to T_SLEEP_MIN each time more files are found.
+    #  If manifest count is stuck for T_SCAN_FULL, count_done_files
+    #  also uses glob in case appends to manifest are lost.
+
+    T_SLEEP_MIN = T_SLEEP_WAIT_FILES[0]
+    T_SLEEP_MAX = T_SLEEP_WAIT_FILES[1]
  
     logging.info(f"  Wait for {n_file_wait} {wait_files} files")
-    n_file_exist = 0; n_try=0
-    while  n_file_exist < n_file_wait :
-        n_try += 1
-        if n_try > 1:  time.sleep(T_SLEEP) 
-        wait_file_list  = glob.glob1(wait_dir,wait_files)
-        n_file_exist    = len(wait_file_list)
-        time_now        = datetime.datetime.now()
-        tstr            = time_now.strftime("%Y-%m-%d %H:%M:%S") 
-        msg = (f"\t Found {n_file_exist} of {n_file_wait} files ({tstr})")
-        logging.info(msg)
+    fd           = open_dir_watch(wait_dir)
+    manifest     = {}
+    n_file_exist = -1;  t_sleep = T_SLEEP_MIN
+    t_change     = time.time() ;  t_log = 0.0
+
+    while  True :
+        n_file  = count_done_files(wait_dir, wait_files, manifest)
+        t_now   = time.time()
+
+        if n_file > n_file_exist :
+            n_file_exist = n_file ;  t_change = t_now 
+            t_sleep      = T_SLEEP_MIN
+        else:
+            t_sleep = min(2.0*t_sleep, T_SLEEP_MAX)
+
+        # print status when count changes, or every T_SLEEP_MAX
+        if t_change == t_now or t_now - t_log >= T_SLEEP_MAX :
+            tstr = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S") 
+            msg  = (f"\t Found {n_file_exist} of {n_file_wait} files ({tstr})")
+            logging.info(msg)
+            t_log = t_now
+
+        if n_file_exist >= n_file_wait : break
+        wait_dir_change(fd, t_sleep)
+
+    close_dir_watch(fd)
 
     # end wait_for_file
 
@@ -664,6 +1279,7 @@ def write_job_info(f,JOB_INFO,icpu):
     # write job program plus arguemnts to file pointer f.
     # All job-info are passed via JOB_INFO.
     # Jan 8 2021: check optional wait_file
+    # Oct 2026: append DONE file name to DONE_MANIFEST_FILE
 
     job_dir      = JOB_INFO['job_dir']    # cd here; where job runs
     program      = JOB_INFO['program']    # name of program; e.g, snlc_sim.exe
@@ -739,7 +1355,12 @@ def write_job_info(f,JOB_INFO,icpu):
     f.write(f"  &>  {log_file} \n" )   # write to stdout and stderr
 
     if len(done_file) > 4 :
+        # append to manifest so that monitor tasks count DONE files
+        # without a directory listing (see count_done_files)
+        manifest_file = os.path.join(os.path.dirname(done_file),
+                                     DONE_MANIFEST_FILE)
         f.write(f"touch {done_file} \n")
+        f.write(f"echo {os.path.basename(done_file)} >> {manifest_file} \n")
         f.write(f"echo 'Finished {program} -> create DONE file.' \n")
 
     f.write(f"\n")
@@ -754,12 +1375,17 @@ def write_job_info(f,JOB_INFO,icpu):
     # end write_job_info
 
 def write_jobmerge_info(f,JOB_INFO,icpu):
-    # write merge task 
+    # write merge task
+    # Oct 2026: if merge service is running (--merge_daemon), just
+    #           drop token file in spool dir instead of merge task.
     merge_input_file = JOB_INFO['merge_input_file']
     merge_arg_list   = JOB_INFO['merge_arg_list']
     match_cpu    = icpu <= NCPU_MERGE_DISTRIBUTE
     do_merge     = len(merge_input_file) > 1  # undefined file -> no merge
-    if match_cpu and do_merge :
+    if do_merge and 'merge_spool_file' in JOB_INFO :
+        f.write(f"touch {JOB_INFO['merge_spool_file']} \n")
+        f.write(f"\n")
+    elif match_cpu and do_merge :
         merge_task = (f"{sys.argv[0]} {merge_input_file} {merge_arg_list}")
         f.write(f"cd {CWD} \n")
         f.write(f"echo Run merge_driver monitor task. \n")
@@ -933,7 +1559,7 @@ def extract_yaml(input_file, key_start, key_end):
             # xxx mark delete if line.startswith("#END_YAML"): break
             line_list.append(line)
 
-    config = yaml.safe_load("\n".join(line_list))
+    config = yaml.load("".join(line_list), Loader=YAML_SAFE_LOADER)
 
     #logging.info(f" YAML config loaded successfully from {input_file}")
     return config